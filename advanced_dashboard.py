@@ -4,11 +4,15 @@ import plotly.express as px
 
 
 from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_community.vectorstores import FAISS
+from vector_store import metadata_table, select_positions, load_versioned_vector_db
+from rag_cache import RAGCache
+from hybrid_search import load_hybrid_retriever
 from google import genai
 from google.genai import types
 import os
+from contextlib import closing
 from dotenv import load_dotenv
+from data_store import read_table, drop_unused_categories
 
 load_dotenv()
 
@@ -31,29 +35,16 @@ st.markdown("Consumer sentiment, topic trend, and social insights from reviews,
 
 @st.cache_data
 def load_data():
-    reviews = pd.read_csv("final data/category_wise_lda_output_with_topic_labels.csv")
+    # date columns come back as datetimes (invalid dates are NaT), parsed
+    # once when the parquet copy was written
+    reviews = read_table("final data/category_wise_lda_output_with_topic_labels.csv", categorical=True, parse_dates=True)
     
-    reddit = pd.read_excel("final data/reddit_category_trend_data.xlsx")
+    reddit = read_table("final data/reddit_category_trend_data.xlsx", categorical=True, parse_dates=True)
     
-    news = pd.read_csv("final data/news_data_with_sentiment.csv")
+    news = read_table("final data/news_data_with_sentiment.csv", categorical=True, parse_dates=True)
     
     print(reddit.columns)
-    if "review_date" in reviews.columns:
-        reviews["review_date"]= pd.to_datetime(
-            reviews["review_date"], errors="coerce"   #convert invalid date to NaT 
-        )
-        
     
-    if "published_at" in news.columns:
-        news["published_at"]= pd.to_datetime(
-            news["published_at"], errors="coerce"   #convert invalid date to NaT 
-        )
-     
-    if "created_date" in reddit.columns:
-        reddit["created_date"]= pd.to_datetime(
-            reddit["created_date"], errors="coerce"   #convert invalid date to NaT 
-        )    
-        
     return reviews, reddit, news   
 
 
@@ -68,15 +59,33 @@ def load_vector_db():
         model_name="sentence-transformers/all-MiniLM-L6-v2"
     )
     
-    vector_db = FAISS.load_local(
-        "consumer_sentiment_faiss1",
-        embeddings,
-        allow_dangerous_deserialization = True
-    )
-    
-    return vector_db
+    # the index version is read with the index, so a sync in between cannot
+    # pair this index with another index's version
+    return load_versioned_vector_db(embeddings, "consumer_sentiment_faiss1")
+
+vector_db, db_version = load_vector_db()
+
+
+# metadata of the indexed documents, for filtered AI search
+@st.cache_resource
+def load_document_metadata(_vector_db):
+    return metadata_table(_vector_db)
 
-vector_db = load_vector_db()
+doc_metadata = load_document_metadata(vector_db)
+
+
+# hybrid retriever: bm25 keyword matches fused with vector similarity
+# (db_version is the version of the loaded index; cached retrievals and
+# answers are tied to it)
+@st.cache_resource
+def load_retriever(_vector_db, version):
+    return load_hybrid_retriever(_vector_db, version)
+
+# sqlite connections cannot be shared across streamlit's script threads,
+# so the cache is opened per question and closed when it is answered
+# (the data itself is on disk)
+def open_rag_cache():
+    return RAGCache(vector_db, db_version, retriever=load_retriever(vector_db, db_version))
 
 
 # load gemini 
@@ -95,21 +104,21 @@ with main_col:
 
     source_filter = st.sidebar.multiselect(
         "Select Source",
-        options=reviews_df["source"].unique(),
-        default=reviews_df["source"].unique()
+        options=reviews_df["source"].unique().tolist(),
+        default=reviews_df["source"].unique().tolist()
     )
 
 
     category_filter = st.sidebar.multiselect(
         "Select Category",
-        options=reviews_df["category"].unique(),
-        default=reviews_df["category"].unique()
+        options=reviews_df["category"].unique().tolist(),
+        default=reviews_df["category"].unique().tolist()
     )
 
-    filtered_reviews = reviews_df[
+    filtered_reviews = drop_unused_categories(reviews_df[
         (reviews_df["source"].isin(source_filter))&
         (reviews_df["category"].isin(category_filter))
-    ]
+    ])
 
 
 
@@ -144,7 +153,7 @@ with main_col:
         
     with col2:
         category_sentiment = (
-            filtered_reviews.groupby(["category", "sentiment_label"]).size().reset_index(name="count")
+            filtered_reviews.groupby(["category", "sentiment_label"], observed=True).size().reset_index(name="count")
         )
         
         fig = px.bar(
@@ -166,7 +175,7 @@ with main_col:
 
 
     sentiment_trand= (
-        filtered_reviews.groupby([pd.Grouper(key="review_date", freq="W"), "sentiment_label"])
+        filtered_reviews.groupby([pd.Grouper(key="review_date", freq="W"), "sentiment_label"], observed=True)
         .size()
         .reset_index(name="count")
     )    
@@ -187,7 +196,7 @@ with main_col:
     st.subheader("Category Trend Over Time (Product Demand)")
 
     category_trend=(
-        filtered_reviews.groupby([pd.Grouper(key="review_date", freq="M"), "category"])
+        filtered_reviews.groupby([pd.Grouper(key="review_date", freq="M"), "category"], observed=True)
         .size()
         .reset_index(name="count")
     )
@@ -210,7 +219,7 @@ with main_col:
 
     cat_sent=(
         filtered_reviews
-        .groupby(["category", "sentiment_label"])
+        .groupby(["category", "sentiment_label"], observed=True)
         .size()
         .reset_index(name="count")
     )
@@ -255,7 +264,7 @@ with main_col:
 
     reddit_trend=(
         reddit_df
-        .groupby("category_label")
+        .groupby("category_label", observed=True)
         .size()
         .reset_index(name="mentions")
         .sort_values("mentions", ascending=False)
@@ -276,7 +285,7 @@ with main_col:
 
     news_sent=(
         news_df
-        .groupby("sentiment_label")
+        .groupby("sentiment_label", observed=True)
         .size()
         .reset_index(name="count")
     )
@@ -303,7 +312,7 @@ with main_col:
 
     review_cat=(
         reviews_df
-        .groupby("category")
+        .groupby("category", observed=True)
         .size()
         .reset_index(name="Review Mentions")
     )
@@ -312,7 +321,7 @@ with main_col:
 
     reddit_cat=(
         reddit_df
-        .groupby("category_label")
+        .groupby("category_label", observed=True)
         .size()
         .reset_index(name="Reddit Mentions")
         .rename(columns={"category_label":"category"})
@@ -322,7 +331,7 @@ with main_col:
 
     news_cat=(
         news_df
-        .groupby("category")
+        .groupby("category", observed=True)
         .size()
         .reset_index(name="News Mentions")
     )
@@ -333,7 +342,7 @@ with main_col:
     category_compare = review_cat\
         .merge(reddit_cat, on="category", how="outer")\
         .merge(news_cat, on="category", how="outer")\
-        .fillna(0)
+        .fillna({"Review Mentions": 0, "Reddit Mentions": 0, "News Mentions": 0})
         
     fig_compare = px.bar(
         category_compare, 
@@ -356,12 +365,30 @@ with right_sidebar:
         height=140
     )
     
+    search_scope = st.multiselect(
+        "Search In",
+        options=["review", "news", "reddit"],
+        default=["review", "news", "reddit"],
+        format_func=str.title
+    )
+    
+    # only documents matching the sidebar filters are searched
+    # (a filter with every option selected is left off)
+    search_positions = select_positions(
+        doc_metadata,
+        sources=search_scope,
+        review_sources=None if set(source_filter) == set(reviews_df["source"].unique()) else source_filter,
+        categories=None if set(category_filter) == set(reviews_df["category"].unique()) else category_filter
+    )
+    st.caption(f"Searching {len(search_positions)} of {len(doc_metadata)} documents")
+    
     ask_btn = st.button("Get Insight", use_container_width=True)
     
     if ask_btn and user_query:
-        with st.spinner("Analyzing Market Intelligence..."):
+        with st.spinner("Analyzing Market Intelligence..."), closing(open_rag_cache()) as rag_cache:
         
-            results = vector_db.similarity_search(user_query, k=10)
+            # repeated questions reuse the cached embedding and results
+            results, result_ids = rag_cache.retrieve(user_query, k=10, positions=search_positions)
             retrived_docs = [r.page_content for r in results]
             
             
@@ -384,15 +411,20 @@ with right_sidebar:
             
             Answer:
         """   
-            response = client.models.generate_content(
-                model="gemini-2.5-flash",
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    thinking_config=types.ThinkingConfig(thinking_budget=0), # Disables thinking
-                    
-                    temperature=0.2
-                ),
-            )
+            def generate():
+                response = client.models.generate_content(
+                    model="gemini-2.5-flash",
+                    contents=prompt,
+                    config=types.GenerateContentConfig(
+                        thinking_config=types.ThinkingConfig(thinking_budget=0), # Disables thinking
+                        
+                        temperature=0.2
+                    ),
+                )
+                return response.text
+            
+            # same question over the same documents -> cached answer, no tokens
+            answer, cached = rag_cache.answer(user_query, result_ids, "gemini-2.5-flash", generate)
         
-        st.success("Insight Generated")
-        st.write(response.text)
+        st.success("Insight Generated (cached)" if cached else "Insight Generated")
+        st.write(answer)
@@ -3,11 +3,14 @@ import pandas as pd
 from datetime import datetime
 from tqdm import tqdm
 import os
-import time
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 import sys
 sys.path.append('..')
 from notification import send_slack_notification
+from rate_limiter import TokenBucket
 
 load_dotenv()
 
@@ -27,7 +30,18 @@ REVIEW_URL = "https://real-time-amazon-data.p.rapidapi.com/product-reviews"
 COUNTRY = "US"
 SEARCH_PAGE = 1
 REVIEW_PAGE = 1
-REQUEST_DELAY = 1  # seconds between requests to avoid rate limiting
+
+# Global request rate shared by all search and review workers (API quota)
+REQUESTS_PER_SECOND = float(os.getenv("RAPIDAPI_REQUESTS_PER_SECOND", "2"))
+SEARCH_WORKERS = 2      # Threads searching keywords (producers)
+REVIEW_WORKERS = 4      # Threads fetching reviews (consumers)
+ASIN_QUEUE_SIZE = 50    # Bounded queue between search and review stages
+
+# ASINs whose reviews were fetched in previous runs (one per line)
+SEEN_ASINS_FILE = os.path.join("datasets", "rapid_api_seen_asins.txt")
+
+session = requests.Session()
+limiter = TokenBucket(REQUESTS_PER_SECOND)
 
 # -----------------------------
 # CATEGORY KEYWORDS
@@ -58,9 +72,9 @@ def search_products(query):
     }
 
     try:
-        response = requests.get(SEARCH_URL, headers=HEADERS, params=params, timeout=10)
+        limiter.acquire()  # Rate limiting
+        response = session.get(SEARCH_URL, headers=HEADERS, params=params, timeout=10)
         response.raise_for_status()
-        time.sleep(REQUEST_DELAY)  # Rate limiting
         return response.json().get("data", {}).get("products", [])
     except requests.exceptions.RequestException as e:
         error_msg = f"Error searching for '{query}': {e}"
@@ -74,7 +88,12 @@ def search_products(query):
 # FETCH REVIEWS BY ASIN
 # -----------------------------
 def fetch_reviews(asin):
-    """Fetch product reviews by ASIN using RapidAPI"""
+    """
+    Fetch product reviews by ASIN using RapidAPI
+
+    Returns:
+        list: Reviews (empty if the product has none), or None if the request failed
+    """
     params = {
         "asin": asin,
         "country": COUNTRY,
@@ -87,9 +106,9 @@ def fetch_reviews(asin):
     }
 
     try:
-        response = requests.get(REVIEW_URL, headers=HEADERS, params=params, timeout=10)
+        limiter.acquire()  # Rate limiting
+        response = session.get(REVIEW_URL, headers=HEADERS, params=params, timeout=10)
         response.raise_for_status()
-        time.sleep(REQUEST_DELAY)  # Rate limiting
         return response.json().get("data", {}).get("reviews", [])
     except requests.exceptions.RequestException as e:
         error_msg = f"Error fetching reviews for ASIN '{asin}': {e}"
@@ -97,7 +116,28 @@ def fetch_reviews(asin):
         send_slack_notification(
             text=f"🚨 RapidAPI Review Fetch Error\n\n{error_msg}"
         )
-        return []
+        return None
+
+# -----------------------------
+# SEEN ASINS
+# -----------------------------
+def load_seen_asins():
+    """Load ASINs whose reviews were already collected"""
+    if not os.path.exists(SEEN_ASINS_FILE):
+        return set()
+    with open(SEEN_ASINS_FILE, "r", encoding="utf-8") as f:
+        return {line.strip() for line in f if line.strip()}
+
+
+def mark_asins_seen(asins):
+    """
+    Record ASINs as collected so later runs skip them
+
+    Only called once their reviews are saved; a crash before that leaves
+    them to be fetched again on the next run.
+    """
+    with open(SEEN_ASINS_FILE, "a", encoding="utf-8") as f:
+        f.writelines(asin + "\n" for asin in asins)
 
 # -----------------------------
 # MAIN PIPELINE
@@ -106,62 +146,136 @@ def collect_amazon_reviews(products_per_keyword=5):
     """
     Collect Amazon product reviews across multiple categories
     
+    Search workers stream ASINs into a bounded queue while review workers
+    drain it; all requests share one rate limiter, so throughput is set by
+    REQUESTS_PER_SECOND rather than per-request sleeps. ASINs collected in
+    previous runs are skipped (they are recorded by save_reviews).
+    
     Args:
         products_per_keyword: Number of products to fetch per keyword (default: 5)
     
     Returns:
-        pandas.DataFrame: DataFrame containing all collected reviews
+        tuple: (pandas.DataFrame of all collected reviews, set of ASINs
+                whose reviews were fetched without error, including
+                products with no reviews)
     """
     all_reviews = []
+    fetched_asins = set()
+    lock = threading.Lock()
+    claimed = load_seen_asins()
+    asin_queue = queue.Queue(maxsize=ASIN_QUEUE_SIZE)
+    skipped = [0]
+    
+    jobs = [
+        (category, keyword)
+        for category, keywords in CATEGORY_KEYWORDS.items()
+        for keyword in keywords
+    ]
     
     print(f"🚀 Starting Amazon reviews collection...")
     print(f"📊 Categories: {len(CATEGORY_KEYWORDS)}")
-    print(f"🔑 Keywords: {sum(len(keywords) for keywords in CATEGORY_KEYWORDS.values())}")
-    print(f"⏱️  Request delay: {REQUEST_DELAY}s\n")
-
-    for category, keywords in tqdm(CATEGORY_KEYWORDS.items(), desc="Categories"):
-        for keyword in keywords:
-            try:
-                products = search_products(keyword)
-
-                for product in products[:products_per_keyword]:
-                    asin = product.get("asin")
-                    if not asin:
+    print(f"🔑 Keywords: {len(jobs)}")
+    print(f"⏱️  Rate limit: {REQUESTS_PER_SECOND} requests/s")
+    print(f"⏭️  Previously collected ASINs: {len(claimed)}\n")
+    
+    def search_worker(category, keyword):
+        try:
+            products = search_products(keyword)
+            
+            for product in products[:products_per_keyword]:
+                asin = product.get("asin")
+                if not asin:
+                    continue
+                
+                with lock:
+                    if asin in claimed:
+                        skipped[0] += 1
                         continue
-
-                    reviews = fetch_reviews(asin)
-
-                    for r in reviews:
-                        all_reviews.append({
-                            "category": category,
-                            "keyword_used": keyword,
-                            "asin": asin,
-                            "product_title": product.get("title"),
-                            "brand": product.get("brand"),
-                            "price": product.get("price"),
-                            "rating": r.get("rating"),
-                            "review_title": r.get("review_title"),
-                            "review_text": r.get("review_text"),
-                            "review_date": r.get("review_date"),
-                            "reviewer": r.get("reviewer_name"),
-                            "verified_purchase": r.get("verified_purchase"),
-                            "collected_at": datetime.utcnow()
-                        })
-
+                    claimed.add(asin)
+                
+                asin_queue.put((category, keyword, product))
+        
+        except Exception as e:
+            error_msg = f"❌ Error for keyword '{keyword}': {e}"
+            print(error_msg)
+            send_slack_notification(
+                text=f"🚨 RapidAPI Collection Error\n\nKeyword: {keyword}\nError: {e}"
+            )
+    
+    def review_worker():
+        while True:
+            item = asin_queue.get()
+            if item is None:
+                break
+            
+            category, keyword, product = item
+            asin = product.get("asin")
+            try:
+                reviews = fetch_reviews(asin)
+                if reviews is None:
+                    # Failed request: not marked as seen, retried next run
+                    continue
+                
+                rows = [{
+                    "category": category,
+                    "keyword_used": keyword,
+                    "asin": asin,
+                    "product_title": product.get("title"),
+                    "brand": product.get("brand"),
+                    "price": product.get("price"),
+                    "rating": r.get("rating"),
+                    "review_title": r.get("review_title"),
+                    "review_text": r.get("review_text"),
+                    "review_date": r.get("review_date"),
+                    "reviewer": r.get("reviewer_name"),
+                    "verified_purchase": r.get("verified_purchase"),
+                    "collected_at": datetime.utcnow()
+                } for r in reviews]
+                
+                with lock:
+                    all_reviews.extend(rows)
+                    fetched_asins.add(asin)
             except Exception as e:
-                error_msg = f"❌ Error for keyword '{keyword}': {e}"
-                print(error_msg)
-                send_slack_notification(
-                    text=f"🚨 RapidAPI Collection Error\n\nKeyword: {keyword}\nError: {e}"
-                )
-
-    return pd.DataFrame(all_reviews)
+                print(f"❌ Error processing ASIN '{asin}': {e}")
+    
+    consumers = [threading.Thread(target=review_worker) for _ in range(REVIEW_WORKERS)]
+    for t in consumers:
+        t.start()
+    
+    with ThreadPoolExecutor(max_workers=SEARCH_WORKERS) as executor:
+        futures = [executor.submit(search_worker, category, keyword) for category, keyword in jobs]
+        for future in tqdm(futures, desc="Keywords"):
+            future.result()
+    
+    for _ in consumers:
+        asin_queue.put(None)
+    for t in consumers:
+        t.join()
+    
+    print(f"⏭️  Skipped {skipped[0]} already collected ASINs")
+    return pd.DataFrame(all_reviews), fetched_asins
 
 # -----------------------------
 # SAVE DATA
 # -----------------------------
-def save_reviews(df, filename="amazon_reviews_categorized.csv"):
-    """Save reviews to CSV with deduplication"""
+def save_reviews(df, fetched_asins, filename="amazon_reviews_categorized.csv"):
+    """
+    Save reviews to CSV with deduplication (appends to earlier runs)
+
+    The fetched ASINs (including ones without reviews) are marked as seen
+    only after the CSV is written, so a failed save never skips them on
+    later runs.
+
+    Args:
+        df (pd.DataFrame): Reviews returned by collect_amazon_reviews
+        fetched_asins (set): ASINs fetched without error
+        filename (str): CSV name inside datasets/
+    """
+    output_path = os.path.join("datasets", filename)
+    
+    # Previous runs' reviews are kept since their ASINs are no longer fetched
+    if os.path.exists(output_path):
+        df = pd.concat([pd.read_csv(output_path), df], ignore_index=True)
     
     # Remove duplicates
     original_count = len(df)
@@ -172,11 +286,13 @@ def save_reviews(df, filename="amazon_reviews_categorized.csv"):
     duplicates_removed = original_count - len(df)
     
     # Save to datasets folder
-    output_path = os.path.join("datasets", filename)
     df.to_csv(output_path, index=False)
     
+    # Failed fetches are not in fetched_asins, so they stay unseen for the next run
+    mark_asins_seen(sorted(fetched_asins))
+    
     print(f"\n✅ Collection Complete!")
-    print(f"📝 Total reviews collected: {original_count}")
+    print(f"📝 Total reviews (including earlier runs): {original_count}")
     print(f"🗑️  Duplicates removed: {duplicates_removed}")
     print(f"💾 Saved {len(df)} unique reviews to {output_path}")
     
@@ -187,14 +303,17 @@ def save_reviews(df, filename="amazon_reviews_categorized.csv"):
 # -----------------------------
 if __name__ == "__main__":
     # Collect reviews
-    df = collect_amazon_reviews(products_per_keyword=5)
+    df, fetched_asins = collect_amazon_reviews(products_per_keyword=5)
     
     # Check if data was collected
     if df.empty:
         print("⚠️  No reviews were collected. Please check your API key and connection.")
+        # Products that have no reviews are still recorded, so they are not fetched again
+        if fetched_asins:
+            mark_asins_seen(sorted(fetched_asins))
     else:
         # Save to CSV
-        save_reviews(df)
+        save_reviews(df, fetched_asins)
         
         # Display summary statistics
         print("\n📊 Summary Statistics:")
@@ -1,19 +1,19 @@
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_community.vectorstores import FAISS
+from vector_store import load_embeddings, load_vector_db, index_version
+from rag_cache import RAGCache
+from hybrid_search import load_hybrid_retriever
 
 # load embedding model 
 
-embeddings = HuggingFaceEmbeddings(
-    model_name="sentence-transformers/all-MiniLM-L6-v2"
-)
+embeddings = load_embeddings()
 
 
 # load faiss index 
-vector_db = FAISS.load_local(
-    "consumer_sentiment_faiss1",
-    embeddings,
-    allow_dangerous_deserialization = True
-)
+vector_db = load_vector_db(embeddings)
+
+# repeated questions reuse the cached embedding, retrieved documents and answer
+# retrieval is hybrid: BM25 keyword matches fused with vector similarity
+version = index_version()
+rag_cache = RAGCache(vector_db, version, retriever=load_hybrid_retriever(vector_db, version))
 
 # query="Top news related to mobile accesories"
 # query="common complaints in beauty care products"
@@ -21,7 +21,7 @@ query="why home appliance having good reviews"
 
 
 # apply similarity search
-results = vector_db.similarity_search(query, k=10)
+results, result_ids = rag_cache.retrieve(query, k=10)
 
 # display result 
 retrived_documents=[]
@@ -65,17 +65,26 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
-client = genai.Client(api_key=os.getenv("Gemini_Api_key"))
+MODEL = "gemini-2.5-flash"
+
+
+def generate():
+    client = genai.Client(api_key=os.getenv("Gemini_Api_key"))
+
+    response = client.models.generate_content(
+        model=MODEL,
+        contents=prompt,
+        config=types.GenerateContentConfig(
+            thinking_config=types.ThinkingConfig(thinking_budget=0), # Disables thinking
+            
+            temperature=0.2
+        ),
+    )
+    return response.text
 
-response = client.models.generate_content(
-    model="gemini-2.5-flash",
-    contents=prompt,
-    config=types.GenerateContentConfig(
-        thinking_config=types.ThinkingConfig(thinking_budget=0), # Disables thinking
-        
-        temperature=0.2
-    ),
-)
 
 # temparture lies between 0 to 1
-print(response.text)
+answer, cached = rag_cache.answer(query, result_ids, MODEL, generate)
+if cached:
+    print("(cached answer)")
+print(answer)
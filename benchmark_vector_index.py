@@ -0,0 +1,160 @@
+"""
+Vector Index Recall Benchmark
+-----------------------------
+Compares approximate FAISS index types against exact (flat) search
+
+For every index type in vector_store.INDEX_PRESETS, the live documents
+of the saved vector database are indexed again and searched with:
+
+- the RAG test queries from test_rag_queries.py
+- a sample of document embeddings used as queries (more stable numbers)
+
+Reported per index type: recall@k against the flat index, mean query
+latency, build time and serialized index size.
+"""
+
+import os
+import time
+
+import faiss
+import numpy as np
+import pandas as pd
+
+from test_rag_queries import TEST_QUERIES
+from vector_store import (
+    EMBED_BATCH_SIZE, INDEX_PRESETS, TRAIN_SAMPLE_SIZE,
+    batched, create_faiss_index, index_factory_string, load_embeddings, load_vector_db
+)
+
+# -----------------------------
+# BENCHMARK CONFIG
+# -----------------------------
+TOP_K = 10
+MAX_DOCS = int(os.getenv("BENCHMARK_MAX_DOCS", "0")) or None   # None = every live document
+DOC_QUERY_SAMPLE = 200      # Document embeddings reused as extra queries
+RANDOM_STATE = 42
+OUTPUT_FILE = "vector_index_benchmark.csv"
+
+print("=" * 70)
+print("VECTOR INDEX RECALL BENCHMARK")
+print("=" * 70)
+print()
+
+# -----------------------------
+# Load Documents
+# -----------------------------
+print("1. Loading vector database...")
+embeddings = load_embeddings()
+vector_db = load_vector_db(embeddings)
+
+positions, texts = [], []
+for position, store_id in vector_db.index_to_docstore_id.items():
+    document = vector_db.docstore.search(store_id)
+    if isinstance(document, str) or document.metadata.get("deleted"):
+        continue
+    positions.append(position)
+    texts.append(document.page_content)
+
+rng = np.random.default_rng(RANDOM_STATE)
+if MAX_DOCS and len(texts) > MAX_DOCS:
+    keep = np.sort(rng.choice(len(texts), MAX_DOCS, replace=False))
+    positions = [positions[i] for i in keep]
+    texts = [texts[i] for i in keep]
+print(f"   ✓ {len(texts)} live documents")
+print()
+
+# -----------------------------
+# Document Vectors
+# -----------------------------
+print("2. Collecting document vectors...")
+if isinstance(vector_db.index, faiss.IndexFlat):
+    # Exact vectors can be read back from a flat index
+    vectors = np.vstack([vector_db.index.reconstruct(int(p)) for p in positions]).astype("float32")
+    print("   ✓ Reconstructed from the flat index")
+else:
+    vectors = np.vstack([
+        np.asarray(embeddings.embed_documents(batch), dtype="float32")
+        for batch in batched(texts, EMBED_BATCH_SIZE)
+    ])
+    print("   ✓ Re-embedded (saved index is not flat)")
+print(f"   ✓ Shape: {vectors.shape}")
+print()
+
+if len(vectors) < TOP_K:
+    print(f"❌ Need at least {TOP_K} documents to benchmark")
+    exit(1)
+
+# -----------------------------
+# Queries & Ground Truth
+# -----------------------------
+print("3. Building queries and exact ground truth...")
+rag_queries = np.asarray([embeddings.embed_query(q) for q in TEST_QUERIES], dtype="float32")
+sample = rng.choice(len(vectors), min(DOC_QUERY_SAMPLE, len(vectors)), replace=False)
+queries = np.vstack([rag_queries, vectors[sample]])
+
+flat = faiss.IndexFlatL2(vectors.shape[1])
+flat.add(vectors)
+_, ground_truth = flat.search(queries, TOP_K)
+print(f"   ✓ {len(rag_queries)} RAG test queries + {len(sample)} document queries")
+print()
+
+
+def recall_at_k(found, expected):
+    """Mean share of the exact top-k found by the approximate search"""
+    return float(np.mean([
+        len(set(f) & set(e)) / len(e) for f, e in zip(found, expected)
+    ]))
+
+
+# -----------------------------
+# Benchmark Each Index Type
+# -----------------------------
+print("4. Benchmarking index types...")
+print("-" * 70)
+
+rows = []
+train_sample = vectors[rng.choice(len(vectors), min(TRAIN_SAMPLE_SIZE, len(vectors)), replace=False)]
+
+for index_type in INDEX_PRESETS:
+    start = time.perf_counter()
+    index = create_faiss_index(train_sample, index_type)
+    for batch_start in range(0, len(vectors), 10000):
+        index.add(vectors[batch_start:batch_start + 10000])
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _, found = index.search(queries, TOP_K)
+    latency_ms = (time.perf_counter() - start) / len(queries) * 1000
+
+    rows.append({
+        "index_type": index_type,
+        "factory": index_factory_string(index_type, len(train_sample)),
+        f"recall@{TOP_K}": round(recall_at_k(found, ground_truth), 4),
+        f"rag_recall@{TOP_K}": round(recall_at_k(found[:len(rag_queries)], ground_truth[:len(rag_queries)]), 4),
+        "latency_ms": round(latency_ms, 3),
+        "build_seconds": round(build_seconds, 2),
+        "size_mb": round(len(faiss.serialize_index(index)) / 1e6, 2)
+    })
+    row = rows[-1]
+    print(f"   {index_type:<10} recall@{TOP_K} {row[f'recall@{TOP_K}']:.3f}  "
+          f"RAG recall {row[f'rag_recall@{TOP_K}']:.3f}  "
+          f"{row['latency_ms']:.2f} ms/query  {row['size_mb']:.1f} MB")
+
+print()
+
+# -----------------------------
+# Save Results
+# -----------------------------
+results = pd.DataFrame(rows)
+results.to_csv(OUTPUT_FILE, index=False)
+
+print("=" * 70)
+print("RESULTS")
+print("=" * 70)
+print(results.to_string(index=False))
+print()
+print(f"✅ Saved to: {OUTPUT_FILE}")
+print()
+print("Pick an index with VECTOR_INDEX_TYPE=<index_type> and rebuild:")
+print("   VECTOR_INDEX_TYPE=ivf_pq python create_vector_db.py")
+print("=" * 70)
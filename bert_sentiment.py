@@ -15,105 +15,211 @@ Model: nlptown/bert-base-multilingual-uncased-sentiment
 Output: 1-5 star ratings
 """
 
+import numpy as np
 import pandas as pd
+import torch
 from transformers import pipeline
+from sentiment_cache import cached_scores
 
 # -----------------------------
-# Load Data
+# Configuration
 # -----------------------------
-print("Loading data...")
-df = pd.read_csv("combined_cleaned_data.csv").head(100)  # Process first 100 rows (remove .head() for all data)
-print(f"✅ Loaded {len(df)} rows")
-print()
+MODEL_NAME = "nlptown/bert-base-multilingual-uncased-sentiment"
+INPUT_FILE = "combined_cleaned_data.csv"
+TEXT_COLUMN = "review_text"   # use "User Review" with datasets/amazon_dataset_cleaned.csv
+OUTPUT_FILE = "bert_sentiment_output.csv"
+SAMPLE_SIZE = None      # e.g. 100 for a quick run, None for the full dataset
+BATCH_SIZE = 32         # Reviews per padded bucket
+MAX_LENGTH = 512        # BERT max token limit
+
+# Pipeline is loaded once and reused
+_sentiment_pipeline = None
+
+
+def load_sentiment_pipeline():
+    """Load the BERT sentiment pipeline once and cache it"""
+    global _sentiment_pipeline
+    if _sentiment_pipeline is None:
+        print("Loading BERT sentiment model (this may take a minute)...")
+        print(f"Model: {MODEL_NAME}")
+        _sentiment_pipeline = pipeline("sentiment-analysis", model=MODEL_NAME)
+        print("✅ BERT model loaded successfully")
+        print()
+    return _sentiment_pipeline
+
+
+def star_to_sentiment(label):
+    """Convert star rating label to sentiment"""
+    if label in ["1 star", "2 stars"]:
+        return "negative"
+    elif label == "3 stars":
+        return "neutral"
+    else:  # 4-5 stars
+        return "positive"
 
-# -----------------------------
-# Load BERT Sentiment Model
-# -----------------------------
-print("Loading BERT sentiment model (this may take a minute)...")
-print("Model: nlptown/bert-base-multilingual-uncased-sentiment")
-sentiment_pipeline = pipeline(
-    "sentiment-analysis",
-    model="nlptown/bert-base-multilingual-uncased-sentiment"
-)
-print("✅ BERT model loaded successfully")
-print()
 
 # -----------------------------
-# Apply Sentiment Analysis
+# Batched Sentiment Analysis
 # -----------------------------
-def get_sentiment(text):
-    if pd.isna(text) or str(text).strip() == "":
-        return "Neutral", 0, 0
+def _score_bucketed(texts, batch_size):
+    """
+    Run the BERT model over non-empty texts in length-sorted buckets
     
-    try:
-        result = sentiment_pipeline(str(text)[:512])  # BERT max token limit
-        label = result[0]["label"]
-        score = result[0]["score"]
-        
-        # Convert star rating to sentiment
-        if label in ["1 star", "2 stars"]:
-            sentiment = "negative"
-        elif label == "3 stars":
-            sentiment = "neutral"
-        else:  # 4-5 stars
-            sentiment = "positive"
-        
-        return sentiment, label, score
-    except Exception as e:
-        print(f"Error processing text: {str(e)[:50]}")
-        return "Neutral", "error", 0
-
-print("Analyzing sentiment...")
-results = df["review_text"].apply(get_sentiment)
-
-df["sentiment_bert"] = results.apply(lambda x: x[0])
-df["sentiment_star_rating"] = results.apply(lambda x: x[1])
-df["sentiment_confidence"] = results.apply(lambda x: x[2])
+    Returns:
+        list: (star label, confidence) per text, in input order
+    """
+    sentiment_pipeline = load_sentiment_pipeline()
+    tokenizer = sentiment_pipeline.tokenizer
+    model = sentiment_pipeline.model
+    id2label = model.config.id2label
 
-# -----------------------------
-# Save Output
-# -----------------------------
-df.to_csv("bert_sentiment_output.csv", index=False)
-print()
-print("✅ BERT sentiment analysis completed. Saved as bert_sentiment_output.csv")
-print()
+    encoded = tokenizer(texts, truncation=True, max_length=MAX_LENGTH)["input_ids"]
+    order = np.argsort([len(ids) for ids in encoded], kind="stable")
+    results = [None] * len(texts)
 
-# -----------------------------
-# Display Statistics
-# -----------------------------
-print("=" * 60)
-print("BERT SENTIMENT DISTRIBUTION")
-print("=" * 60)
-print(df['sentiment_bert'].value_counts())
-print()
-
-print("=" * 60)
-print("STAR RATING DISTRIBUTION")
-print("=" * 60)
-print(df['sentiment_star_rating'].value_counts())
-print()
-
-print("=" * 60)
-print("CONFIDENCE STATISTICS")
-print("=" * 60)
-print(f"Mean confidence: {df['sentiment_confidence'].mean():.4f}")
-print(f"Min confidence: {df['sentiment_confidence'].min():.4f}")
-print(f"Max confidence: {df['sentiment_confidence'].max():.4f}")
-print()
+    with torch.inference_mode():
+        for start in range(0, len(order), batch_size):
+            bucket = order[start:start + batch_size]
+            features = tokenizer.pad(
+                {"input_ids": [encoded[i] for i in bucket]},
+                return_tensors="pt"
+            )
+            features = {k: v.to(model.device) for k, v in features.items()}
 
-# -----------------------------
-# Sample Results
-# -----------------------------
-print("=" * 60)
-print("SAMPLE RESULTS (First 5 rows)")
-print("=" * 60)
-for idx, row in df.head(5).iterrows():
-    print(f"\nReview {idx + 1}:")
-    print(f"Text: {str(row['review_text'])[:100]}...")
-    print(f"Star Rating: {row['sentiment_star_rating']}")
-    print(f"Sentiment: {row['sentiment_bert']}")
-    print(f"Confidence: {row['sentiment_confidence']:.4f}")
-    print("-" * 60)
-
-print()
-print("💡 NOTE: Processing stopped at 100 rows. Remove .head(100) to process all data.")
+            logits = model(**features).logits
+            probs = torch.nn.functional.softmax(logits, dim=-1)
+            scores, label_ids = probs.max(dim=-1)
+
+            for i, label_id, score in zip(bucket, label_ids.tolist(), scores.tolist()):
+                results[i] = (id2label[label_id], score)
+
+            done = min(start + batch_size, len(order))
+            print(f"  Scored {done}/{len(order)} reviews", end="\r")
+    print()
+
+    return results
+
+
+def get_sentiment_batch(texts, batch_size=BATCH_SIZE):
+    """
+    Score reviews in length-bucketed batches
+    
+    Reviews are sorted by token length and grouped into buckets of
+    batch_size, so each bucket is padded only to its own longest review.
+    Results are written back in the original order. Reviews already in the
+    shared sentiment cache are not rescored.
+    
+    Args:
+        texts (iterable): Review texts
+        batch_size (int): Reviews per bucket
+    
+    Returns:
+        pd.DataFrame: sentiment_bert, sentiment_star_rating and
+                      sentiment_confidence columns aligned with texts
+    """
+    texts = pd.Series(texts).reset_index(drop=True)
+    n = len(texts)
+
+    sentiments = np.full(n, "Neutral", dtype=object)
+    star_ratings = np.zeros(n, dtype=object)
+    confidences = np.zeros(n, dtype=np.float64)
+
+    valid = texts.notna() & (texts.astype(str).str.strip() != "")
+    valid_idx = np.flatnonzero(valid.to_numpy())
+
+    if len(valid_idx) > 0:
+        valid_texts = texts.iloc[valid_idx].astype(str).tolist()
+        scored = cached_scores(
+            MODEL_NAME,
+            valid_texts,
+            lambda batch: _score_bucketed(batch, batch_size)
+        )
+
+        labels = [label for label, _ in scored]
+        star_ratings[valid_idx] = labels
+        sentiments[valid_idx] = [star_to_sentiment(label) for label in labels]
+        confidences[valid_idx] = [score for _, score in scored]
+
+    return pd.DataFrame({
+        "sentiment_bert": sentiments,
+        "sentiment_star_rating": star_ratings,
+        "sentiment_confidence": confidences
+    })
+
+
+def get_sentiment(text):
+    """Score a single review (returns sentiment, star label, confidence)"""
+    row = get_sentiment_batch([text], batch_size=1).iloc[0]
+    return row["sentiment_bert"], row["sentiment_star_rating"], row["sentiment_confidence"]
+
+
+def main():
+    # -----------------------------
+    # Load Data
+    # -----------------------------
+    print("Loading data...")
+    df = pd.read_csv(INPUT_FILE)
+    if SAMPLE_SIZE:
+        df = df.head(SAMPLE_SIZE)
+    print(f"✅ Loaded {len(df)} rows")
+    print()
+
+    # -----------------------------
+    # Apply Sentiment Analysis
+    # -----------------------------
+    print(f"Analyzing sentiment (batch size {BATCH_SIZE})...")
+    results = get_sentiment_batch(df[TEXT_COLUMN], batch_size=BATCH_SIZE)
+    results.index = df.index
+
+    df["sentiment_bert"] = results["sentiment_bert"]
+    df["sentiment_star_rating"] = results["sentiment_star_rating"]
+    df["sentiment_confidence"] = results["sentiment_confidence"]
+
+    # -----------------------------
+    # Save Output
+    # -----------------------------
+    df.to_csv(OUTPUT_FILE, index=False)
+    print()
+    print(f"✅ BERT sentiment analysis completed. Saved as {OUTPUT_FILE}")
+    print()
+
+    # -----------------------------
+    # Display Statistics
+    # -----------------------------
+    print("=" * 60)
+    print("BERT SENTIMENT DISTRIBUTION")
+    print("=" * 60)
+    print(df['sentiment_bert'].value_counts())
+    print()
+
+    print("=" * 60)
+    print("STAR RATING DISTRIBUTION")
+    print("=" * 60)
+    print(df['sentiment_star_rating'].value_counts())
+    print()
+
+    print("=" * 60)
+    print("CONFIDENCE STATISTICS")
+    print("=" * 60)
+    print(f"Mean confidence: {df['sentiment_confidence'].mean():.4f}")
+    print(f"Min confidence: {df['sentiment_confidence'].min():.4f}")
+    print(f"Max confidence: {df['sentiment_confidence'].max():.4f}")
+    print()
+
+    # -----------------------------
+    # Sample Results
+    # -----------------------------
+    print("=" * 60)
+    print("SAMPLE RESULTS (First 5 rows)")
+    print("=" * 60)
+    for idx, row in df.head(5).iterrows():
+        print(f"\nReview {idx + 1}:")
+        print(f"Text: {str(row[TEXT_COLUMN])[:100]}...")
+        print(f"Star Rating: {row['sentiment_star_rating']}")
+        print(f"Sentiment: {row['sentiment_bert']}")
+        print(f"Confidence: {row['sentiment_confidence']:.4f}")
+        print("-" * 60)
+
+
+if __name__ == "__main__":
+    main()
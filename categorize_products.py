@@ -8,7 +8,8 @@ import os
 import pandas as pd
 from dotenv import load_dotenv
 from google import genai
-from google.genai import types
+from keyword_rules import load_matcher, PRODUCT_CATEGORY_RULES
+from llm_categorizer import LLMCategorizer
 
 load_dotenv()
 client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
@@ -21,83 +22,33 @@ print()
 # --------------------------
 # METHOD 1: Keyword Matching
 # --------------------------
+# Rules (category -> keywords, in priority order) live in
+# rules/product_category_rules.json and are compiled into one regex
+CATEGORY_RULES = load_matcher(PRODUCT_CATEGORY_RULES)
+
+
 def assign_category_by_keywords(product_name):
     """Fast keyword-based category assignment"""
-    product_lower = str(product_name).lower()
-    
-    # Electronics
-    if any(word in product_lower for word in ['phone', 'mobile', 'smartphone', 'iphone', 'samsung', 'oneplus', 'realme', 'xiaomi', 'oppo', 'vivo', 'redmi']):
-        return 'Mobile Phones'
-    elif any(word in product_lower for word in ['laptop', 'notebook', 'macbook', 'computer', 'pc', 'dell', 'hp', 'lenovo', 'asus']):
-        return 'Laptops'
-    elif any(word in product_lower for word in ['headphone', 'earphone', 'earbud', 'airpod', 'speaker', 'audio', 'jbl', 'sony', 'boat']):
-        return 'Audio'
-    elif any(word in product_lower for word in ['tv', 'television', 'monitor', 'display', 'screen']):
-        return 'Display'
-    elif any(word in product_lower for word in ['camera', 'dslr', 'gopro', 'canon', 'nikon']):
-        return 'Camera'
-    elif any(word in product_lower for word in ['watch', 'smartwatch', 'fitbit', 'band', 'fitness tracker']):
-        return 'Wearables'
-    elif any(word in product_lower for word in ['charger', 'cable', 'adapter', 'powerbank', 'usb']):
-        return 'Accessories'
-    
-    # Fashion
-    elif any(word in product_lower for word in ['shirt', 't-shirt', 'tshirt', 'top', 'dress', 'jeans', 'pant', 'trouser', 'kurta', 'saree']):
-        return 'Clothing'
-    elif any(word in product_lower for word in ['shoe', 'shoes', 'sneaker', 'boot', 'sandal', 'slipper', 'footwear', 'nike', 'adidas', 'puma']):
-        return 'Footwear'
-    elif any(word in product_lower for word in ['bag', 'backpack', 'purse', 'wallet', 'handbag', 'luggage']):
-        return 'Bags & Accessories'
-    
-    # Home & Kitchen
-    elif any(word in product_lower for word in ['refrigerator', 'fridge', 'ac', 'washing machine', 'microwave', 'oven', 'mixer', 'grinder', 'toaster']):
-        return 'Home Appliances'
-    elif any(word in product_lower for word in ['bed', 'sofa', 'chair', 'table', 'furniture', 'mattress', 'pillow', 'cushion']):
-        return 'Furniture'
-    elif any(word in product_lower for word in ['plate', 'bowl', 'cup', 'glass', 'utensil', 'cookware', 'pan', 'pot']):
-        return 'Kitchen & Dining'
-    
-    # Beauty & Personal Care
-    elif any(word in product_lower for word in ['cream', 'lotion', 'perfume', 'shampoo', 'conditioner', 'soap', 'facewash', 'lipstick', 'makeup']):
-        return 'Beauty & Personal Care'
-    
-    # Books & Media
-    elif any(word in product_lower for word in ['book', 'novel', 'magazine', 'diary', 'notebook', 'pen', 'pencil']):
-        return 'Books & Stationery'
-    
-    # Sports & Fitness
-    elif any(word in product_lower for word in ['gym', 'dumbbell', 'yoga', 'treadmill', 'cycle', 'cricket', 'football', 'sports']):
-        return 'Sports & Fitness'
-    
-    # Toys & Kids
-    elif any(word in product_lower for word in ['toy', 'game', 'puzzle', 'doll', 'lego', 'kids', 'baby']):
-        return 'Toys & Kids'
-    
-    else:
-        return 'Others'
+    return CATEGORY_RULES.categorize(str(product_name))
 
 
 # --------------------------
 # METHOD 2: LLM Classification
 # --------------------------
-def categorize_with_llm(product_name):
-    """Use Gemini for uncertain products"""
-    prompt = f"""Classify this product into ONE category: {product_name}
+CATEGORIES = [
+    "Mobile Phones", "Laptops", "Audio", "Display", "Camera", "Wearables", "Accessories",
+    "Clothing", "Footwear", "Bags & Accessories", "Home Appliances", "Furniture",
+    "Kitchen & Dining", "Beauty & Personal Care", "Books & Stationery", "Sports & Fitness",
+    "Toys & Kids", "Grocery", "Others"
+]
 
-Categories: Mobile Phones, Laptops, Audio, Display, Camera, Wearables, Accessories, Clothing, Footwear, Bags & Accessories, Home Appliances, Furniture, Kitchen & Dining, Beauty & Personal Care, Books & Stationery, Sports & Fitness, Toys & Kids, Grocery, Others
+# Deduplicates names, batches them into JSON prompts and caches answers on disk
+llm_categorizer = LLMCategorizer(client, CATEGORIES)
 
-Return only the category name, nothing else."""
-    
-    try:
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=prompt,
-            config=types.GenerateContentConfig(temperature=0.1)
-        )
-        return response.text.strip()
-    except Exception as e:
-        print(f"⚠️ LLM Error: {e}")
-        return 'Others'
+
+def categorize_with_llm(product_name):
+    """Use Gemini for uncertain products"""
+    return llm_categorizer.categorize([product_name])[0]
 
 
 # --------------------------
@@ -148,7 +99,19 @@ print()
 # Assign categories
 print("Assigning categories...")
 print("-" * 60)
-df['category'] = df[product_col].apply(smart_categorize)
+# One pass of the compiled keyword rules over the whole column
+matches = CATEGORY_RULES.match_series(df[product_col].astype(str))
+df['category'] = matches['category']
+df['category_keyword'] = matches['keyword']
+print(f"Keyword rules matched {int(matches['rule'].notna().sum())} of {len(df)} rows")
+
+# LLM only for the rows no rule matched
+needs_llm = (df['category'] == 'Others') & (df[product_col].astype(str).str.strip() != '')
+if needs_llm.any():
+    df.loc[needs_llm, 'category'] = llm_categorizer.categorize(df.loc[needs_llm, product_col].tolist())
+    stats = llm_categorizer.stats
+    print(f"LLM fallback: {needs_llm.sum()} rows, {stats['unique']} unique names, "
+          f"{stats['cached']} cached, {stats['requests']} requests, {stats['failed']} failed")
 
 # Show statistics
 print()
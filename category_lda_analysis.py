@@ -11,6 +11,12 @@ Configuration Parameters Explained:
 - MIN_DF = 5                   → Keeps words in ≥5 documents (not too rare)
 - TOP_WORDS = 10               → Number of keywords shown per topic
 - RANDOM_STATE = 42            → Ensures reproducible results
+- N_JOBS = -1                  → Worker processes for per-category fits (1 = serial)
+- LDA_MODE = "batch"           → "incremental" keeps per-category models in
+                                 models/lda/ and folds in only new reviews
+- AUTO_TOPICS = False          → Sweep TOPIC_RANGE per category and pick the
+                                 best topic count (batch mode only); each
+                                 category is then refitted in full with it
 
 Why Category-Wise LDA?
 - Different categories have different aspects (e.g., battery for phones, comfort for shoes)
@@ -24,10 +30,16 @@ Category: Mobile_Accessories
   Topic 2: case, cover, protection, drop, screen, protector, tempered
 """
 
+import os
+import numpy as np
 import pandas as pd
 import re
-from sklearn.feature_extraction.text import CountVectorizer
+from joblib import Parallel, delayed
 from sklearn.decomposition import LatentDirichletAllocation
+from data_store import write_table
+from online_lda import OnlineTopicModel, append_drift_log, DRIFT_LOG
+from dtm_cache import vectorize_cached
+from topic_selection import sweep_topic_counts
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -41,21 +53,42 @@ print()
 # -----------------------------
 INPUT_FILE = "sentiment_categorized_products.csv"
 OUTPUT_FILE = "category_wise_lda_output.csv"
+TOPIC_TERMS_FILE = "category_topic_terms.csv"   # category, topic, rank, term, weight
 NUM_TOPICS_PER_CATEGORY = 5
 MIN_DOCS_PER_CATEGORY = 20
 MAX_DF = 0.8
 MIN_DF = 5
 TOP_WORDS = 10
 RANDOM_STATE = 42
+N_JOBS = int(os.getenv("LDA_N_JOBS", "-1"))  # -1 = all cores, 1 = serial
+LDA_MODE = os.getenv("LDA_MODE", "batch")     # "batch" refits, "incremental" updates saved models
+
+# Automatic topic count selection (replaces NUM_TOPICS_PER_CATEGORY in batch mode)
+AUTO_TOPICS = os.getenv("LDA_AUTO_TOPICS", "0") == "1"
+TOPIC_RANGE = range(int(os.getenv("LDA_MIN_TOPICS", "2")), int(os.getenv("LDA_MAX_TOPICS", "12")) + 1)
+SELECTION_METRIC = os.getenv("LDA_SELECTION_METRIC", "coherence")   # or "perplexity"
+SELECTION_FILE = "category_topic_selection.csv"
+
+VECTORIZER_PARAMS = dict(
+    stop_words="english",
+    max_df=MAX_DF,         # Ignore words in >80% of docs
+    min_df=MIN_DF,         # Ignore words in <5 docs
+    ngram_range=(1, 2)     # Capture phrases like "battery life"
+)
 
 print("Configuration:")
 print(f"  Input file: {INPUT_FILE}")
 print(f"  Output file: {OUTPUT_FILE}")
+print(f"  Topic terms file: {TOPIC_TERMS_FILE}")
 print(f"  Topics per category: {NUM_TOPICS_PER_CATEGORY}")
 print(f"  Min documents required: {MIN_DOCS_PER_CATEGORY}")
 print(f"  Max document frequency: {MAX_DF} (removes very common words)")
 print(f"  Min document frequency: {MIN_DF} (removes very rare words)")
 print(f"  Top words per topic: {TOP_WORDS}")
+print(f"  Parallel jobs: {N_JOBS}")
+print(f"  LDA mode: {LDA_MODE}")
+if AUTO_TOPICS:
+    print(f"  Topic count sweep: {TOPIC_RANGE.start}-{TOPIC_RANGE.stop - 1} (by {SELECTION_METRIC})")
 print()
 
 # -----------------------------
@@ -142,23 +175,144 @@ for cat, count in category_counts.head(10).items():
 print()
 
 # -----------------------------
-# Helper: Extract Topic Words
+# Helper: Extract Topic Terms
 # -----------------------------
-def get_topic_words(model, feature_names, top_n):
+def get_topic_terms(model, feature_names, top_n):
     """
-    Extract top N words for each topic.
+    Extract the top N terms of every topic at once.
     
     How it works:
-    - argsort() → sorts word weights
-    - [-top_n:] → selects top N words
-    - [::-1] → reverses to highest → lowest
+    - components_ rows are normalized → per-topic term probabilities
+    - argpartition() → finds the top N terms of all topics without a full sort
+    - argsort() on those N → orders them highest → lowest
+    
+    Returns:
+        pd.DataFrame: One row per (topic, rank) with term and weight
+    """
+    weights = model.components_ / model.components_.sum(axis=1, keepdims=True)
+    n_topics, n_terms = weights.shape
+    top_n = min(top_n, n_terms)
+    
+    top = np.argpartition(-weights, top_n - 1, axis=1)[:, :top_n]
+    top_weights = np.take_along_axis(weights, top, axis=1)
+    order = np.argsort(-top_weights, axis=1)
+    top = np.take_along_axis(top, order, axis=1)
+    top_weights = np.take_along_axis(top_weights, order, axis=1)
+    
+    return pd.DataFrame({
+        "topic": np.repeat(np.arange(n_topics), top_n),
+        "rank": np.tile(np.arange(1, top_n + 1), n_topics),
+        "term": np.asarray(feature_names, dtype=object)[top.ravel()],
+        "weight": top_weights.ravel().round(6)
+    })
+
+
+def topic_keywords(topic_terms):
+    """Comma-joined keywords per topic (for display)"""
+    return topic_terms.sort_values(["topic", "rank"]).groupby("topic")["term"].agg(", ".join).to_dict()
+
+# -----------------------------
+# Helper: Fit One Category
+# -----------------------------
+def fit_category_lda(category, texts, row_ids=None, n_topics=NUM_TOPICS_PER_CATEGORY):
+    """
+    Fit the vectorizer and LDA model for one category.
+    
+    Runs in a worker process when N_JOBS != 1, so it only takes and
+    returns plain data; all printing happens in the main process.
+    Every fit uses the same RANDOM_STATE, so results do not depend on
+    which worker runs it or in what order. The document-term matrix
+    comes from the shared DTM cache, so reruns with other LDA settings
+    skip tokenization.
+    
+    Returns:
+        dict: vocab_size, plus topic_terms, topic and confidence
+              (None when there are too few terms for the topics)
+    """
+    if LDA_MODE == "incremental":
+        return update_category_lda(category, texts)
+    
+    # Create (or load the cached) document-term matrix
+    dtm = vectorize_cached(texts, VECTORIZER_PARAMS, row_ids=row_ids, name=category)
+    doc_term_matrix = dtm.matrix
+    result = {"vocab_size": doc_term_matrix.shape[1], "topic_terms": None}
+    
+    # Check if enough terms for topics
+    if doc_term_matrix.shape[1] < n_topics:
+        return result
+    
+    # Train LDA model
+    lda = LatentDirichletAllocation(
+        n_components=n_topics,
+        random_state=RANDOM_STATE,
+        learning_method="batch",
+        max_iter=20
+    )
+    
+    lda.fit(doc_term_matrix)
+    
+    # Extract topics and assign them to documents
+    feature_names = dtm.feature_names
+    topic_dist = lda.transform(doc_term_matrix)
+    
+    result["topic_terms"] = get_topic_terms(lda, feature_names, TOP_WORDS)
+    result["topic"] = topic_dist.argmax(axis=1)
+    result["confidence"] = topic_dist.max(axis=1)
+    return result
+
+
+def update_category_lda(category, texts):
+    """
+    Incremental mode: fold new reviews into the saved category model.
+    
+    The first run fits the model on all reviews; later runs only
+    partial_fit the reviews it has not seen, and topic IDs stay stable.
+    Topics are still assigned to every review of the category.
+    
+    Returns:
+        dict: Same keys as fit_category_lda, plus new_docs, version and
+              drift (per-topic drift against the previous version)
     """
-    topic_map = {}
-    for idx, topic in enumerate(model.components_):
-        top_indices = topic.argsort()[-top_n:][::-1]
-        words = [feature_names[i] for i in top_indices]
-        topic_map[idx] = ", ".join(words)
-    return topic_map
+    model = OnlineTopicModel(
+        category, NUM_TOPICS_PER_CATEGORY,
+        vectorizer_params=VECTORIZER_PARAMS,
+        random_state=RANDOM_STATE
+    )
+    summary = model.update(texts)
+    result = {
+        "vocab_size": summary["vocab_size"],
+        "topic_terms": None,
+        "new_docs": summary["new_docs"],
+        "version": summary["version"],
+        "drift": summary["drift"]
+    }
+    if not summary["fitted"]:
+        return result
+    
+    topic_dist = model.transform(texts)
+    result["topic_terms"] = get_topic_terms(model.lda, model.feature_names(), TOP_WORDS)
+    result["topic"] = topic_dist.argmax(axis=1)
+    result["confidence"] = topic_dist.max(axis=1)
+    return result
+
+
+def fit_all_categories(category_texts):
+    """
+    Fit every category, in a loky process pool unless N_JOBS == 1.
+    
+    Args:
+        category_texts (list): (category, texts, row_ids[, n_topics]) tuples
+    
+    Returns:
+        list: fit_category_lda results, in the order of category_texts
+    """
+    if N_JOBS == 1 or len(category_texts) < 2:
+        return [fit_category_lda(*item) for item in category_texts]
+    
+    # Parallel returns results in submission order, so the output matches a serial run
+    return Parallel(n_jobs=N_JOBS, backend="loky")(
+        delayed(fit_category_lda)(*item) for item in category_texts
+    )
 
 # -----------------------------
 # Store Results
@@ -166,6 +320,8 @@ def get_topic_words(model, feature_names, top_n):
 final_results = []
 skipped_categories = []
 processed_categories = []
+drift_rows = []
+topic_tables = []
 
 # -----------------------------
 # Category-wise LDA
@@ -175,7 +331,62 @@ print("RUNNING LDA FOR EACH CATEGORY")
 print("=" * 70)
 print()
 
-for category, df_cat in df.groupby("category"):
+category_groups = list(df.groupby("category"))
+eligible = [
+    (category, df_cat) for category, df_cat in category_groups
+    if len(df_cat) >= MIN_DOCS_PER_CATEGORY
+]
+
+# Topic count per category: fixed, or picked by a parallel sweep
+topic_counts = {category: NUM_TOPICS_PER_CATEGORY for category, _ in eligible}
+selection = {}
+
+if AUTO_TOPICS and LDA_MODE == "incremental":
+    print("⚠️ Automatic topic selection only runs in batch mode; using fixed topic count")
+elif AUTO_TOPICS:
+    print(f"Sweeping topic counts for {len(eligible)} categories (n_jobs={N_JOBS})...")
+    matrices = {
+        category: vectorize_cached(
+            df_cat["lda_text"].tolist(), VECTORIZER_PARAMS,
+            row_ids=df_cat.index.to_numpy(), name=category
+        ).matrix
+        for category, df_cat in eligible
+    }
+    selection = sweep_topic_counts(
+        matrices, TOPIC_RANGE,
+        metric=SELECTION_METRIC,
+        n_jobs=N_JOBS,
+        random_state=RANDOM_STATE
+    )
+    for category, result in selection.items():
+        topic_counts[category] = result["best"]["n_topics"]
+    
+    pd.DataFrame([
+        {
+            "category": category,
+            "n_topics": result["best"]["n_topics"],
+            "metric": SELECTION_METRIC,
+            "score": result["best"][SELECTION_METRIC],
+            "perplexity": result["best"]["perplexity"],
+            "coherence": result["best"]["coherence"],
+            "counts_tried": ", ".join(str(c["n_topics"]) for c in result["candidates"])
+        }
+        for category, result in selection.items()
+    ]).to_csv(SELECTION_FILE, index=False)
+    print(f"✅ Topic counts saved to: {SELECTION_FILE}")
+    print()
+
+print(f"Fitting {len(eligible)} categories (n_jobs={N_JOBS})...")
+print()
+fits = dict(zip(
+    [category for category, _ in eligible],
+    fit_all_categories([
+        (category, df_cat["lda_text"].tolist(), df_cat.index.to_numpy(), topic_counts[category])
+        for category, df_cat in eligible
+    ])
+))
+
+for category, df_cat in category_groups:
     print(f"Category: {category}")
     print(f"  Reviews: {len(df_cat)}")
     
@@ -186,51 +397,43 @@ for category, df_cat in df.groupby("category"):
         print()
         continue
     
-    # Create document-term matrix
-    vectorizer = CountVectorizer(
-        stop_words="english",
-        max_df=MAX_DF,         # Ignore words in >80% of docs
-        min_df=MIN_DF,         # Ignore words in <5 docs
-        ngram_range=(1, 2)     # Capture phrases like "battery life"
-    )
-    
-    doc_term_matrix = vectorizer.fit_transform(df_cat["lda_text"])
-    
-    print(f"  Vocabulary: {doc_term_matrix.shape[1]} unique terms")
+    fit = fits[category]
+    print(f"  Vocabulary: {fit['vocab_size']} unique terms")
+    if category in selection:
+        best = selection[category]["best"]
+        print(f"  Topic count: {best['n_topics']} selected "
+              f"({SELECTION_METRIC} {best[SELECTION_METRIC]:.3f}, "
+              f"{len(selection[category]['candidates'])} counts tried)")
+    if LDA_MODE == "incremental":
+        print(f"  New reviews folded in: {fit['new_docs']} (model version {fit['version']})")
+        for row in fit["drift"]:
+            print(f"    Topic {row['topic']} drift: JS {row['js_distance']:.3f}, "
+                  f"top-word overlap {row['top_word_overlap']:.0%}")
+        drift_rows.extend(
+            {"category": category, "version": fit["version"], "new_docs": fit["new_docs"], **row}
+            for row in fit["drift"]
+        )
     
     # Check if enough terms for topics
-    if doc_term_matrix.shape[1] < NUM_TOPICS_PER_CATEGORY:
+    if fit["topic_terms"] is None:
         print(f"  ✗ SKIPPED (not enough unique terms)")
         skipped_categories.append((category, len(df_cat)))
         print()
         continue
     
-    # Train LDA model
-    lda = LatentDirichletAllocation(
-        n_components=NUM_TOPICS_PER_CATEGORY,
-        random_state=RANDOM_STATE,
-        learning_method="batch",
-        max_iter=20
-    )
+    topic_word_map = topic_keywords(fit["topic_terms"])
     
-    lda.fit(doc_term_matrix)
-    
-    # Extract topics
-    feature_names = vectorizer.get_feature_names_out()
-    topic_word_map = get_topic_words(lda, feature_names, TOP_WORDS)
-    
-    print(f"  ✓ Discovered {NUM_TOPICS_PER_CATEGORY} topics:")
+    print(f"  ✓ Discovered {len(topic_word_map)} topics:")
     for topic_id, keywords in topic_word_map.items():
         print(f"    Topic {topic_id}: {keywords}")
     
     # Assign topics to documents
-    topic_dist = lda.transform(doc_term_matrix)
-    
     df_cat = df_cat.copy()
-    df_cat["lda_topic"] = topic_dist.argmax(axis=1)
-    df_cat["lda_topic_confidence"] = topic_dist.max(axis=1)
-    df_cat["lda_topic_keywords"] = df_cat["lda_topic"].map(topic_word_map)
+    df_cat["lda_topic"] = fit["topic"]
+    df_cat["lda_topic_confidence"] = fit["confidence"]
     
+    # Keywords live in the topic terms table; reviews only keep (category, lda_topic)
+    topic_tables.append(fit["topic_terms"].assign(category=category))
     final_results.append(df_cat)
     processed_categories.append(category)
     print()
@@ -247,6 +450,11 @@ print(f"✓ Successfully processed: {len(processed_categories)} categories")
 print(f"✗ Skipped: {len(skipped_categories)} categories")
 print()
 
+if drift_rows:
+    append_drift_log(drift_rows)
+    print(f"Topic drift for {len(drift_rows)} topics appended to {DRIFT_LOG}")
+    print()
+
 if skipped_categories:
     print("Skipped categories:")
     for cat, count in skipped_categories:
@@ -258,12 +466,23 @@ if skipped_categories:
 # -----------------------------
 if final_results:
     final_df = pd.concat(final_results, ignore_index=True)
-    final_df.to_csv(OUTPUT_FILE, index=False)
+    write_table(final_df, OUTPUT_FILE)
+    
+    topic_terms_df = pd.concat(topic_tables, ignore_index=True)[
+        ["category", "topic", "rank", "term", "weight"]
+    ]
+    write_table(topic_terms_df, TOPIC_TERMS_FILE)
+    keyword_lookup = {
+        (category, topic): keywords
+        for category, group in topic_terms_df.groupby("category")
+        for topic, keywords in topic_keywords(group).items()
+    }
     
     print("=" * 70)
     print("RESULTS SAVED")
     print("=" * 70)
     print(f"✅ Saved {len(final_df)} records to: {OUTPUT_FILE}")
+    print(f"✅ Saved {len(topic_terms_df)} topic terms to: {TOPIC_TERMS_FILE}")
     print()
     
     # Show column info
@@ -294,7 +513,7 @@ if final_results:
         print(f"  Category: {row['category']}")
         print(f"  Text: {str(row['cleaned_text'])[:80]}...")
         print(f"  Topic: {row['lda_topic']}")
-        print(f"  Keywords: {row['lda_topic_keywords']}")
+        print(f"  Keywords: {keyword_lookup[(row['category'], row['lda_topic'])]}")
         print(f"  Confidence: {row['lda_topic_confidence']:.3f}")
         print()
     
@@ -8,7 +8,8 @@ Purpose:
 - Maps each category to its topics and keywords
 - Useful for dashboards, reports, and analysis
 
-Input: category_wise_lda_output.csv (from category_lda_analysis.py)
+Input: category_topic_terms.csv (topic terms table from category_lda_analysis.py:
+       category, topic, rank, term, weight)
 Output: category_topic_keywords.csv
 
 Output Format:
@@ -30,7 +31,7 @@ print()
 # -----------------------------
 # Configuration
 # -----------------------------
-INPUT_FILE = "category_wise_lda_output.csv"
+INPUT_FILE = "category_topic_terms.csv"
 OUTPUT_FILE = "category_topic_keywords.csv"
 
 # -----------------------------
@@ -39,7 +40,7 @@ OUTPUT_FILE = "category_topic_keywords.csv"
 print("Loading data...")
 try:
     df = pd.read_csv(INPUT_FILE)
-    print(f"✅ Loaded {len(df)} records from {INPUT_FILE}")
+    print(f"✅ Loaded {len(df)} topic terms from {INPUT_FILE}")
     print()
 except FileNotFoundError:
     print(f"❌ ERROR: File '{INPUT_FILE}' not found!")
@@ -48,7 +49,7 @@ except FileNotFoundError:
     exit(1)
 
 # Check required columns
-required_cols = ["category", "lda_topic", "lda_topic_keywords"]
+required_cols = ["category", "topic", "rank", "term"]
 missing_cols = [col for col in required_cols if col not in df.columns]
 
 if missing_cols:
@@ -57,14 +58,17 @@ if missing_cols:
     exit(1)
 
 # -----------------------------
-# Extract Unique Category-Topic Keywords
+# Join Topic Terms Into Keywords
 # -----------------------------
-print("Extracting unique category-topic combinations...")
+print("Building category-topic keyword lists...")
 
+# One small row per (category, topic, rank), so this never touches the review rows
 category_topic_keywords = (
-    df.groupby(["category", "lda_topic"])["lda_topic_keywords"]
-    .first()  # Get first instance (all same topic should have same keywords)
+    df.sort_values(["category", "topic", "rank"])
+    .groupby(["category", "topic"])["term"]
+    .agg(", ".join)
     .reset_index()
+    .rename(columns={"topic": "lda_topic", "term": "lda_topic_keywords"})
 )
 
 print(f"✅ Extracted {len(category_topic_keywords)} category-topic combinations")
@@ -2,87 +2,94 @@
 Create FAISS Vector Database for AI Insight Panel
 --------------------------------------------------
 Builds vector database from reviews, news, and Reddit data
+
+Documents are streamed and embedded in batches (see vector_store.py), so
+peak memory holds one batch of texts and embeddings plus the index.
+
+Runs are incremental: a manifest of document ids and content hashes is
+kept with the index, so only new or changed documents are embedded and
+removed ones are tombstoned. Set VECTOR_DB_REBUILD=1 for a full rebuild.
+
+A BM25 index over the same documents is saved alongside for hybrid
+(keyword + vector) search, see hybrid_search.py.
 """
 
-import pandas as pd
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_community.vectorstores import FAISS
-from langchain_core.documents import Document
+import os
+from itertools import chain
+from data_store import read_table
+from hybrid_search import load_bm25_index
+from vector_store import (
+    INDEX_PATH, INDEX_TYPE, EMBED_BATCH_SIZE, load_embeddings, sync_vector_db, index_version,
+    iter_review_documents, iter_news_documents, iter_reddit_documents
+)
+
+REBUILD = os.getenv("VECTOR_DB_REBUILD", "0") == "1"
 
 print("="*60)
 print("CREATING FAISS VECTOR DATABASE")
 print("="*60)
+print(f"Mode: {'full rebuild' if REBUILD else 'incremental'}")
+print(f"Index type: {INDEX_TYPE} (set VECTOR_INDEX_TYPE to change)")
 print()
 
 # Load data
 print("1. Loading data...")
-reviews = pd.read_csv("datasets/final data/category_wise_lda_output_with_topic_labels.csv")
-news = pd.read_csv("datasets/final data/news_data_with_sentiment.csv")
-reddit = pd.read_excel("datasets/final data/reddit_category_trend_data.xlsx")
+reviews = read_table("datasets/final data/category_wise_lda_output_with_topic_labels.csv")
+news = read_table("datasets/final data/news_data_with_sentiment.csv")
+reddit = read_table("datasets/final data/reddit_category_trend_data.xlsx")
 
 print(f"   ✓ Reviews: {len(reviews)} records")
 print(f"   ✓ News: {len(news)} records")
 print(f"   ✓ Reddit: {len(reddit)} records")
 print()
 
-# Create documents
-print("2. Creating documents...")
-documents = []
-
-# Add reviews
-for _, row in reviews.iterrows():
-    text = f"""
-Category: {row.get('category', 'Unknown')}
-Source: {row.get('source', 'Review')}
-Sentiment: {row.get('sentiment_label', 'Unknown')}
-Topic: {row.get('topic_label', 'Unknown')}
-Review: {row.get('review_text', '')}
-"""
-    documents.append(Document(page_content=text.strip()))
-
-# Add news
-for _, row in news.iterrows():
-    text = f"""
-Category: {row.get('category', 'Unknown')}
-Source: News - {row.get('source', 'Unknown')}
-Sentiment: {row.get('sentiment_label', 'Unknown')}
-Title: {row.get('title', '')}
-Description: {row.get('description', '')}
-"""
-    documents.append(Document(page_content=text.strip()))
-
-# Add Reddit posts
-for _, row in reddit.iterrows():
-    text = f"""
-Category: {row.get('category_label', 'Unknown')}
-Source: Reddit
-Title: {row.get('title', '')}
-Text: {row.get('selftext', '')}
-"""
-    documents.append(Document(page_content=text.strip()))
-
-print(f"   ✓ Created {len(documents)} documents")
+# Documents are generated lazily, one row at a time, with metadata
+# (source, category, sentiment, date) for filtered retrieval
+print("2. Preparing document stream...")
+documents = chain(
+    iter_review_documents(reviews),
+    iter_news_documents(news),
+    iter_reddit_documents(reddit)
+)
+total_documents = len(reviews) + len(news) + len(reddit)
+print(f"   ✓ {total_documents} documents to check")
 print()
 
 # Create embeddings
 print("3. Loading embedding model (this may take a while)...")
-embeddings = HuggingFaceEmbeddings(
-    model_name="sentence-transformers/all-MiniLM-L6-v2"
-)
+embeddings = load_embeddings()
 print("   ✓ Model loaded")
 print()
 
-# Create FAISS index
-print("4. Building FAISS vector database...")
-print("   (This may take several minutes depending on data size)")
-vector_db = FAISS.from_documents(documents, embeddings)
-print("   ✓ Vector database created")
+# Update (or create) the FAISS index; it is saved with its manifest
+print(f"4. Updating FAISS vector database (batches of {EMBED_BATCH_SIZE})...")
+vector_db, stats = sync_vector_db(
+    documents,
+    embeddings,
+    rebuild=REBUILD,
+    on_batch=lambda done: print(f"   ... {done} documents embedded", end="\r")
+)
+print()
+
+if vector_db is None:
+    print("   ❌ No documents to index")
+    exit(1)
+
+print(f"   ✓ New: {stats['added']}, changed: {stats['changed']}, "
+      f"unchanged: {stats['unchanged']}, removed: {stats['deleted']}")
+if stats["compacted"]:
+    print(f"   ✓ Compacted {stats['compacted']} tombstoned vectors")
+if stats["added"] or stats["changed"] or stats["deleted"] or stats["compacted"] or REBUILD:
+    print(f"   ✓ Saved to: {INDEX_PATH}/ (version {index_version()})")
+else:
+    print(f"   ✓ Index unchanged (version {index_version()})")
 print()
 
-# Save to disk
-print("5. Saving vector database...")
-vector_db.save_local("consumer_sentiment_faiss1")
-print("   ✓ Saved to: consumer_sentiment_faiss1/")
+# Sparse BM25 index over the same live documents, for hybrid search
+# (only rebuilt when the index version changed)
+print("5. Updating BM25 index...")
+bm25 = load_bm25_index(vector_db)
+print(f"   ✓ {len(bm25.positions)} documents, {len(bm25.vocabulary)} terms")
 print()
 
 print("="*60)
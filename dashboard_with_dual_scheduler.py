@@ -3,7 +3,9 @@ import pandas as pd
 import plotly.express as px
 
 from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_community.vectorstores import FAISS
+from vector_store import metadata_table, select_positions, load_versioned_vector_db
+from rag_cache import RAGCache
+from hybrid_search import load_hybrid_retriever
 from google import genai
 from google.genai import types
 from groq import Groq
@@ -12,6 +14,8 @@ from dotenv import load_dotenv
 import schedule
 import threading
 import time
+from contextlib import closing
+from data_store import read_table, drop_unused_categories
 
 load_dotenv()
 
@@ -66,25 +70,11 @@ st.markdown("Consumer sentiment, topic trend, and social insights from reviews,
 # Load data
 @st.cache_data
 def load_data():
-    reviews = pd.read_csv("datasets/final data/category_wise_lda_output_with_topic_labels.csv")
-    reddit = pd.read_excel("datasets/final data/reddit_category_trend_data.xlsx")
-    news_df = pd.read_csv("datasets/final data/news_data_with_sentiment.csv")
-    
-    # Convert dates
-    if "review_date" in reviews.columns:
-        reviews["review_date"] = pd.to_datetime(
-            reviews["review_date"], errors="coerce"
-        )
-    
-    if "published_at" in news_df.columns:
-        news_df["published_at"] = pd.to_datetime(
-            news_df["published_at"], errors="coerce"
-        )
-    
-    if "created_date" in reddit.columns:
-        reddit["created_date"] = pd.to_datetime(
-            reddit["created_date"], errors="coerce"
-        )
+    # Typed Parquet copies are used when fresh; date columns come back as
+    # datetimes, parsed once when the copy was written
+    reviews = read_table("datasets/final data/category_wise_lda_output_with_topic_labels.csv", categorical=True, parse_dates=True)
+    reddit = read_table("datasets/final data/reddit_category_trend_data.xlsx", categorical=True, parse_dates=True)
+    news_df = read_table("datasets/final data/news_data_with_sentiment.csv", categorical=True, parse_dates=True)
     
     return reviews, reddit, news_df
 
@@ -95,25 +85,46 @@ reviews_df, reddit_df, news_df = load_data()
 # Load vector database
 @st.cache_resource
 def load_vector_db():
-    """Load FAISS vector database for AI Q&A"""
+    """
+    Load FAISS vector database for AI Q&A, with the version of the loaded
+    index (cached retrievals and answers are tied to it)
+    """
     try:
         embeddings = HuggingFaceEmbeddings(
             model_name="sentence-transformers/all-MiniLM-L6-v2"
         )
         
-        vector_db = FAISS.load_local(
-            "consumer_sentiment_faiss1",
-            embeddings,
-            allow_dangerous_deserialization=True
-        )
-        
-        return vector_db
+        # Read together, so a scheduler sync cannot pair one index with
+        # another index's version
+        return load_versioned_vector_db(embeddings, "consumer_sentiment_faiss1")
     except Exception as e:
         st.warning(f"⚠️ Vector database not found. AI Insight Panel disabled. Run 'python create_vector_db.py' to enable it.")
-        return None
+        return None, None
+
+
+vector_db, db_version = load_vector_db()
+
+
+# Metadata of the indexed documents, for filtered AI search
+@st.cache_resource
+def load_document_metadata(_vector_db):
+    return metadata_table(_vector_db)
 
 
-vector_db = load_vector_db()
+doc_metadata = load_document_metadata(vector_db) if vector_db is not None else None
+
+
+# Hybrid retriever: BM25 keyword matches fused with vector similarity
+@st.cache_resource
+def load_retriever(_vector_db, version):
+    return load_hybrid_retriever(_vector_db, version)
+
+
+# SQLite connections cannot be shared across Streamlit's script threads,
+# so the cache is opened per question and closed when it is answered
+# (the data itself is on disk)
+def open_rag_cache():
+    return RAGCache(vector_db, db_version, retriever=load_retriever(vector_db, db_version))
 
 
 # Load Gemini client
@@ -130,6 +141,9 @@ def load_groq_client():
 gemini_client = load_gemini_client()
 groq_client = load_groq_client()
 
+GEMINI_MODEL = "gemini-2.5-flash"
+GROQ_MODEL = "llama-3.3-70b-versatile"
+
 
 # Create two-column layout
 main_col, right_sidebar = st.columns([3, 1])
@@ -140,20 +154,20 @@ with main_col:
     
     source_filter = st.sidebar.multiselect(
         "Select Source",
-        options=reviews_df["source"].unique(),
-        default=reviews_df["source"].unique()
+        options=reviews_df["source"].unique().tolist(),
+        default=reviews_df["source"].unique().tolist()
     )
     
     category_filter = st.sidebar.multiselect(
         "Select Category",
-        options=reviews_df["category"].unique(),
-        default=reviews_df["category"].unique()
+        options=reviews_df["category"].unique().tolist(),
+        default=reviews_df["category"].unique().tolist()
     )
     
-    filtered_reviews = reviews_df[
+    filtered_reviews = drop_unused_categories(reviews_df[
         (reviews_df["source"].isin(source_filter)) &
         (reviews_df["category"].isin(category_filter))
-    ]
+    ])
     
     # KPI Metrics
     st.subheader("Key Metrics")
@@ -183,7 +197,7 @@ with main_col:
     
     with col2:
         category_sentiment = (
-            filtered_reviews.groupby(["category", "sentiment_label"]).size().reset_index(name="count")
+            filtered_reviews.groupby(["category", "sentiment_label"], observed=True).size().reset_index(name="count")
         )
         
         fig = px.bar(
@@ -201,7 +215,7 @@ with main_col:
     st.subheader("Sentiment Trend Over Time")
     
     sentiment_trend = (
-        filtered_reviews.groupby([pd.Grouper(key="review_date", freq="W"), "sentiment_label"])
+        filtered_reviews.groupby([pd.Grouper(key="review_date", freq="W"), "sentiment_label"], observed=True)
         .size()
         .reset_index(name="count")
     )
@@ -220,7 +234,7 @@ with main_col:
     st.subheader("Category Trend Over Time (Product Demand)")
     
     category_trend = (
-        filtered_reviews.groupby([pd.Grouper(key="review_date", freq="M"), "category"])
+        filtered_reviews.groupby([pd.Grouper(key="review_date", freq="M"), "category"], observed=True)
         .size()
         .reset_index(name="count")
     )
@@ -240,7 +254,7 @@ with main_col:
     
     cat_sent = (
         filtered_reviews
-        .groupby(["category", "sentiment_label"])
+        .groupby(["category", "sentiment_label"], observed=True)
         .size()
         .reset_index(name="count")
     )
@@ -280,7 +294,7 @@ with main_col:
     
     reddit_trend = (
         reddit_df
-        .groupby("category_label")
+        .groupby("category_label", observed=True)
         .size()
         .reset_index(name="mentions")
         .sort_values("mentions", ascending=False)
@@ -300,7 +314,7 @@ with main_col:
     
     news_sent = (
         news_df
-        .groupby("sentiment_label")
+        .groupby("sentiment_label", observed=True)
         .size()
         .reset_index(name="count")
     )
@@ -320,7 +334,7 @@ with main_col:
     # Review category count
     review_cat = (
         reviews_df
-        .groupby("category")
+        .groupby("category", observed=True)
         .size()
         .reset_index(name="Review Mentions")
     )
@@ -328,7 +342,7 @@ with main_col:
     # Reddit category count
     reddit_cat = (
         reddit_df
-        .groupby("category_label")
+        .groupby("category_label", observed=True)
         .size()
         .reset_index(name="Reddit Mentions")
         .rename(columns={"category_label": "category"})
@@ -337,7 +351,7 @@ with main_col:
     # News category count
     news_cat = (
         news_df
-        .groupby("category")
+        .groupby("category", observed=True)
         .size()
         .reset_index(name="News Mentions")
     )
@@ -346,7 +360,7 @@ with main_col:
     category_compare = review_cat\
         .merge(reddit_cat, on="category", how="outer")\
         .merge(news_cat, on="category", how="outer")\
-        .fillna(0)
+        .fillna({"Review Mentions": 0, "Reddit Mentions": 0, "News Mentions": 0})
     
     fig_compare = px.bar(
         category_compare,
@@ -374,12 +388,30 @@ with right_sidebar:
             placeholder="e.g., What are customers saying about electronics?"
         )
         
+        search_scope = st.multiselect(
+            "Search In",
+            options=["review", "news", "reddit"],
+            default=["review", "news", "reddit"],
+            format_func=str.title
+        )
+        
+        # Only documents matching the sidebar filters are searched
+        # (a filter with every option selected is left off)
+        search_positions = select_positions(
+            doc_metadata,
+            sources=search_scope,
+            review_sources=None if set(source_filter) == set(reviews_df["source"].unique()) else source_filter,
+            categories=None if set(category_filter) == set(reviews_df["category"].unique()) else category_filter
+        )
+        st.caption(f"Searching {len(search_positions)} of {len(doc_metadata)} documents")
+        
         ask_btn = st.button("Get Insight", use_container_width=True)
         
         if ask_btn and user_query:
-            with st.spinner("Analyzing Market Intelligence..."):
-                # Retrieve relevant documents from vector database
-                results = vector_db.similarity_search(user_query, k=10)
+            with st.spinner("Analyzing Market Intelligence..."), closing(open_rag_cache()) as rag_cache:
+                # Retrieve relevant documents matching the filters
+                # (repeated questions reuse the cached embedding and results)
+                results, result_ids = rag_cache.retrieve(user_query, k=10, positions=search_positions)
                 retrieved_docs = [r.page_content for r in results]
                 
                 # Create prompt for Gemini/Groq
@@ -400,39 +432,52 @@ Question:
 Answer:
 """
                 
-                # Try Gemini first, fallback to Groq if it fails
-                try:
-                    # Generate response using Gemini
-                    response = gemini_client.models.generate_content(
-                        model="gemini-2.5-flash",
-                        contents=prompt,
-                        config=types.GenerateContentConfig(
-                            thinking_config=types.ThinkingConfig(thinking_budget=0),
-                            temperature=0.2
-                        ),
-                    )
-                    response_text = response.text
-                    st.info("🤖 Powered by Gemini")
-                    
-                except Exception as gemini_error:
-                    st.warning(f"⚠️ Gemini unavailable, switching to Groq... ({str(gemini_error)[:50]})")
+                # Reuse the answer to the same question over the same documents
+                response_text = (
+                    rag_cache.get_answer(user_query, result_ids, GEMINI_MODEL)
+                    or rag_cache.get_answer(user_query, result_ids, GROQ_MODEL)
+                )
+                if response_text:
+                    st.info("⚡ Cached answer (no tokens used)")
+                else:
+                    # Try Gemini first, fallback to Groq if it fails
                     try:
-                        # Fallback to Groq
-                        groq_response = groq_client.chat.completions.create(
-                            model="llama-3.3-70b-versatile",
-                            messages=[
-                                {"role": "system", "content": "You are a market intelligence analyst. Use only the provided context to answer questions."},
-                                {"role": "user", "content": prompt}
-                            ],
-                            temperature=0.2,
-                            max_tokens=1024
+                        # Generate response using Gemini
+                        response = gemini_client.models.generate_content(
+                            model=GEMINI_MODEL,
+                            contents=prompt,
+                            config=types.GenerateContentConfig(
+                                thinking_config=types.ThinkingConfig(thinking_budget=0),
+                                temperature=0.2
+                            ),
                         )
-                        response_text = groq_response.choices[0].message.content
-                        st.info("🤖 Powered by Groq (Llama 3.3)")
+                        response_text = response.text
+                        st.info("🤖 Powered by Gemini")
+                        answer_model = GEMINI_MODEL
+                    
+                    except Exception as gemini_error:
+                        st.warning(f"⚠️ Gemini unavailable, switching to Groq... ({str(gemini_error)[:50]})")
+                        try:
+                            # Fallback to Groq
+                            groq_response = groq_client.chat.completions.create(
+                                model=GROQ_MODEL,
+                                messages=[
+                                    {"role": "system", "content": "You are a market intelligence analyst. Use only the provided context to answer questions."},
+                                    {"role": "user", "content": prompt}
+                                ],
+                                temperature=0.2,
+                                max_tokens=1024
+                            )
+                            response_text = groq_response.choices[0].message.content
+                            st.info("🤖 Powered by Groq (Llama 3.3)")
+                            answer_model = GROQ_MODEL
                         
-                    except Exception as groq_error:
-                        st.error(f"❌ Both Gemini and Groq failed: {str(groq_error)}")
-                        response_text = None
+                        except Exception as groq_error:
+                            st.error(f"❌ Both Gemini and Groq failed: {str(groq_error)}")
+                            response_text = None
+                    
+                    if response_text:
+                        rag_cache.put_answer(user_query, result_ids, answer_model, response_text)
             
             if response_text:
                 st.success("Insight Generated")
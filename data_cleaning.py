@@ -1,7 +1,5 @@
 import pandas as pd
-import re
-import nltk
-from nltk.corpus import stopwords
+from text_cleaning import get_stop_words, clean_dataframe
 
 print("=" * 60)
 print("DATA CLEANING PIPELINE")
@@ -9,8 +7,7 @@ print("=" * 60)
 print()
 
 print("Step 1: Downloading NLTK stopwords...")
-nltk.download("stopwords", quiet=True)
-stop_words = set(stopwords.words("english"))
+stop_words = get_stop_words()
 print(f" Loaded {len(stop_words)} stopwords")
 print(f"Sample stopwords: {list(stop_words)[:10]}")
 print()
@@ -36,48 +33,16 @@ print(f" Removed {removed_duplicates} duplicate rows")
 print(f"Remaining rows: {len(df)}")
 print()
 
-print("Step 4: Converting text to lowercase...")
+print("Step 4: Cleaning text (lowercase, punctuation, stopwords, whitespace)...")
 text_columns = df.select_dtypes(include=["object"]).columns
 for col in text_columns:
-    df[col] = df[col].astype(str).str.lower()
-print(f" Converted {len(text_columns)} text columns to lowercase")
+    df[col] = df[col].astype(str)
+df = clean_dataframe(df, text_columns)
+print(f" Cleaned {len(text_columns)} text columns in a single pass")
 print()
 
 
-print("Step 5: Removing punctuation...")
-def remove_punctuation(text):
-    if isinstance(text, str):
-        return re.sub(r"[^\w\s]", "", text)
-    return text
-
-for col in text_columns:
-    df[col] = df[col].apply(remove_punctuation)
-print(f" Removed punctuation from all text columns")
-print()
-
-
-print("Step 6: Removing stopwords...")
-def remove_stopwords(text):
-    if isinstance(text, str):
-        return " ".join(
-            [word for word in text.split() if word not in stop_words]
-        )
-    return text
-
-for col in text_columns:
-    df[col] = df[col].apply(remove_stopwords)
-print(f" Removed stopwords from all text columns")
-print()
-
-
-print("Step 7: Removing extra spaces...")
-for col in text_columns:
-    df[col] = df[col].str.replace(r"\s+", " ", regex=True).str.strip()
-print(f" Normalized whitespace in all text columns")
-print()
-
-
-print("Step 8: Saving cleaned dataset...")
+print("Step 5: Saving cleaned dataset...")
 output_file = "datasets/amazon_dataset_cleaned.csv"
 df.to_csv(output_file, index=False)
 print(f" Saved cleaned data to '{output_file}'")
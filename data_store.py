@@ -0,0 +1,207 @@
+"""
+Data Store Module
+-----------------
+Columnar Parquet storage for the datasets/final data artifacts
+
+Every CSV/XLSX artifact can get a typed Parquet copy next to it
+(same name, .parquet extension). Low-cardinality text columns are stored
+as dictionary-encoded categoricals, so loads skip CSV text parsing. Date
+columns are parsed once, when the copy is written, and stored twice: as
+in the source and as datetime64 (a "<column>__parsed" column). Callers
+that ask for dates (read_table(..., parse_dates=True)) get the datetime
+column without re-parsing; the others see the source values.
+
+Producers write through write_table() / append_table(), so the copy is
+refreshed with the data and the next load does not fall back to the CSV.
+
+read_table() uses the Parquet copy when it is at least as new as the
+source file, and otherwise reads the source and refreshes the copy. This
+keeps it correct for files that other jobs still append to as CSV (e.g.
+news.py). Without pyarrow installed it falls back to the source file.
+"""
+
+import os
+
+import pandas as pd
+
+try:
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+# -----------------------------
+# STORAGE CONFIG
+# -----------------------------
+DATE_COLUMNS = ["review_date", "published_at", "created_date", "collected_at"]
+PARSED_SUFFIX = "__parsed"      # Stored datetime64 copy of a date column
+
+# Text columns with fewer unique values than this share of rows are stored as categoricals
+CATEGORICAL_MAX_RATIO = 0.5
+
+
+def parquet_path(path):
+    """Return the Parquet path stored alongside a CSV/XLSX file"""
+    return os.path.splitext(path)[0] + ".parquet"
+
+
+def _read_source(path, **kwargs):
+    if path.endswith((".xlsx", ".xls")):
+        return pd.read_excel(path, **kwargs)
+    return pd.read_csv(path, **kwargs)
+
+
+def parse_date_columns(df):
+    """Parse DATE_COLUMNS that are not datetimes yet, in place (invalid dates become NaT)"""
+    for col in DATE_COLUMNS:
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+    return df
+
+
+def drop_unused_categories(df):
+    """
+    Drop categories with no rows left (e.g. after filtering)
+
+    value_counts() and groupby() on categoricals otherwise report the
+    filtered-out values with a count of 0.
+    """
+    df = df.copy()
+    for col in df.select_dtypes(include=["category"]).columns:
+        df[col] = df[col].cat.remove_unused_categories()
+    return df
+
+
+def prepare_frame(df):
+    """
+    Apply storage types: categorize repetitive text and add parsed dates
+
+    Date columns are kept as read, so every consumer sees the same values
+    as from the source file, and get a datetime64 "<column>__parsed" copy.
+
+    Args:
+        df (pd.DataFrame): Data as read from CSV/XLSX
+
+    Returns:
+        pd.DataFrame: Typed copy of df
+    """
+    df = df.copy()
+
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            df[col + PARSED_SUFFIX] = pd.to_datetime(df[col], errors="coerce")
+
+    for col in df.select_dtypes(include=["object"]).columns:
+        # Mixed-type columns would fail Parquet conversion
+        df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+        if len(df) and df[col].nunique(dropna=True) <= CATEGORICAL_MAX_RATIO * len(df):
+            df[col] = df[col].astype("category")
+
+    return df
+
+
+def write_parquet(df, path):
+    """
+    Write the typed Parquet copy for a CSV/XLSX path
+
+    Returns:
+        bool: True if the Parquet file was written
+    """
+    if not PARQUET_AVAILABLE:
+        return False
+    prepare_frame(df).to_parquet(parquet_path(path), index=False)
+    return True
+
+
+def write_table(df, path, keep_source=True):
+    """
+    Save a DataFrame as Parquet, alongside (or instead of) its CSV/XLSX
+
+    Args:
+        df (pd.DataFrame): Data to save
+        path (str): CSV/XLSX path
+        keep_source (bool): Also write the CSV/XLSX file
+    """
+    if keep_source or not PARQUET_AVAILABLE:
+        if path.endswith((".xlsx", ".xls")):
+            df.to_excel(path, index=False)
+        else:
+            df.to_csv(path, index=False)
+    write_parquet(df, path)
+
+
+def append_table(df, path):
+    """
+    Append rows to a CSV artifact and refresh its Parquet copy
+
+    Args:
+        df (pd.DataFrame): New rows (same columns as the file)
+        path (str): CSV path; created with a header if missing
+    """
+    exists = os.path.exists(path)
+    # Read before appending, while the Parquet copy is still up to date
+    existing = read_table(path) if exists and PARQUET_AVAILABLE else None
+
+    df.to_csv(path, mode="a" if exists else "w", header=not exists, index=False)
+
+    if PARQUET_AVAILABLE:
+        write_parquet(df if existing is None else pd.concat([existing, df], ignore_index=True), path)
+
+
+def _stored_columns(names, columns, parse_dates):
+    """Stored columns to load for the requested ones, and renames back to their names"""
+    if columns is None:
+        columns = [name for name in names if not name.endswith(PARSED_SUFFIX)]
+    load, renames = [], {}
+    for col in columns:
+        parsed = col + PARSED_SUFFIX
+        if parse_dates and parsed in names:
+            load.append(parsed)
+            renames[parsed] = col
+        else:
+            load.append(col)
+    return load, renames
+
+
+def read_table(path, columns=None, categorical=False, parse_dates=False):
+    """
+    Load a dataset, preferring its Parquet copy when it is up to date
+
+    Args:
+        path (str): CSV/XLSX path
+        columns (list): Columns to load (default: all)
+        categorical (bool): Keep categorical columns as categoricals
+                            (smaller in memory). By default they are
+                            returned as plain object columns, matching
+                            what read_csv returns.
+        parse_dates (bool): Return DATE_COLUMNS as datetimes (invalid
+                            dates are NaT). By default they are
+                            returned as stored in the source.
+
+    Returns:
+        pd.DataFrame: Dataset
+    """
+    pq_path = parquet_path(path)
+    source_exists = os.path.exists(path)
+
+    if PARQUET_AVAILABLE and os.path.exists(pq_path) and (
+        not source_exists or os.path.getmtime(pq_path) >= os.path.getmtime(path)
+    ):
+        load, renames = _stored_columns(pq.read_schema(pq_path).names, columns, parse_dates)
+        df = pd.read_parquet(pq_path, columns=load).rename(columns=renames)
+    else:
+        df = prepare_frame(_read_source(path))
+        if PARQUET_AVAILABLE:
+            df.to_parquet(pq_path, index=False)
+        load, renames = _stored_columns(list(df.columns), columns, parse_dates)
+        df = df[load].rename(columns=renames)
+
+    if not categorical:
+        for col in df.select_dtypes(include=["category"]).columns:
+            df[col] = df[col].astype(object)
+
+    if parse_dates:
+        # Only Parquet copies written before the parsed columns need this
+        parse_date_columns(df)
+
+    return df
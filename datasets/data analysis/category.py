@@ -4,9 +4,10 @@
 
 
 import pandas as pd
-from transformers import pipeline
-import torch
 import re
+import sys
+sys.path.append('../..')
+from zeroshot_engine import ZeroShotCategorizer
 
 
 df = pd.read_csv("reduced_combined_cleaned_data.csv")
@@ -26,15 +27,6 @@ df_flipkart = df[df['source'].str.lower() == 'flipkart']
 df_non_flipkart = df[df['source'].str.lower() != 'flipkart']
 
 
-# Load zero-shot-classification pipeline
-
-device = 0 if torch.cuda.is_available() else -1
-classifier = pipeline("zero-shot-classification",
-                      model="facebook/bart-large-mnli",
-                      device=device
-                      )
-
-
 labels = [
     "Electricals_Power_Backup",
     "Home_Appliances",
@@ -58,6 +50,10 @@ labels = [
     "Fashion_Accessories",
 ]
 
+# zero-shot categorizer: label hypotheses tokenized once, MiniLM shortlist of top 5 labels
+
+categorizer = ZeroShotCategorizer(labels, top_k=5)
+
 # deduplicate flipkart products 
 
 unique_products =(
@@ -96,10 +92,7 @@ pred_rows = []
 for i in range(0, len(unique_products), batch_size):
     batch = unique_products[i : i + batch_size]
     texts = [item["cleaned_product"] for item in batch]
-    results = classifier(texts, labels)
-    
-    if isinstance(results, dict):
-        results = [results]
+    results = categorizer.classify(texts, batch_size=batch_size)
         
     for item, res in zip(batch, results):
         override_category = keyword_override(item["cleaned_product"])
@@ -1,12 +1,11 @@
 import pandas as pd
-import re
-import nltk
-from nltk.corpus import stopwords
+import sys
+sys.path.append('../..')
+from text_cleaning import get_stop_words, clean_dataframe
 
 
 # download NLTK stopwords  
-nltk.download("stopwords")
-stop_words= set(stopwords.words("english"))
+stop_words= get_stop_words()
 
 print(stop_words)
 
@@ -18,34 +17,11 @@ df = pd.read_csv("data/flipkart_product.csv", encoding="latin1", engine="python"
 # drop exact duplicate rows
 df = df.drop_duplicates()
 
-# lowercase all text columns
-for col in df.select_dtypes(include=["object"]).columns:
-    df[col] = df[col].astype(str).str.lower()
-
-
-# remove_punctuation
-def remove_punctuation(text):
-    if isinstance(text,str):
-        return re.sub(r"[^\w\s]","",text)
-    return text
-
-for col in df.select_dtypes(include=["object"]).columns:
-    df[col] = df[col].apply(remove_punctuation)
-    
-# remove stopwords 
-def remove_stopwords(text):
-    if isinstance(text, str):
-        return " ".join(
-            [word for word in text.split() if word not in stop_words]
-        )
-    return text
-
-for col in df.select_dtypes(include=["object"]).columns:
-    df[col] = df[col].apply(remove_stopwords)
-    
-# remove extra spaces
-for col in df.select_dtypes(include=["object"]).columns:
-    df[col] = df[col].str.replace(r"\s+", " ", regex=True).str.strip()
+# lowercase, remove punctuation, stopwords and extra spaces in one pass
+text_columns = df.select_dtypes(include=["object"]).columns
+for col in text_columns:
+    df[col] = df[col].astype(str)
+df = clean_dataframe(df, text_columns)
 
 # save cleaned Output
 df.to_csv("fipkart_product_cleaned.csv", index=False)
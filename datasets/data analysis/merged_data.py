@@ -1,41 +1,8 @@
 import pandas as pd
 import re
-import nltk
-from nltk.corpus import stopwords
-
-
-# # download NLTK stopwords  
-nltk.download("stopwords")
-stop_words= set(stopwords.words("english"))
-
-
-# cleaning function  
-def clean_lowercase(text):
-    if isinstance(text, str):
-        return text.lower()
-    return text
-
-def clean_punctuation(text):
-    if isinstance(text, str):
-        return re.sub(r"[^\w\s]","",text)
-    return text
-
-def clean_stopwords(text):
-    if isinstance(text, str):
-        return " ".join([w for w in text.split() if w not in stop_words])
-    return text
-
-def clean_whitespace(text):
-    if isinstance(text, str):
-        return re.sub(r"\s+"," ",text).strip()
-    return text
-
-def clean_text(text):
-    text = clean_lowercase(text)
-    text = clean_punctuation(text)
-    text = clean_stopwords(text)
-    text = clean_whitespace(text)
-    return text
+import sys
+sys.path.append('../..')
+from text_cleaning import clean_series
 
 
 # load files  
@@ -105,10 +72,10 @@ df = pd.concat([df_flip,df_amazon], ignore_index=True)
 
 
 # clean review_text
-df["cleaned_text"]=df["review_text"].astype(str).apply(clean_text)
+df["cleaned_text"]=clean_series(df["review_text"].astype(str))
 
 # clean prduct name 
-df["product"]=df["product"].astype(str).apply(clean_text)
+df["product"]=clean_series(df["product"].astype(str))
 
 
 # add sentiment_score
@@ -1,7 +1,9 @@
 import pandas as pd
 import re
-from sklearn.feature_extraction.text import CountVectorizer
 from sklearn.decomposition import LatentDirichletAllocation
+import sys
+sys.path.append('../..')
+from dtm_cache import vectorize_cached
 
 
 # config 
@@ -75,14 +77,20 @@ for category, df_cat in df.groupby("category"):
     print(f"\n Running LDA for category: {category} ({len(df_cat)} reviews)")
     
     
-    vectorizer = CountVectorizer(
-        stop_words="english",
-        max_df=MAX_DF,
-        min_df=MIN_DF,
-        ngram_range=(1,2)   #capture phrases like "battery life"
+    # cached per category, so changing topics / max_iter skips tokenization
+    dtm = vectorize_cached(
+        df_cat["lda_text"].tolist(),
+        dict(
+            stop_words="english",
+            max_df=MAX_DF,
+            min_df=MIN_DF,
+            ngram_range=(1,2)   #capture phrases like "battery life"
+        ),
+        row_ids=df_cat.index.to_numpy(),
+        name=category
     )
     
-    doc_term_matrix = vectorizer.fit_transform(df_cat["lda_text"])
+    doc_term_matrix = dtm.matrix
     
     if doc_term_matrix.shape[1]<NUM_TOPICS_PER_CATEGORY:
         print(f"skipping {category} (not enough unique terms)")
@@ -97,7 +105,7 @@ for category, df_cat in df.groupby("category"):
     
     lda.fit(doc_term_matrix)
     
-    feature_names = vectorizer.get_feature_names_out()
+    feature_names = dtm.feature_names
     topic_word_map = get_topic_words(lda, feature_names, TOP_WORDS)
     
     print(f"\n Topics discovered for category: {category}")
@@ -0,0 +1,156 @@
+"""
+Document-Term Matrix Cache
+--------------------------
+Shared, on-disk cache of CountVectorizer output for the topic modeling scripts
+
+Vectorizing with bigrams is the slowest part of an LDA run that does not
+change when only the model settings (number of topics, max_iter, ...)
+do. vectorize_cached() stores each matrix under a key built from:
+
+- the input texts and their row ids (review index)
+- the vectorizer parameters
+- the scikit-learn version
+
+A cache entry is a directory in cache/dtm/:
+
+- data.npy, indices.npy, indptr.npy  → the CSR matrix, memory-mapped on load
+- vocab.json                         → feature names, in column order
+- rows.npy                           → row -> review id mapping
+- meta.json                          → shape, parameters, name
+
+On a hit nothing is tokenized; the arrays are memory-mapped from disk.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+
+import numpy as np
+import scipy.sparse as sp
+import sklearn
+from sklearn.feature_extraction.text import CountVectorizer
+
+# -----------------------------
+# CACHE CONFIG
+# -----------------------------
+CACHE_DIR = os.getenv("DTM_CACHE_DIR", "cache/dtm")
+CACHE_ENABLED = os.getenv("DTM_CACHE_ENABLED", "1") != "0"
+
+
+class DocumentTermMatrix:
+    """CSR document-term matrix with its vocabulary and row -> review ids"""
+
+    def __init__(self, matrix, feature_names, row_ids, cached=False):
+        self.matrix = matrix
+        self.feature_names = feature_names
+        self.row_ids = row_ids
+        self.cached = cached
+
+    @property
+    def shape(self):
+        return self.matrix.shape
+
+
+def cache_key(texts, vectorizer_params, row_ids=None):
+    """
+    Hash the inputs that determine a document-term matrix
+
+    Args:
+        texts (list): Documents
+        vectorizer_params (dict): CountVectorizer arguments
+        row_ids (list): Row -> review ids (default: positions)
+
+    Returns:
+        str: SHA-1 hex digest
+    """
+    digest = hashlib.sha1()
+    digest.update(sklearn.__version__.encode("utf-8"))
+    digest.update(json.dumps(vectorizer_params, sort_keys=True, default=str).encode("utf-8"))
+    for text in texts:
+        digest.update(str(text).encode("utf-8"))
+        digest.update(b"\0")
+    if row_ids is not None:
+        digest.update(np.asarray(row_ids).tobytes())
+    return digest.hexdigest()
+
+
+def _entry_dir(key, name=None):
+    prefix = re.sub(r"[^A-Za-z0-9_-]+", "_", str(name)).strip("_") + "-" if name else ""
+    return os.path.join(CACHE_DIR, f"{prefix}{key[:20]}")
+
+
+def _load(path):
+    with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    with open(os.path.join(path, "vocab.json"), "r", encoding="utf-8") as f:
+        feature_names = np.array(json.load(f), dtype=object)
+
+    arrays = {
+        part: np.load(os.path.join(path, f"{part}.npy"), mmap_mode="r")
+        for part in ("data", "indices", "indptr", "rows")
+    }
+    matrix = sp.csr_matrix(
+        (arrays["data"], arrays["indices"], arrays["indptr"]),
+        shape=tuple(meta["shape"]),
+        copy=False
+    )
+    return DocumentTermMatrix(matrix, feature_names, arrays["rows"], cached=True)
+
+
+def _save(path, dtm, meta):
+    # Write into a temp directory and rename, so readers never see half an entry
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = tempfile.mkdtemp(dir=CACHE_DIR, prefix=".tmp-")
+    try:
+        matrix = dtm.matrix.tocsr()
+        np.save(os.path.join(tmp, "data.npy"), matrix.data)
+        np.save(os.path.join(tmp, "indices.npy"), matrix.indices)
+        np.save(os.path.join(tmp, "indptr.npy"), matrix.indptr)
+        np.save(os.path.join(tmp, "rows.npy"), np.asarray(dtm.row_ids))
+        with open(os.path.join(tmp, "vocab.json"), "w", encoding="utf-8") as f:
+            json.dump([str(t) for t in dtm.feature_names], f)
+        with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2, default=str)
+        os.replace(tmp, path)
+    except OSError:
+        # Another process stored the same entry first
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def vectorize_cached(texts, vectorizer_params, row_ids=None, name=None):
+    """
+    Return the document-term matrix for texts, from cache when possible
+
+    Args:
+        texts (list): Documents (already cleaned)
+        vectorizer_params (dict): CountVectorizer arguments
+        row_ids (list): Row -> review ids stored with the matrix
+                        (default: positions 0..n-1)
+        name (str): Readable prefix for the cache entry (e.g. category)
+
+    Returns:
+        DocumentTermMatrix: matrix, feature_names, row_ids, cached
+    """
+    texts = list(texts)
+    row_ids = np.arange(len(texts)) if row_ids is None else np.asarray(row_ids)
+
+    key = cache_key(texts, vectorizer_params, row_ids) if CACHE_ENABLED else None
+    path = _entry_dir(key, name) if key else None
+    if path and os.path.exists(os.path.join(path, "meta.json")):
+        return _load(path)
+
+    vectorizer = CountVectorizer(**vectorizer_params)
+    matrix = vectorizer.fit_transform(texts).tocsr()
+    dtm = DocumentTermMatrix(matrix, vectorizer.get_feature_names_out(), row_ids)
+
+    if path:
+        _save(path, dtm, {
+            "name": name,
+            "shape": list(matrix.shape),
+            "vectorizer_params": vectorizer_params,
+            "sklearn_version": sklearn.__version__
+        })
+    return dtm
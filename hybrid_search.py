@@ -0,0 +1,366 @@
+"""
+Hybrid Search Module
+--------------------
+BM25 + dense retrieval with reciprocal-rank fusion and optional
+cross-encoder reranking
+
+Dense (MiniLM) similarity tends to miss queries that hinge on exact
+product or brand names ("boat earphones", "inverter"). A BM25 index
+over the same documents catches those. The two ranked lists are fused
+with reciprocal-rank fusion (RRF):
+
+    score(d) = sum over lists of 1 / (RRF_K + rank of d in the list)
+
+and the top fused candidates can be reranked by a small cross-encoder.
+
+The BM25 index is saved in the FAISS index folder (bm25/) by
+create_vector_db.py. It is rebuilt from the docstore whenever the index
+version changes, so it always covers the same live documents, keyed by
+FAISS position (filters from vector_store.select_positions() apply to both).
+
+Latency budget
+--------------
+The BM25 and dense searches always run. Reranking only scores as many
+candidates as fit in what is left of the budget, based on the measured
+cross-encoder time per pair, and is skipped when fewer than
+RERANK_MIN_CANDIDATES fit.
+"""
+
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import CountVectorizer
+
+from vector_store import INDEX_PATH, documents_at, embed_query, index_version, search_vector
+
+# -----------------------------
+# HYBRID SEARCH CONFIG
+# -----------------------------
+BM25_DIR = "bm25"           # Folder inside the FAISS index folder
+BM25_K1 = 1.5               # Term frequency saturation
+BM25_B = 0.75               # Document length normalization
+TOKEN_PATTERN = r"(?u)\b\w+\b"   # Keeps short tokens such as model numbers
+
+CANDIDATES = 50             # Results taken from each retriever before fusion
+RRF_K = 60                  # Rank damping constant of reciprocal-rank fusion
+
+RERANK_ENABLED = os.getenv("HYBRID_RERANK", "0") == "1"
+RERANK_MODEL = os.getenv("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+RERANK_TOP_N = 20           # Fused candidates passed to the cross-encoder
+RERANK_MIN_CANDIDATES = 5   # Skip reranking if fewer fit in the budget
+LATENCY_BUDGET_MS = int(os.getenv("HYBRID_LATENCY_BUDGET_MS", "0")) or None   # None = no budget
+
+
+def _analyzer():
+    return CountVectorizer(token_pattern=TOKEN_PATTERN).build_analyzer()
+
+
+# -----------------------------
+# BM25 Index
+# -----------------------------
+class BM25Index:
+    """Sparse BM25 index over the live documents of a FAISS index"""
+
+    def __init__(self, weights, vocabulary, positions, version):
+        """
+        Args:
+            weights: (documents x terms) BM25 term weights
+            vocabulary (dict): term -> column
+            positions (np.ndarray): FAISS position of each row
+            version (int): Index version the BM25 index was built for
+        """
+        self.weights = sp.csc_matrix(weights)   # Column slices per query term
+        self.vocabulary = vocabulary
+        self.positions = np.asarray(positions, dtype="int64")
+        self.version = version
+        self.analyzer = _analyzer()
+
+    @classmethod
+    def build(cls, texts, positions, version, k1=BM25_K1, b=BM25_B):
+        """
+        Build the index from document texts
+
+        The full BM25 weight of every (document, term) pair is computed
+        here, so a query only sums the columns of its terms.
+        """
+        vectorizer = CountVectorizer(token_pattern=TOKEN_PATTERN, dtype=np.float32)
+        counts = vectorizer.fit_transform(texts).tocsr()
+
+        n_docs = counts.shape[0]
+        doc_len = np.asarray(counts.sum(axis=1)).ravel()
+        avg_len = doc_len.mean() if n_docs else 1.0
+        doc_freq = np.bincount(counts.indices, minlength=counts.shape[1])
+        idf = np.log1p((n_docs - doc_freq + 0.5) / (doc_freq + 0.5)).astype("float32")
+
+        tf = counts.data
+        row_len = np.repeat(doc_len, np.diff(counts.indptr))
+        counts.data = idf[counts.indices] * tf * (k1 + 1) / (tf + k1 * (1 - b + b * row_len / avg_len))
+
+        vocabulary = {term: int(column) for term, column in vectorizer.vocabulary_.items()}
+        return cls(counts, vocabulary, positions, version)
+
+    def search(self, query, k=CANDIDATES, positions=None):
+        """
+        Top-k documents by BM25 score
+
+        Args:
+            query (str): Search text
+            k (int): Results to return
+            positions (np.ndarray): Restrict to these FAISS positions
+
+        Returns:
+            list: FAISS positions, best first (only documents sharing a term)
+        """
+        columns = [self.vocabulary[t] for t in set(self.analyzer(query)) if t in self.vocabulary]
+        if not columns:
+            return []
+
+        scores = np.asarray(self.weights[:, columns].sum(axis=1)).ravel()
+        if positions is not None:
+            scores[~np.isin(self.positions, positions)] = 0
+
+        matched = np.flatnonzero(scores > 0)
+        if len(matched) > k:
+            matched = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        matched = matched[np.argsort(-scores[matched], kind="stable")]
+        return self.positions[matched].tolist()
+
+    def save(self, directory):
+        """Write the index (to a temporary folder first, then swap it in)"""
+        tmp_dir = directory + ".tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+
+        sp.save_npz(os.path.join(tmp_dir, "weights.npz"), self.weights)
+        np.save(os.path.join(tmp_dir, "positions.npy"), self.positions)
+        with open(os.path.join(tmp_dir, "vocab.json"), "w", encoding="utf-8") as f:
+            json.dump(self.vocabulary, f)
+        with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"version": self.version, "documents": len(self.positions),
+                       "k1": BM25_K1, "b": BM25_B}, f)
+
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(tmp_dir, directory)
+
+    @classmethod
+    def load(cls, directory):
+        """Load a saved index (None if there is none)"""
+        meta_path = os.path.join(directory, "meta.json")
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        with open(os.path.join(directory, "vocab.json"), "r", encoding="utf-8") as f:
+            vocabulary = json.load(f)
+        return cls(
+            sp.load_npz(os.path.join(directory, "weights.npz")),
+            vocabulary,
+            np.load(os.path.join(directory, "positions.npy")),
+            meta["version"]
+        )
+
+
+def build_bm25_index(vector_db, version):
+    """Build a BM25 index over the live (not tombstoned) documents of vector_db"""
+    positions, texts = [], []
+    for position, store_id in vector_db.index_to_docstore_id.items():
+        document = vector_db.docstore.search(store_id)
+        if isinstance(document, str) or document.metadata.get("deleted"):
+            continue
+        positions.append(position)
+        texts.append(document.page_content)
+    return BM25Index.build(texts, positions, version)
+
+
+def load_bm25_index(vector_db, version=None, path=INDEX_PATH):
+    """
+    Load the saved BM25 index, rebuilding it if it is missing or stale
+
+    Args:
+        vector_db (FAISS): Loaded vector store
+        version (int): Version of the loaded index (default: the saved manifest's)
+        path (str): FAISS index folder
+
+    Returns:
+        BM25Index
+    """
+    version = index_version(path) if version is None else version
+    directory = os.path.join(path, BM25_DIR)
+    bm25 = BM25Index.load(directory)
+    if bm25 is None or bm25.version != version:
+        bm25 = build_bm25_index(vector_db, version)
+        bm25.save(directory)
+    return bm25
+
+
+# -----------------------------
+# Fusion & Reranking
+# -----------------------------
+def reciprocal_rank_fusion(rankings, k=RRF_K):
+    """
+    Fuse ranked lists with reciprocal-rank fusion
+
+    Args:
+        rankings (list): Ranked lists of ids, best first
+        k (int): Rank damping constant
+
+    Returns:
+        list: Ids by fused score, best first (ties keep first-seen order)
+    """
+    scores = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, 1):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank)
+    return sorted(scores, key=scores.get, reverse=True)
+
+
+class CrossEncoderReranker:
+    """Cross-encoder relevance scores, with measured latency per pair"""
+
+    def __init__(self, model_name=RERANK_MODEL, batch_size=32):
+        from sentence_transformers import CrossEncoder
+
+        self.model = CrossEncoder(model_name, max_length=256)
+        self.batch_size = batch_size
+        self.seconds_per_pair = None
+
+    def score(self, query, texts):
+        """Relevance score of each text for the query"""
+        start = time.perf_counter()
+        scores = self.model.predict([(query, text) for text in texts], batch_size=self.batch_size)
+        elapsed = (time.perf_counter() - start) / max(len(texts), 1)
+        # Moving average, so one slow call (e.g. model warm-up) does not stick
+        self.seconds_per_pair = elapsed if self.seconds_per_pair is None else 0.8 * self.seconds_per_pair + 0.2 * elapsed
+        return np.asarray(scores, dtype="float32")
+
+    def max_pairs(self, seconds):
+        """Pairs that can be scored in the given time (None until measured)"""
+        if self.seconds_per_pair is None:
+            return None
+        return int(seconds / self.seconds_per_pair) if self.seconds_per_pair > 0 else None
+
+
+# -----------------------------
+# Hybrid Retriever
+# -----------------------------
+class HybridRetriever:
+    """BM25 + dense retrieval, usable in place of vector_db.similarity_search"""
+
+    def __init__(self, vector_db, bm25, reranker=None, candidates=CANDIDATES, rrf_k=RRF_K,
+                 rerank_top_n=RERANK_TOP_N, budget_ms=LATENCY_BUDGET_MS):
+        """
+        Args:
+            vector_db (FAISS): Loaded vector store
+            bm25 (BM25Index): BM25 index over the same documents
+            reranker (CrossEncoderReranker): Optional reranker for the top candidates
+            candidates (int): Results taken from each retriever before fusion
+            rrf_k (int): Reciprocal-rank fusion constant
+            rerank_top_n (int): Fused candidates passed to the reranker
+            budget_ms (float): Default latency budget per search (None = no budget)
+        """
+        self.vector_db = vector_db
+        self.bm25 = bm25
+        self.reranker = reranker
+        self.candidates = candidates
+        self.rrf_k = rrf_k
+        self.rerank_top_n = rerank_top_n
+        self.budget_ms = budget_ms
+        self.last_timings = {}
+
+    @property
+    def cache_id(self):
+        """Identifies the retrieval settings in cache keys (see rag_cache.py)"""
+        rerank = f"rerank-{self.rerank_top_n}" if self.reranker is not None else "norerank"
+        return f"hybrid:{self.candidates}:{self.rrf_k}:{rerank}"
+
+    def search_positions(self, query, k=10, positions=None, vector=None, budget_ms=None):
+        """
+        Hybrid search returning FAISS positions
+
+        Args:
+            query (str): Search text
+            k (int): Results to return
+            positions (np.ndarray): Restrict the search to these FAISS positions
+            vector (np.ndarray): Precomputed query embedding (embed_query())
+            budget_ms (float): Latency budget for this search (default: self.budget_ms)
+
+        Returns:
+            list: Up to k FAISS positions, best first
+        """
+        start = time.perf_counter()
+        budget_ms = self.budget_ms if budget_ms is None else budget_ms
+
+        sparse = self.bm25.search(query, self.candidates, positions)
+        bm25_done = time.perf_counter()
+
+        if vector is None:
+            vector = embed_query(self.vector_db, query)
+        dense = search_vector(self.vector_db, vector, self.candidates, positions)
+        dense_done = time.perf_counter()
+
+        fused = reciprocal_rank_fusion([dense, sparse], self.rrf_k)
+
+        n_rerank = 0
+        if self.reranker is not None and len(fused) > 1:
+            n_rerank = min(self.rerank_top_n, len(fused))
+            if budget_ms:
+                remaining = budget_ms / 1000 - (dense_done - start)
+                fits = self.reranker.max_pairs(remaining)
+                if fits is not None:
+                    n_rerank = min(n_rerank, fits)
+            if n_rerank >= RERANK_MIN_CANDIDATES:
+                head = fused[:n_rerank]
+                texts = [d.page_content for d in documents_at(self.vector_db, head)]
+                scores = self.reranker.score(query, texts)
+                fused = [head[i] for i in np.argsort(-scores, kind="stable")] + fused[n_rerank:]
+            else:
+                n_rerank = 0
+
+        self.last_timings = {
+            "bm25_ms": (bm25_done - start) * 1000,
+            "dense_ms": (dense_done - bm25_done) * 1000,
+            "rerank_ms": (time.perf_counter() - dense_done) * 1000,
+            "reranked": n_rerank
+        }
+        return fused[:k]
+
+    def similarity_search(self, query, k=4, filter=None, positions=None, budget_ms=None, **kwargs):
+        """
+        Drop-in for FAISS.similarity_search
+
+        Args:
+            query (str): Search text
+            k (int): Documents to return
+            filter (callable): Optional metadata predicate, applied to the fused candidates
+            positions (np.ndarray): Restrict the search to these FAISS positions
+            budget_ms (float): Latency budget for this search
+
+        Returns:
+            list: Up to k Documents
+        """
+        n = self.candidates if filter is not None else k
+        documents = documents_at(self.vector_db, self.search_positions(query, n, positions, budget_ms=budget_ms))
+        if filter is not None:
+            documents = [d for d in documents if filter(d.metadata)]
+        return documents[:k]
+
+
+def load_hybrid_retriever(vector_db, version=None, path=INDEX_PATH, rerank=RERANK_ENABLED):
+    """
+    Hybrid retriever for a loaded vector store
+
+    Args:
+        vector_db (FAISS): Loaded vector store
+        version (int): Version of the loaded index (default: the saved manifest's)
+        path (str): FAISS index folder
+        rerank (bool): Load the cross-encoder reranker (HYBRID_RERANK=1)
+
+    Returns:
+        HybridRetriever
+    """
+    reranker = CrossEncoderReranker() if rerank else None
+    return HybridRetriever(vector_db, load_bm25_index(vector_db, version, path), reranker)
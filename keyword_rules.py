@@ -0,0 +1,123 @@
+"""
+Keyword Rules Module
+--------------------
+Compiled keyword-rule matching for product categorization
+
+Rule tables live as JSON in rules/ (edit them there, not in code):
+
+    {
+        "default": "Others",
+        "rules": [
+            {"category": "Mobile Phones", "keywords": ["phone", "mobile"]},
+            {"category": "Electronics", "keywords": ["speaker"],
+             "patterns": ["\\\\b\\\\d+\\\\s*watts?\\\\b"]}
+        ]
+    }
+
+Keywords match as plain substrings (like `word in text`), patterns as
+regular expressions. Rules are checked in order and the first rule with
+any hit wins, exactly like the if/elif chains they replace.
+
+All rules are compiled into one regex of named groups inside a lookahead,
+so a single scan finds every rule hit at every position (overlapping hits
+included). Within a position the alternatives are tried in rule order, and
+across positions the lowest rule index wins.
+"""
+
+import json
+import re
+
+import pandas as pd
+
+# -----------------------------
+# RULE TABLES
+# -----------------------------
+PRODUCT_CATEGORY_RULES = "rules/product_category_rules.json"
+ZEROSHOT_OVERRIDE_RULES = "rules/zeroshot_override_rules.json"
+
+
+class KeywordMatcher:
+    """First-match-wins keyword classifier compiled into a single regex"""
+
+    def __init__(self, rules, default=None, lowercase=True):
+        """
+        Args:
+            rules (list): Ordered {"category", "keywords", "patterns"} dicts
+            default: Category returned when no rule matches
+            lowercase (bool): Lowercase texts before matching
+        """
+        self.rules = list(rules)
+        self.categories = [rule["category"] for rule in self.rules]
+        self.default = default
+        self.lowercase = lowercase
+
+        groups = []
+        for i, rule in enumerate(self.rules):
+            alternatives = [re.escape(word) for word in rule.get("keywords", [])]
+            alternatives += list(rule.get("patterns", []))
+            if alternatives:
+                groups.append(f"(?P<r{i}>{'|'.join(alternatives)})")
+        self.regex = re.compile("(?=" + "|".join(groups) + ")") if groups else None
+
+    @classmethod
+    def from_json(cls, path, lowercase=True):
+        """Load a matcher from a JSON rule table"""
+        with open(path, "r", encoding="utf-8") as f:
+            table = json.load(f)
+        return cls(table["rules"], default=table.get("default"), lowercase=lowercase)
+
+    def match(self, text):
+        """
+        Find the rule that fires for one text
+
+        Returns:
+            tuple: (category, rule_index, matched_text); rule_index and
+                   matched_text are None when no rule matched
+        """
+        if self.regex is None or text is None or (isinstance(text, float) and pd.isna(text)):
+            return self.default, None, None
+
+        text = str(text).lower() if self.lowercase else str(text)
+        best_rule, best_text = None, None
+        for m in self.regex.finditer(text):
+            rule = int(m.lastgroup[1:])
+            if best_rule is None or rule < best_rule:
+                best_rule, best_text = rule, m.group(m.lastgroup)
+                if rule == 0:
+                    break
+
+        if best_rule is None:
+            return self.default, None, None
+        return self.categories[best_rule], best_rule, best_text
+
+    def categorize(self, text):
+        """Return only the category for one text"""
+        return self.match(text)[0]
+
+    def match_series(self, series):
+        """
+        Classify a whole Series, scanning each distinct value once
+
+        Args:
+            series (pd.Series): Texts to classify
+
+        Returns:
+            pd.DataFrame: Same index as series, with columns category,
+                          rule (index into the rule table, <NA> if none)
+                          and keyword (the text that fired the rule)
+        """
+        codes, uniques = pd.factorize(series)
+        matches = [self.match(value) for value in uniques]
+        # Missing values get the default (factorize code -1 -> last row)
+        matches.append((self.default, None, None))
+
+        table = pd.DataFrame(matches, columns=["category", "rule", "keyword"])
+        table["rule"] = table["rule"].astype("Int64")
+        result = table.iloc[codes].reset_index(drop=True)
+        result.index = series.index
+        return result
+
+
+def load_matcher(path, lowercase=True):
+    """Load and compile a rule table (see KeywordMatcher.from_json)"""
+    return KeywordMatcher.from_json(path, lowercase=lowercase)
@@ -0,0 +1,203 @@
+"""
+LLM Categorizer Module
+----------------------
+Batched, memoized Gemini product categorization
+
+Product names that keyword rules cannot place are:
+
+1. Normalized (lowercase, collapsed whitespace) and deduplicated
+2. Looked up in an on-disk SQLite cache (the SentimentCache store, in
+   its own file), keyed by model, prompt version and category list
+3. Packed BATCH_SIZE at a time into one prompt that asks for a JSON
+   array of {"id", "category"} objects
+4. Sent concurrently (MAX_WORKERS threads) under a shared token bucket
+
+So LLM calls scale with the number of unique unknown products, not rows.
+Only valid answers (a category from the list) are cached. Names whose
+batch failed, that the response left out, or that got an unknown
+category are returned as the fallback category but not cached, so the
+next run retries them.
+"""
+
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from google.genai import types
+
+from rate_limiter import TokenBucket
+from sentiment_cache import SentimentCache
+
+# -----------------------------
+# CATEGORIZER CONFIG
+# -----------------------------
+GEMINI_MODEL = "gemini-2.5-flash"
+PROMPT_VERSION = "product-category-v1"   # Bump when the prompt changes
+CACHE_PATH = os.getenv("CATEGORY_CACHE_PATH", "cache/category_cache.sqlite")
+BATCH_SIZE = 50             # Product names per prompt
+MAX_WORKERS = 4             # Concurrent Gemini requests
+REQUESTS_PER_SECOND = float(os.getenv("GEMINI_REQUESTS_PER_SECOND", "1"))
+FALLBACK_CATEGORY = "Others"
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_name(name):
+    """Normalize a product name for deduplication and caching"""
+    return _WHITESPACE_RE.sub(" ", str(name)).strip().lower()
+
+
+def build_prompt(names, categories):
+    """
+    Build one prompt classifying several products
+
+    Args:
+        names (list): Product names; their list positions are the ids
+        categories (list): Allowed categories
+
+    Returns:
+        str: Prompt asking for a JSON array of {"id", "category"}
+    """
+    products = "\n".join(f"{i}. {name}" for i, name in enumerate(names))
+    return f"""Classify each product into ONE category.
+
+Categories: {", ".join(categories)}
+
+Products:
+{products}
+
+Return a JSON array with one object per product:
+[{{"id": <product number>, "category": "<category name>"}}]"""
+
+
+def parse_response(text, count, categories):
+    """
+    Parse a JSON categorization response
+
+    Args:
+        text (str): Model response
+        count (int): Number of products in the prompt
+        categories (list): Allowed categories
+
+    Returns:
+        list: One category per product, in prompt order; None where the
+              response has no valid answer for that product
+
+    Raises:
+        ValueError: If the response is not a JSON array
+    """
+    data = json.loads(text)
+    if not isinstance(data, list):
+        raise ValueError(f"expected a JSON array, got {type(data).__name__}")
+
+    allowed = {c.lower(): c for c in categories}
+    results = [None] * count
+
+    for item in data:
+        if not isinstance(item, dict):
+            continue
+        try:
+            idx = int(item["id"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if 0 <= idx < count:
+            results[idx] = allowed.get(str(item.get("category", "")).strip().lower())
+
+    return results
+
+
+class LLMCategorizer:
+    """Deduplicating, cached, rate-limited batch categorizer"""
+
+    def __init__(self, client, categories, model=GEMINI_MODEL, batch_size=BATCH_SIZE,
+                 max_workers=MAX_WORKERS, requests_per_second=REQUESTS_PER_SECOND,
+                 cache_path=CACHE_PATH, fallback=FALLBACK_CATEGORY):
+        """
+        Args:
+            client: google-genai client (anything with models.generate_content)
+            categories (list): Allowed categories
+            cache_path (str): SQLite cache file, or None to disable caching
+        """
+        self.client = client
+        self.categories = list(categories)
+        self.model = model
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.limiter = TokenBucket(requests_per_second)
+        self.fallback = fallback
+        self.cache = SentimentCache(path=cache_path) if cache_path else None
+
+        # Changing the model, prompt or category list invalidates cached answers
+        labels_hash = hashlib.sha1("|".join(self.categories).encode("utf-8")).hexdigest()[:8]
+        self.cache_id = f"{model}:{PROMPT_VERSION}:{labels_hash}"
+
+        self.stats = {"unique": 0, "cached": 0, "requests": 0, "failed": 0}
+
+    def _classify_batch(self, names):
+        """Classify one batch with a single request; returns None on failure"""
+        self.limiter.acquire()
+        try:
+            response = self.client.models.generate_content(
+                model=self.model,
+                contents=build_prompt(names, self.categories),
+                config=types.GenerateContentConfig(
+                    temperature=0.1,
+                    response_mime_type="application/json"
+                )
+            )
+            return parse_response(response.text, len(names), self.categories)
+        except Exception as e:
+            print(f"⚠️ LLM Error ({len(names)} products): {str(e)[:100]}")
+            return None
+
+    def categorize(self, product_names):
+        """
+        Categorize product names
+
+        Args:
+            product_names (list): Names (duplicates are classified once)
+
+        Returns:
+            list: One category per input name, in input order
+        """
+        keys = [normalize_name(name) for name in product_names]
+        unique = [key for key in dict.fromkeys(keys) if key]
+        self.stats["unique"] += len(unique)
+
+        hashes = {key: hashlib.sha1(key.encode("utf-8")).hexdigest() for key in unique}
+        cached = self.cache.get_many(self.cache_id, list(hashes.values())) if self.cache else {}
+        results = {key: cached[h] for key, h in hashes.items() if h in cached}
+        self.stats["cached"] += len(results)
+
+        pending = [key for key in unique if key not in results]
+        batches = [pending[i:i + self.batch_size] for i in range(0, len(pending), self.batch_size)]
+
+        if batches:
+            print(f"  🤖 Gemini: {len(pending)} unique products in {len(batches)} requests")
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                answers = list(executor.map(self._classify_batch, batches))
+
+            new_entries = {}
+            for batch, categories in zip(batches, answers):
+                self.stats["requests"] += 1
+                if categories is None:
+                    categories = [None] * len(batch)
+                for key, category in zip(batch, categories):
+                    if category is None:
+                        # No valid answer: use the fallback now, retry next run
+                        self.stats["failed"] += 1
+                        results[key] = self.fallback
+                    else:
+                        new_entries[hashes[key]] = category
+                        results[key] = category
+
+            if self.cache and new_entries:
+                self.cache.put_many(self.cache_id, new_entries)
+
+        return [results.get(key, self.fallback) for key in keys]
+
+    def close(self):
+        if self.cache:
+            self.cache.close()
@@ -6,8 +6,7 @@ Combines two different data sources into one unified format
 
 import pandas as pd
 import re
-import nltk
-from nltk.corpus import stopwords
+from text_cleaning import get_stop_words, clean_series
 
 print("=" * 60)
 print("MERGING FLIPKART + AMAZON DATASETS")
@@ -18,41 +17,13 @@ print()
 # 1. Download stopwords
 # --------------------------
 print("Step 1: Loading stopwords...")
-nltk.download("stopwords", quiet=True)
-stop_words = set(stopwords.words("english"))
+stop_words = get_stop_words()
 print(f"✓ Loaded {len(stop_words)} stopwords")
 print()
 
 # --------------------------
 # CLEANING FUNCTIONS
 # --------------------------
-def clean_lowercase(text):
-    if isinstance(text, str):
-        return text.lower()
-    return text
-
-def clean_punctuation(text):
-    if isinstance(text, str):
-        return re.sub(r"[^\w\s]", "", text)
-    return text
-
-def clean_stopwords(text):
-    if isinstance(text, str):
-        return " ".join([w for w in text.split() if w not in stop_words])
-    return text
-
-def clean_whitespace(text):
-    if isinstance(text, str):
-        return re.sub(r"\s+", " ", text).strip()
-    return text
-
-def clean_text(text):
-    text = clean_lowercase(text)
-    text = clean_punctuation(text)
-    text = clean_stopwords(text)
-    text = clean_whitespace(text)
-    return text
-
 def clean_text_flip(t):
     """Special cleaning for Flipkart data"""
     t = str(t)
@@ -175,8 +146,8 @@ print()
 # 7. CLEAN review_text & product
 # --------------------------
 print("Step 6: Cleaning text columns...")
-df["cleaned_text"] = df["review_text"].astype(str).apply(clean_text)
-df["product"] = df["product"].astype(str).apply(clean_text)
+df["cleaned_text"] = clean_series(df["review_text"].astype(str))
+df["product"] = clean_series(df["product"].astype(str))
 print(f"✓ Cleaned review_text and product columns")
 print()
 
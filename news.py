@@ -6,16 +6,22 @@ Integrates with NewsAPI to fetch product and technology news
 Uses FinBERT for sentiment analysis
 """
 
-import requests
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 import os
+import re
+import hashlib
 from dotenv import load_dotenv
 import notification
 from notification import send_slack_notification
 import torch
 from transformers import AutoTokenizer, AutoModelForSequenceClassification
 from tqdm import tqdm
+import news_fetcher
+from rate_limiter import TokenBucket
+from sentiment_cache import cached_scores
+from data_store import append_table
 
 load_dotenv()
 
@@ -23,12 +29,12 @@ load_dotenv()
 # API CONFIG
 # -----------------------------
 API_KEY = os.getenv("NEWS_API_KEY", "6bd01117d4b74c2f91e0ce5bdcbdef04")
-BASE_URL = "https://newsapi.org/v2/everything"
 
 # Collect data from the last week so that we have new data every week
 FROM_DATE = (datetime.today() - timedelta(days=7)).strftime("%Y-%m-%d")
 LANGUAGE = "en"
 PAGE_SIZE = 50
+MAX_PAGES = int(os.getenv("NEWS_MAX_PAGES", "1"))
 
 # -----------------------------
 # CATEGORY KEYWORDS
@@ -61,6 +67,9 @@ CATEGORY_KEYWORDS = {
 # -----------------------------
 OUTPUT_FILE = "datasets/final data/news_data_with_sentiment.csv"
 
+# Keys of articles already stored in OUTPUT_FILE (one per line)
+ARTICLE_INDEX_FILE = "datasets/final data/news_article_index.txt"
+
 
 # -----------------------------
 # FETCH NEWS FUNCTION
@@ -76,40 +85,147 @@ def fetch_news(query, category):
     Returns:
         list: List of article dictionaries
     """
-    params = {
-        "q": query,
-        "from": FROM_DATE,
-        "language": LANGUAGE,
-        "sortBy": "popularity",
-        "pageSize": PAGE_SIZE,
-        "apiKey": API_KEY
-    }
-
-    response = requests.get(BASE_URL, params=params)
-    response.raise_for_status()
-    data = response.json()
-
-    articles = []
-    for a in data.get("articles", []):
-        articles.append({
-            "source": a["source"]["name"],
-            "author": a.get("author"),
-            "title": a.get("title"),
-            "description": a.get("description"),
-            "content": a.get("content"),
-            "url": a.get("url"),
-            "image_url": a.get("urlToImage"),
-            "published_at": a.get("publishedAt"),
-            "category": category,
-            "query_used": query,
-            "collected_at": datetime.utcnow()
-        })
-    return articles
+    # The session is closed on every path, including failed requests
+    with news_fetcher.create_session(1) as session:
+        return news_fetcher.fetch_keyword(
+            session,
+            TokenBucket(news_fetcher.REQUESTS_PER_SECOND),
+            query,
+            category,
+            API_KEY,
+            FROM_DATE,
+            LANGUAGE,
+            PAGE_SIZE,
+            MAX_PAGES
+        )
+
+
+def on_fetch_error(keyword, category, e):
+    """Report a keyword that failed after all retries"""
+    print(f"Error fetching {keyword}: {e}")
+    send_slack_notification(
+        text=f"🚨 News Fetch Error\n\nKeyword: {keyword}\nCategory: {category}\nError: {e}"
+    )
 
 
 # -----------------------------
-# SENTIMENT PREDICTION FUNCTION
+# SENTIMENT MODEL CONFIG
 # -----------------------------
+FINBERT_MODEL_NAME = "ProsusAI/finbert"
+SENTIMENT_BATCH_SIZE = int(os.getenv("FINBERT_BATCH_SIZE", "32"))
+SENTIMENT_MAX_LENGTH = 512
+
+FINBERT_LABEL_MAP = {
+    0: "Negative",
+    1: "Neutral",
+    2: "Positive"
+}
+
+# Loaded once per process and reused by every call
+_finbert_cache = {}
+
+
+def load_finbert():
+    """
+    Load FinBERT tokenizer and model once and cache them for reuse
+    
+    Returns:
+        tuple: (tokenizer, model, device)
+    """
+    if not _finbert_cache:
+        tokenizer = AutoTokenizer.from_pretrained(FINBERT_MODEL_NAME)
+        model = AutoModelForSequenceClassification.from_pretrained(FINBERT_MODEL_NAME)
+        model.eval()
+
+        device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        model.to(device)
+
+        _finbert_cache["tokenizer"] = tokenizer
+        _finbert_cache["model"] = model
+        _finbert_cache["device"] = device
+
+    return _finbert_cache["tokenizer"], _finbert_cache["model"], _finbert_cache["device"]
+
+
+# -----------------------------
+# SENTIMENT PREDICTION FUNCTIONS
+# -----------------------------
+def _score_finbert(texts, batch_size):
+    """
+    Run FinBERT over a list of non-empty texts
+    
+    Returns:
+        list: Class probabilities (Negative, Neutral, Positive) per text
+    """
+    tokenizer, model, device = load_finbert()
+    results = []
+
+    for start in tqdm(range(0, len(texts), batch_size), desc="FinBERT batches"):
+        batch = texts[start:start + batch_size]
+        inputs = tokenizer(
+            batch,
+            return_tensors="pt",
+            truncation=True,
+            padding=True,
+            max_length=SENTIMENT_MAX_LENGTH
+        )
+        inputs = {k: v.to(device) for k, v in inputs.items()}
+
+        with torch.inference_mode():
+            outputs = model(**inputs)
+            batch_probs = torch.nn.functional.softmax(outputs.logits, dim=1).cpu().numpy()
+
+        results.extend(batch_probs.tolist())
+
+    return results
+
+
+def get_sentiment_batch(texts, batch_size=SENTIMENT_BATCH_SIZE):
+    """
+    Predict sentiment for a whole column of texts using FinBERT
+    
+    Texts are tokenized in batches with dynamic padding (each batch is
+    padded only to its longest member). Empty or missing texts are
+    labelled Neutral without running the model, and texts already in the
+    shared sentiment cache are not rescored.
+    
+    Args:
+        texts (iterable): Texts to analyze (e.g. news_df["combined_text"])
+        batch_size (int): Number of texts per forward pass
+    
+    Returns:
+        tuple: (labels, probs) where labels is a numpy array of sentiment
+               labels and probs is an (n, 3) array of class probabilities
+               ordered Negative, Neutral, Positive
+    """
+    texts = pd.Series(texts).reset_index(drop=True)
+    n = len(texts)
+
+    labels = np.full(n, "Neutral", dtype=object)
+    probs = np.zeros((n, len(FINBERT_LABEL_MAP)), dtype=np.float32)
+    probs[:, 1] = 1.0
+
+    valid = texts.notna() & (texts.astype(str).str.strip() != "")
+    valid_idx = np.flatnonzero(valid.to_numpy())
+    if len(valid_idx) == 0:
+        return labels, probs
+
+    valid_texts = texts.iloc[valid_idx].astype(str).tolist()
+    valid_probs = np.asarray(
+        cached_scores(
+            FINBERT_MODEL_NAME,
+            valid_texts,
+            lambda batch: _score_finbert(batch, batch_size)
+        ),
+        dtype=np.float32
+    )
+
+    probs[valid_idx] = valid_probs
+    labels[valid_idx] = [FINBERT_LABEL_MAP[i] for i in valid_probs.argmax(axis=1)]
+
+    return labels, probs
+
+
 def get_sentiment(text):
     """
     Predict sentiment using FinBERT model
@@ -120,41 +236,87 @@ def get_sentiment(text):
     Returns:
         str: Sentiment label (Positive, Negative, Neutral)
     """
-    MODEL_NAME = "ProsusAI/finbert"
+    labels, _ = get_sentiment_batch([text], batch_size=1)
+    return labels[0]
 
-    # Load model & tokenizer
-    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-    model = AutoModelForSequenceClassification.from_pretrained(MODEL_NAME)
-    model.eval()
 
-    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-    model.to(device)
+# -----------------------------
+# INCREMENTAL INGEST
+# -----------------------------
+def article_keys(url, title):
+    """
+    Build index keys for an article
     
-    if pd.isna(text) or text.strip() == "":
-        return "Neutral"
-
-    inputs = tokenizer(
-        text,
-        return_tensors="pt",
-        truncation=True,
-        padding=True,
-        max_length=512
-    )
+    An article is identified by its URL and by its normalized title, so
+    the same story syndicated under a different URL is also skipped.
+    
+    Returns:
+        list: Key strings ("url:<hash>", "title:<hash>")
+    """
+    keys = []
+    if isinstance(url, str) and url.strip():
+        keys.append("url:" + hashlib.sha1(url.strip().encode("utf-8")).hexdigest())
+    if isinstance(title, str) and title.strip():
+        normalized = re.sub(r"\s+", " ", title.lower()).strip()
+        keys.append("title:" + hashlib.sha1(normalized.encode("utf-8")).hexdigest())
+    return keys
+
+
+def load_article_index():
+    """
+    Load the set of keys of articles already stored in OUTPUT_FILE
+    
+    If the index file does not exist yet it is rebuilt from OUTPUT_FILE.
+    
+    Returns:
+        set: Article keys
+    """
+    if os.path.exists(ARTICLE_INDEX_FILE):
+        with open(ARTICLE_INDEX_FILE, "r", encoding="utf-8") as f:
+            return {line.strip() for line in f if line.strip()}
 
-    inputs = {k: v.to(device) for k, v in inputs.items()}
+    index = set()
+    if os.path.exists(OUTPUT_FILE):
+        stored = pd.read_csv(OUTPUT_FILE, usecols=["url", "title"])
+        for url, title in zip(stored["url"], stored["title"]):
+            index.update(article_keys(url, title))
+        save_article_index(index, mode="w")
+        print(f"✓ Built article index with {len(index)} keys from {OUTPUT_FILE}")
+    return index
 
-    with torch.no_grad():
-        outputs = model(**inputs)
-        probs = torch.nn.functional.softmax(outputs.logits, dim=1)
-        sentiment_idx = torch.argmax(probs).item()
 
-    label_map = {
-        0: "Negative",
-        1: "Neutral",
-        2: "Positive"
-    }
+def save_article_index(keys, mode="a"):
+    """Append keys to the article index file"""
+    with open(ARTICLE_INDEX_FILE, mode, encoding="utf-8") as f:
+        for key in keys:
+            f.write(key + "\n")
 
-    return label_map[sentiment_idx]
+
+def filter_new_articles(news_df, index):
+    """
+    Drop articles already in the index (or repeated within this fetch)
+    
+    Args:
+        news_df (pd.DataFrame): Fetched articles
+        index (set): Keys of stored articles
+    
+    Returns:
+        tuple: (new articles DataFrame, list of keys for the new articles)
+    """
+    seen = set(index)
+    keep = []
+    new_keys = []
+
+    for url, title in zip(news_df["url"], news_df["title"]):
+        keys = article_keys(url, title)
+        if any(key in seen for key in keys):
+            keep.append(False)
+            continue
+        seen.update(keys)
+        new_keys.extend(keys)
+        keep.append(True)
+
+    return news_df[keep].copy(), new_keys
 
 
 # -----------------------------
@@ -172,20 +334,16 @@ def get_news_data():
     print(f"{'='*60}\n")
     
     try:
-        all_articles = []
-
-        # Fetch news for all categories
-        for category, keywords in tqdm(CATEGORY_KEYWORDS.items(), desc="Categories"):
-            for keyword in keywords:
-                try:
-                    articles = fetch_news(keyword, category)
-                    all_articles.extend(articles)
-                except Exception as e:
-                    error_msg = f"Error fetching {keyword}: {e}"
-                    print(error_msg)
-                    send_slack_notification(
-                        text=f"🚨 News Fetch Error\n\nKeyword: {keyword}\nCategory: {category}\nError: {e}"
-                    )
+        # Fetch news for all categories concurrently under the rate limit
+        all_articles, failed_queries = news_fetcher.collect_news(
+            CATEGORY_KEYWORDS,
+            API_KEY,
+            FROM_DATE,
+            language=LANGUAGE,
+            page_size=PAGE_SIZE,
+            max_pages=MAX_PAGES,
+            on_error=on_fetch_error
+        )
 
         # -----------------------------
         # SAVE TO CSV
@@ -199,6 +357,16 @@ def get_news_data():
         news_df.to_csv("news_data_categorized.csv", index=False)
         print(f"\n✓ Saved {len(news_df)} articles to news_data_categorized.csv")
 
+        # Skip articles stored by previous runs before scoring them
+        article_index = load_article_index()
+        fetched_count = len(news_df)
+        news_df, new_keys = filter_new_articles(news_df, article_index)
+        print(f"✓ {len(news_df)} new articles ({fetched_count - len(news_df)} already stored)")
+
+        if news_df.empty:
+            print("\nNo new articles to process.")
+            return news_df
+
         # -----------------------------
         # COMBINE TEXT FIELDS
         # -----------------------------
@@ -212,30 +380,34 @@ def get_news_data():
         # APPLY SENTIMENT MODEL
         # -----------------------------
         print("\n🔍 Analyzing sentiment using FinBERT...")
-        tqdm.pandas()
-        news_df["sentiment_label"] = news_df["combined_text"].progress_apply(get_sentiment)
+        labels, _ = get_sentiment_batch(news_df["combined_text"])
+        news_df["sentiment_label"] = labels
 
         # -----------------------------
         # SAVE OUTPUT
         # -----------------------------
         news_df.drop(columns=["combined_text"], inplace=True)
         
-        if os.path.exists(OUTPUT_FILE):
-            # Append without header
-            news_df.to_csv(OUTPUT_FILE, mode="a", index=False, header=False)
+        # Appends to the CSV (created with a header if missing) and refreshes
+        # its Parquet copy, so dashboard loads do not re-parse the CSV
+        existed = os.path.exists(OUTPUT_FILE)
+        append_table(news_df, OUTPUT_FILE)
+        if existed:
             print(f"\n✓ Appended {len(news_df)} articles to {OUTPUT_FILE}")
         else:
-            # Create file with header
-            news_df.to_csv(OUTPUT_FILE, index=False)
             print(f"\n✓ Created {OUTPUT_FILE} with {len(news_df)} articles")
 
+        save_article_index(new_keys)
+
         # Send success notification
         notification.send_mail(
             f"""
 News Data Collection Completed Successfully!
 
-Total Articles Collected: {len(news_df)}
+Total Articles Fetched: {fetched_count}
+New Articles Stored: {len(news_df)}
 Categories Searched: {len(CATEGORY_KEYWORDS)}
+Failed Queries: {len(failed_queries)}
 Date Range: {FROM_DATE} to {datetime.today().strftime('%Y-%m-%d')}
 
 Sentiment Analysis: FinBERT
@@ -5,7 +5,8 @@ Collects news articles from NewsAPI.org for product categories.
 Requires API key from https://newsapi.org/
 
 Features:
-- Fetches news for multiple product categories
+- Fetches news for multiple product categories concurrently
+- Rate limiting, retries and pagination via news_fetcher
 - Removes duplicate articles
 - Progress tracking with tqdm
 - Exports to CSV for analysis
@@ -16,12 +17,10 @@ Setup:
 3. Install: pip install requests pandas python-dotenv tqdm
 """
 
-import requests
 import pandas as pd
-from datetime import datetime
-from tqdm import tqdm
 import os
 from dotenv import load_dotenv
+from news_fetcher import collect_news
 
 # Load environment variables
 load_dotenv()
@@ -30,10 +29,10 @@ load_dotenv()
 # API CONFIG
 # -----------------------------
 API_KEY = os.getenv("NEWS_API_KEY")
-BASE_URL = "https://newsapi.org/v2/everything"
 FROM_DATE = "2025-12-25"
 LANGUAGE = "en"
 PAGE_SIZE = 50
+MAX_PAGES = 1
 
 # -----------------------------
 # CATEGORY KEYWORDS
@@ -82,46 +81,10 @@ if not API_KEY:
 print(f"✅ API Key loaded")
 print(f"📅 From Date: {FROM_DATE}")
 print(f"🌐 Language: {LANGUAGE}")
-print(f"📄 Page Size: {PAGE_SIZE}")
+print(f"📄 Page Size: {PAGE_SIZE} (up to {MAX_PAGES} pages per keyword)")
 print(f"📋 Categories: {len(CATEGORY_KEYWORDS)}")
 print()
 
-# -----------------------------
-# FETCH NEWS FUNCTION
-# -----------------------------
-def fetch_news(query, category):
-    """Fetch news articles for a specific query and category"""
-    params = {
-        "q": query,
-        "from": FROM_DATE,
-        "language": LANGUAGE,
-        "sortBy": "popularity",
-        "pageSize": PAGE_SIZE,
-        "apiKey": API_KEY
-    }
-    
-    response = requests.get(BASE_URL, params=params, timeout=10)
-    response.raise_for_status()
-    data = response.json()
-    
-    articles = []
-    for a in data.get("articles", []):
-        articles.append({
-            "source": a["source"]["name"],
-            "author": a.get("author"),
-            "title": a.get("title"),
-            "description": a.get("description"),
-            "content": a.get("content"),
-            "url": a.get("url"),
-            "image_url": a.get("urlToImage"),
-            "published_at": a.get("publishedAt"),
-            "category": category,
-            "query_used": query,
-            "collected_at": datetime.utcnow()
-        })
-    
-    return articles
-
 # -----------------------------
 # MAIN PIPELINE
 # -----------------------------
@@ -130,22 +93,17 @@ print("COLLECTING NEWS ARTICLES")
 print("=" * 60)
 print()
 
-all_articles = []
-total_queries = sum(len(keywords) for keywords in CATEGORY_KEYWORDS.values())
-failed_queries = []
-
-with tqdm(total=total_queries, desc="Fetching articles") as pbar:
-    for category, keywords in CATEGORY_KEYWORDS.items():
-        for keyword in keywords:
-            try:
-                articles = fetch_news(keyword, category)
-                all_articles.extend(articles)
-                pbar.set_postfix({"Category": category, "Articles": len(all_articles)})
-            except Exception as e:
-                failed_queries.append({"keyword": keyword, "error": str(e)[:50]})
-                pbar.set_postfix({"Category": category, "Error": "Failed"})
-            
-            pbar.update(1)
+# Keywords are fetched concurrently with a shared session, rate limiter and retries
+all_articles, failed_queries = collect_news(
+    CATEGORY_KEYWORDS,
+    API_KEY,
+    FROM_DATE,
+    language=LANGUAGE,
+    page_size=PAGE_SIZE,
+    max_pages=MAX_PAGES
+)
+for fq in failed_queries:
+    fq["error"] = fq["error"][:50]
 
 print()
 print("=" * 60)
@@ -0,0 +1,205 @@
+"""
+Concurrent NewsAPI Fetcher
+--------------------------
+Fetches news for every keyword in CATEGORY_KEYWORDS in parallel
+
+Features:
+- Thread pool sharing one requests.Session (connection pooling)
+- Token-bucket rate limiter shared by all workers
+- Retry with exponential backoff on 429 / 5xx / network errors
+- Pagination up to MAX_PAGES per keyword
+"""
+
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+from tqdm import tqdm
+
+from rate_limiter import TokenBucket
+
+# -----------------------------
+# FETCHER CONFIG
+# -----------------------------
+BASE_URL = "https://newsapi.org/v2/everything"
+MAX_WORKERS = 8
+REQUESTS_PER_SECOND = 5
+MAX_PAGES = 1           # NewsAPI free plan only serves the first 100 results
+MAX_RETRIES = 4
+BACKOFF_BASE = 1.0      # Seconds, doubled on each retry
+REQUEST_TIMEOUT = 10
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def create_session(pool_size=MAX_WORKERS):
+    """Create a requests.Session with a connection pool sized for the workers"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def request_with_retry(session, url, params, limiter, max_retries=MAX_RETRIES):
+    """
+    GET a URL under the rate limiter, retrying on 429 / 5xx / network errors
+
+    Args:
+        session (requests.Session): Shared session
+        url (str): Request URL
+        params (dict): Query parameters
+        limiter (TokenBucket): Shared rate limiter
+        max_retries (int): Retries before giving up
+
+    Returns:
+        requests.Response: Successful response
+    """
+    for attempt in range(max_retries + 1):
+        limiter.acquire()
+        try:
+            response = session.get(url, params=params, timeout=REQUEST_TIMEOUT)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == max_retries:
+                raise
+            time.sleep(BACKOFF_BASE * 2 ** attempt + random.random())
+            continue
+
+        if response.status_code in RETRY_STATUS_CODES and attempt < max_retries:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                delay = float(retry_after)
+            else:
+                delay = BACKOFF_BASE * 2 ** attempt + random.random()
+            if response.status_code == 429:
+                limiter.pause(delay)
+            time.sleep(delay)
+            continue
+
+        response.raise_for_status()
+        return response
+
+
+def parse_article(a, query, category):
+    """Convert a NewsAPI article into the row format used by the pipeline"""
+    return {
+        "source": a["source"]["name"],
+        "author": a.get("author"),
+        "title": a.get("title"),
+        "description": a.get("description"),
+        "content": a.get("content"),
+        "url": a.get("url"),
+        "image_url": a.get("urlToImage"),
+        "published_at": a.get("publishedAt"),
+        "category": category,
+        "query_used": query,
+        "collected_at": datetime.utcnow()
+    }
+
+
+def fetch_keyword(session, limiter, query, category, api_key, from_date,
+                  language="en", page_size=50, max_pages=MAX_PAGES):
+    """
+    Fetch all pages of articles for one keyword
+
+    Returns:
+        list: List of article dictionaries
+    """
+    articles = []
+
+    for page in range(1, max_pages + 1):
+        params = {
+            "q": query,
+            "from": from_date,
+            "language": language,
+            "sortBy": "popularity",
+            "pageSize": page_size,
+            "page": page,
+            "apiKey": api_key
+        }
+
+        try:
+            response = request_with_retry(session, BASE_URL, params, limiter)
+        except requests.HTTPError:
+            # Later pages can be refused by the plan (e.g. 426); keep what we have
+            if page > 1:
+                break
+            raise
+
+        data = response.json()
+        page_articles = data.get("articles", [])
+        articles.extend(parse_article(a, query, category) for a in page_articles)
+
+        if len(page_articles) < page_size or page * page_size >= data.get("totalResults", 0):
+            break
+
+    return articles
+
+
+def collect_news(category_keywords, api_key, from_date, language="en", page_size=50,
+                 max_pages=MAX_PAGES, max_workers=MAX_WORKERS,
+                 requests_per_second=REQUESTS_PER_SECOND, on_error=None):
+    """
+    Fetch news for every (category, keyword) pair concurrently
+
+    Args:
+        category_keywords (dict): Category name -> list of keywords
+        api_key (str): NewsAPI key
+        from_date (str): Earliest publish date (YYYY-MM-DD)
+        language (str): Language code
+        page_size (int): Articles per page
+        max_pages (int): Pages to fetch per keyword
+        max_workers (int): Concurrent requests
+        requests_per_second (float): Rate limit shared by all workers
+        on_error (callable): Called as on_error(keyword, category, exception)
+
+    Returns:
+        tuple: (list of article dictionaries, list of failed query dictionaries)
+    """
+    limiter = TokenBucket(requests_per_second)
+
+    jobs = [
+        (keyword, category)
+        for category, keywords in category_keywords.items()
+        for keyword in keywords
+    ]
+
+    # Results are kept per job and joined in job order, so callers that
+    # drop duplicate URLs keep the same (first-category) copy every run
+    results = [[] for _ in jobs]
+    errors = [None] * len(jobs)
+
+    # The session is closed on every path, including an on_error that raises
+    with create_session(max_workers) as session:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(
+                    fetch_keyword, session, limiter, keyword, category, api_key,
+                    from_date, language, page_size, max_pages
+                ): i
+                for i, (keyword, category) in enumerate(jobs)
+            }
+
+            with tqdm(total=len(futures), desc="Fetching articles") as pbar:
+                for future in as_completed(futures):
+                    i = futures[future]
+                    keyword, category = jobs[i]
+                    try:
+                        results[i] = future.result()
+                    except Exception as e:
+                        errors[i] = e
+                        if on_error is not None:
+                            on_error(keyword, category, e)
+                    pbar.update(1)
+
+    all_articles = [article for articles in results for article in articles]
+    failed_queries = [
+        {"keyword": keyword, "category": category, "error": str(e)}
+        for (keyword, category), e in zip(jobs, errors)
+        if e is not None
+    ]
+
+    return all_articles, failed_queries
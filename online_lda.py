@@ -0,0 +1,226 @@
+"""
+Online LDA Module
+-----------------
+Persisted topic models that are updated incrementally with new documents
+
+Each model (one per category, or one for the whole corpus) is stored in
+models/lda/<name>/:
+
+- vectorizer.joblib  → CountVectorizer, vocabulary frozen at the first fit
+- lda.joblib         → LatentDirichletAllocation (online variational Bayes)
+- seen_docs.txt      → hashes of the documents already folded in
+- meta.json          → version, document count, last update
+
+The first update() fits the vectorizer and LDA on the documents it gets.
+Later updates skip documents already seen and fold only the new ones in
+with partial_fit, so a weekly refresh costs O(new documents). partial_fit
+updates the topic-word matrix in place, so topic IDs stay stable between
+runs. Words that were not in the first vocabulary are ignored.
+
+Each update also reports topic drift between the previous and the new
+model version (Jensen-Shannon distance of each topic's word distribution
+and the overlap of its top words). Drift rows can be appended to
+models/lda/topic_drift.csv.
+"""
+
+import json
+import os
+import re
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.decomposition import LatentDirichletAllocation
+from sklearn.feature_extraction.text import CountVectorizer
+
+from sentiment_cache import text_hash
+
+# -----------------------------
+# STORE CONFIG
+# -----------------------------
+MODEL_DIR = os.getenv("LDA_MODEL_DIR", "models/lda")
+DRIFT_LOG = os.path.join(MODEL_DIR, "topic_drift.csv")
+DRIFT_TOP_WORDS = 10        # Top words compared between model versions
+INITIAL_PASSES = 20         # max_iter for the first (full) fit
+
+
+def model_slug(name):
+    """Filesystem-safe directory name for a model"""
+    return re.sub(r"[^A-Za-z0-9_-]+", "_", str(name)).strip("_") or "model"
+
+
+def topic_word_distributions(components):
+    """Normalize an LDA components_ matrix to per-topic word probabilities"""
+    components = np.asarray(components, dtype=float)
+    return components / components.sum(axis=1, keepdims=True)
+
+
+def topic_drift(old_components, new_components, top_n=DRIFT_TOP_WORDS):
+    """
+    Compare each topic with the same topic in the previous model version
+
+    Args:
+        old_components (np.ndarray): Previous components_ (topics x terms)
+        new_components (np.ndarray): Updated components_ (same shape)
+        top_n (int): Top words used for the overlap score
+
+    Returns:
+        list: One dict per topic with js_distance (0 = identical,
+              1 = disjoint) and top_word_overlap (Jaccard, 1 = same words)
+    """
+    p = topic_word_distributions(old_components)
+    q = topic_word_distributions(new_components)
+    m = (p + q) / 2
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        kl_pm = np.where(p > 0, p * np.log2(p / m), 0).sum(axis=1)
+        kl_qm = np.where(q > 0, q * np.log2(q / m), 0).sum(axis=1)
+    js_distance = np.sqrt(np.clip((kl_pm + kl_qm) / 2, 0, 1))
+
+    old_top = np.argsort(-p, axis=1)[:, :top_n]
+    new_top = np.argsort(-q, axis=1)[:, :top_n]
+
+    drift = []
+    for topic in range(p.shape[0]):
+        a, b = set(old_top[topic]), set(new_top[topic])
+        drift.append({
+            "topic": topic,
+            "js_distance": round(float(js_distance[topic]), 4),
+            "top_word_overlap": round(len(a & b) / len(a | b), 4)
+        })
+    return drift
+
+
+def append_drift_log(rows, path=DRIFT_LOG):
+    """Append drift rows (dicts) to the drift history CSV"""
+    if not rows:
+        return
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    pd.DataFrame(rows).to_csv(path, mode="a", header=not os.path.exists(path), index=False)
+
+
+class OnlineTopicModel:
+    """Vectorizer + online LDA persisted on disk and updated with partial_fit"""
+
+    def __init__(self, name, n_topics, vectorizer_params=None, random_state=42,
+                 model_dir=MODEL_DIR):
+        """
+        Args:
+            name (str): Model name (e.g. a category)
+            n_topics (int): Number of topics
+            vectorizer_params (dict): CountVectorizer arguments for the first fit
+            random_state (int): LDA random state
+            model_dir (str): Root directory for persisted models
+        """
+        self.name = name
+        self.n_topics = n_topics
+        self.vectorizer_params = vectorizer_params or {}
+        self.random_state = random_state
+        self.path = os.path.join(model_dir, model_slug(name))
+
+        self.vectorizer = None
+        self.lda = None
+        self.meta = {"name": name, "version": 0, "n_docs": 0}
+        self.seen = set()
+        self._load()
+
+    @property
+    def fitted(self):
+        return self.lda is not None
+
+    def _file(self, filename):
+        return os.path.join(self.path, filename)
+
+    def _load(self):
+        if not os.path.exists(self._file("lda.joblib")):
+            return
+        self.vectorizer = joblib.load(self._file("vectorizer.joblib"))
+        self.lda = joblib.load(self._file("lda.joblib"))
+        with open(self._file("meta.json"), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        if os.path.exists(self._file("seen_docs.txt")):
+            with open(self._file("seen_docs.txt"), "r", encoding="utf-8") as f:
+                self.seen = {line.strip() for line in f if line.strip()}
+
+    def _save(self, new_hashes):
+        os.makedirs(self.path, exist_ok=True)
+        joblib.dump(self.vectorizer, self._file("vectorizer.joblib"))
+        joblib.dump(self.lda, self._file("lda.joblib"))
+        with open(self._file("seen_docs.txt"), "a", encoding="utf-8") as f:
+            f.writelines(f"{h}\n" for h in new_hashes)
+        with open(self._file("meta.json"), "w", encoding="utf-8") as f:
+            json.dump(self.meta, f, indent=2)
+
+    def update(self, texts):
+        """
+        Fold unseen documents into the model (or fit it the first time)
+
+        Args:
+            texts (list): Documents; already seen ones are skipped
+
+        Returns:
+            dict: version, new_docs, total_docs, vocab_size and drift
+                  (per-topic drift rows, empty for a first fit or when
+                  nothing was new). fitted is False when the first batch
+                  has fewer terms than topics; nothing is saved then.
+        """
+        new_docs = {}
+        for text in texts:
+            h = text_hash(text)
+            if h not in self.seen and h not in new_docs:
+                new_docs[h] = text
+
+        summary = {"version": self.meta["version"], "new_docs": len(new_docs),
+                   "total_docs": self.meta["n_docs"], "drift": []}
+
+        if not new_docs:
+            summary["fitted"] = self.fitted
+            summary["vocab_size"] = len(self.vectorizer.vocabulary_) if self.fitted else 0
+            return summary
+
+        docs = list(new_docs.values())
+
+        if not self.fitted:
+            vectorizer = CountVectorizer(**self.vectorizer_params)
+            doc_term_matrix = vectorizer.fit_transform(docs)
+            summary["vocab_size"] = doc_term_matrix.shape[1]
+            if doc_term_matrix.shape[1] < self.n_topics:
+                summary["fitted"] = False
+                return summary
+
+            self.vectorizer = vectorizer
+            self.lda = LatentDirichletAllocation(
+                n_components=self.n_topics,
+                random_state=self.random_state,
+                learning_method="online",
+                max_iter=INITIAL_PASSES,
+                total_samples=len(docs)
+            )
+            self.lda.fit(doc_term_matrix)
+        else:
+            summary["vocab_size"] = len(self.vectorizer.vocabulary_)
+            old_components = self.lda.components_.copy()
+
+            # Weight the update by the size of the whole corpus seen so far
+            self.lda.total_samples = self.meta["n_docs"] + len(docs)
+            self.lda.partial_fit(self.vectorizer.transform(docs))
+            summary["drift"] = topic_drift(old_components, self.lda.components_)
+
+        self.seen.update(new_docs)
+        self.meta["version"] += 1
+        self.meta["n_docs"] += len(docs)
+        self.meta["updated_at"] = datetime.now().isoformat(timespec="seconds")
+        self._save(new_docs.keys())
+
+        summary.update(version=self.meta["version"], total_docs=self.meta["n_docs"], fitted=True)
+        return summary
+
+    def transform(self, texts):
+        """Document-topic distribution for texts (n_docs x n_topics)"""
+        return self.lda.transform(self.vectorizer.transform(texts))
+
+    def feature_names(self):
+        return self.vectorizer.get_feature_names_out()
@@ -0,0 +1,41 @@
+"""
+Parallel Chunks Module
+----------------------
+Ordered, bounded fan-out of a chunk iterator (e.g. pd.read_csv with
+chunksize=...) to a multiprocessing pool
+
+Pool.imap feeds its task queue from a background thread that drains the
+input iterator as fast as it can, so when the workers fall behind the
+whole file ends up queued in memory. imap_bounded() only reads the next
+chunk once fewer than max_in_flight chunks are pending, and yields the
+results in input order.
+"""
+
+from collections import deque
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+IN_FLIGHT_PER_WORKER = 2    # Pending chunks per worker (keeps workers busy)
+
+
+def imap_bounded(pool, func, iterable, max_in_flight):
+    """
+    Ordered Pool.imap with at most max_in_flight pending tasks
+
+    Args:
+        pool (multiprocessing.Pool): Pool to run func in
+        func (callable): Picklable function applied to each item
+        iterable (iterable): Items, consumed lazily
+        max_in_flight (int): Items submitted but not yet yielded
+
+    Yields:
+        func(item) for each item, in input order
+    """
+    pending = deque()
+    for item in iterable:
+        if len(pending) >= max_in_flight:
+            yield pending.popleft().get()
+        pending.append(pool.apply_async(func, (item,)))
+    while pending:
+        yield pending.popleft().get()
@@ -0,0 +1,196 @@
+"""
+RAG Cache Module
+----------------
+Two-level on-disk cache for the RAG question answering path
+(ask_vector_db.py, test_rag_queries.py and the dashboard AI panels)
+
+Level 1 - retrieval
+    normalized question -> query embedding (per embedding model), and
+    normalized question + filter + k -> retrieved document ids (per
+    index version). A repeated question skips both embedding and search.
+    After an index update only the search is re-run.
+
+Level 2 - answer
+    (normalized question, retrieved document ids, model) -> answer.
+    Document ids carry a content hash, so an answer is only reused when
+    the same content was retrieved. Answers never expire within the
+    index version they were generated for; answers from an older index
+    version are reused for ANSWER_TTL_SECONDS, then regenerated.
+
+Both levels are stored in one SQLite file with LRU eviction (the
+SentimentCache store).
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+
+import numpy as np
+
+from sentiment_cache import SentimentCache
+from vector_store import EMBEDDING_MODEL, documents_at, embed_query, search_vector
+
+# -----------------------------
+# CACHE CONFIG
+# -----------------------------
+CACHE_PATH = os.getenv("RAG_CACHE_PATH", "cache/rag_cache.sqlite")
+MAX_ENTRIES = int(os.getenv("RAG_CACHE_MAX_ENTRIES", "100000"))
+ANSWER_TTL_SECONDS = int(os.getenv("RAG_ANSWER_TTL_SECONDS", str(24 * 3600)))
+CACHE_ENABLED = os.getenv("RAG_CACHE_ENABLED", "1") != "0"
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_query(query):
+    """
+    Normalize a question for cache lookups
+
+    Case, punctuation and extra whitespace are dropped, so
+    "Common complaints in beauty care products?" and
+    "common complaints in beauty care products" share entries.
+    """
+    return _WHITESPACE_RE.sub(" ", _PUNCTUATION_RE.sub(" ", str(query).lower())).strip()
+
+
+def _key(*parts):
+    return hashlib.sha1(json.dumps(parts, default=str).encode("utf-8")).hexdigest()
+
+
+class RAGCache:
+    """Retrieval and answer cache for one loaded vector database"""
+
+    def __init__(self, vector_db, index_version, retriever=None, path=CACHE_PATH,
+                 max_entries=MAX_ENTRIES, answer_ttl=ANSWER_TTL_SECONDS, enabled=CACHE_ENABLED):
+        """
+        Args:
+            vector_db (FAISS): Loaded vector store
+            index_version (int): Manifest version of the loaded index
+                                 (vector_store.index_version())
+            retriever (HybridRetriever): Optional hybrid retriever
+                                         (hybrid_search.py); None = dense search only
+            path (str): SQLite cache file
+            max_entries (int): Entries kept before LRU eviction
+            answer_ttl (int): Seconds an answer from an older index version stays valid
+            enabled (bool): False bypasses the cache (always search and generate)
+        """
+        self.vector_db = vector_db
+        self.index_version = index_version
+        self.retriever = retriever
+        self.answer_ttl = answer_ttl
+        self.store = SentimentCache(path=path, max_entries=max_entries) if enabled else None
+        self.stats = {"retrieval_hits": 0, "embedding_hits": 0, "answer_hits": 0,
+                      "searches": 0, "generations": 0}
+
+    def _get(self, namespace, key):
+        if self.store is None:
+            return None
+        return self.store.get_many(namespace, [key]).get(key)
+
+    def _put(self, namespace, key, value):
+        if self.store is not None:
+            self.store.put_many(namespace, {key: value})
+
+    # -----------------------------
+    # Level 1: Retrieval
+    # -----------------------------
+    def embedding(self, query):
+        """Query embedding, from the cache when the question was seen before"""
+        namespace = f"embedding:{EMBEDDING_MODEL}"
+        key = _key(normalize_query(query))
+        cached = self._get(namespace, key)
+        if cached is not None:
+            self.stats["embedding_hits"] += 1
+            return np.asarray([cached], dtype="float32")
+
+        vector = embed_query(self.vector_db, query)
+        self._put(namespace, key, vector[0].tolist())
+        return vector
+
+    def retrieve(self, query, k=10, positions=None):
+        """
+        Retrieve documents for a question
+
+        Args:
+            query (str): Question
+            k (int): Documents to retrieve
+            positions (np.ndarray): FAISS positions to search
+                                    (vector_store.select_positions()); None searches everything
+
+        Returns:
+            tuple: (list of Documents, list of document store ids)
+        """
+        if positions is None:
+            scope = "all"
+        else:
+            scope = hashlib.sha1(np.ascontiguousarray(positions, dtype="int64").tobytes()).hexdigest()
+        mode = self.retriever.cache_id if self.retriever is not None else "dense"
+        namespace = f"retrieval:{self.index_version}:{mode}"
+        key = _key(normalize_query(query), k, scope)
+
+        ids = self._get(namespace, key)
+        if ids is not None:
+            documents = [self.vector_db.docstore.search(i) for i in ids]
+            # The docstore returns a message string for ids it does not hold
+            if not any(isinstance(d, str) for d in documents):
+                self.stats["retrieval_hits"] += 1
+                return documents, ids
+
+        if self.retriever is not None:
+            hits = self.retriever.search_positions(query, k, positions, vector=self.embedding(query))
+        else:
+            hits = search_vector(self.vector_db, self.embedding(query), k, positions)
+        self.stats["searches"] += 1
+        ids = [self.vector_db.index_to_docstore_id[p] for p in hits]
+        self._put(namespace, key, ids)
+        return documents_at(self.vector_db, hits), ids
+
+    # -----------------------------
+    # Level 2: Answers
+    # -----------------------------
+    def get_answer(self, query, ids, model):
+        """Cached answer for the question, retrieved ids and model (None on a miss)"""
+        cached = self._get(f"answer:{model}", _key(normalize_query(query), sorted(ids)))
+        if cached is None:
+            return None
+        if cached["index_version"] != self.index_version and time.time() - cached["created"] > self.answer_ttl:
+            return None
+        self.stats["answer_hits"] += 1
+        return cached["answer"]
+
+    def put_answer(self, query, ids, model, answer):
+        """Store a generated answer"""
+        self._put(f"answer:{model}", _key(normalize_query(query), sorted(ids)), {
+            "answer": answer,
+            "created": time.time(),
+            "index_version": self.index_version
+        })
+
+    def answer(self, query, ids, model, generate):
+        """
+        Return the cached answer, or call generate() and cache its result
+
+        Args:
+            query (str): Question
+            ids (list): Store ids returned by retrieve()
+            model (str): LLM model name
+            generate (callable): No-argument function returning the answer text
+
+        Returns:
+            tuple: (answer, True if it came from the cache)
+        """
+        cached = self.get_answer(query, ids, model)
+        if cached is not None:
+            return cached, True
+
+        answer = generate()
+        self.stats["generations"] += 1
+        if answer:
+            self.put_answer(query, ids, model, answer)
+        return answer, False
+
+    def close(self):
+        if self.store is not None:
+            self.store.close()
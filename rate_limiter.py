@@ -0,0 +1,48 @@
+"""
+Rate Limiter Module
+-------------------
+Thread-safe token bucket shared by the API collectors
+"""
+
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter
+
+    Tokens refill continuously at `rate` per second up to `capacity`.
+    Each request takes one token and blocks until one is available, so
+    bursts of up to `capacity` requests are allowed while the long-run
+    rate never exceeds `rate`.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, tokens=1):
+        """Block until `tokens` tokens are available, then take them"""
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Drain the bucket so no request is sent for `seconds` (e.g. after a 429)"""
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.tokens, 0) - seconds * self.rate
@@ -5,17 +5,21 @@ Collects consumer discussion data from Reddit for product categories.
 Uses Reddit's public JSON API without authentication.
 
 Features:
-- Fetches posts for multiple product categories
-- Rate-limiting to avoid API blocks
+- Fetches posts for multiple product categories concurrently (asyncio)
+- Follows `after` cursors for multi-page collection
+- Rate-limiting driven by Reddit's X-Ratelimit-* headers
 - Filters empty/low-quality posts
 - Exports to CSV for analysis
 """
 
-import requests
+import asyncio
+import os
+import time
+import aiohttp
 import pandas as pd
 from datetime import datetime
-import time
 from notification import send_slack_notification
+from data_store import write_table
 
 # -----------------------------
 # Labels (Categories)
@@ -46,67 +50,143 @@ labels = [
 # -----------------------------
 # Reddit API Setup
 # -----------------------------
-url = "https://www.reddit.com/search.json"
+url = os.getenv("REDDIT_SEARCH_URL", "https://www.reddit.com/search.json")
 headers = {
     "User-Agent": "Mozilla/5.0 (ConsumerTrendAnalysisBot)"
 }
-all_rows = []
+PAGE_LIMIT = 100        # Posts per page (Reddit maximum)
+MAX_PAGES = 5           # Pages followed per category via the `after` cursor
+MAX_CONCURRENCY = 4     # Category queries in flight at once
+MAX_RETRIES = 3
+REQUEST_TIMEOUT = 10
+
+
+class RedditRateLimit:
+    """
+    Shared rate-limit budget driven by Reddit's response headers
+    
+    Reddit reports X-Ratelimit-Remaining (requests left in the window) and
+    X-Ratelimit-Reset (seconds until the window resets). Requests go out
+    freely while budget remains; once it is spent every task waits for
+    the reset instead of sleeping a fixed interval.
+    """
+    
+    def __init__(self):
+        self.remaining = None
+        self.reset_at = 0.0
+        self.lock = asyncio.Lock()
+    
+    async def acquire(self):
+        async with self.lock:
+            if self.remaining is not None and self.remaining < 1:
+                delay = self.reset_at - time.monotonic()
+                if delay > 0:
+                    print(f"   ⏳ Rate limit reached, waiting {delay:.0f}s for reset")
+                    await asyncio.sleep(delay)
+                self.remaining = None
+            elif self.remaining is not None:
+                self.remaining -= 1
+    
+    def update(self, response_headers):
+        remaining = response_headers.get("X-Ratelimit-Remaining")
+        reset = response_headers.get("X-Ratelimit-Reset")
+        if remaining is not None:
+            self.remaining = float(remaining)
+        if reset is not None:
+            self.reset_at = time.monotonic() + float(reset)
+
+
+async def fetch_page(session, rate_limit, params):
+    """Fetch one search page, waiting out 429s using the reset header"""
+    for attempt in range(MAX_RETRIES + 1):
+        await rate_limit.acquire()
+        async with session.get(url, params=params) as response:
+            rate_limit.update(response.headers)
+            
+            if response.status == 429 and attempt < MAX_RETRIES:
+                rate_limit.remaining = 0
+                if "X-Ratelimit-Reset" not in response.headers:
+                    rate_limit.reset_at = time.monotonic() + 2 ** (attempt + 1)
+                continue
+            
+            if response.status != 200:
+                raise RuntimeError(f"Status {response.status}")
+            
+            return await response.json()
+
+
+async def fetch_label(session, rate_limit, semaphore, label):
+    """Collect up to MAX_PAGES pages of posts for one category"""
+    query = label.replace("_", " ")
+    rows = []
+    after = None
+    
+    async with semaphore:
+        try:
+            for _ in range(MAX_PAGES):
+                params = {"q": query, "limit": PAGE_LIMIT}
+                if after:
+                    params["after"] = after
+                
+                data = await fetch_page(session, rate_limit, params)
+                
+                for post in data["data"]["children"]:
+                    post_data = post["data"]
+                    rows.append({
+                        "source": "Reddit",
+                        "category_label": label,
+                        "query": query,
+                        "title": post_data.get("title", ""),
+                        "selftext": post_data.get("selftext", ""),
+                        "subreddit": post_data.get("subreddit", ""),
+                        "score": post_data.get("score", 0),
+                        "num_comments": post_data.get("num_comments", 0),
+                        "created_date": datetime.utcfromtimestamp(
+                            post_data.get("created_utc", 0)
+                        )
+                    })
+                
+                after = data["data"].get("after")
+                if not after:
+                    break
+            
+            print(f"   ✅ {label}: collected {len(rows)} posts")
+        
+        except Exception as e:
+            print(f"   ❌ {label}: Error: {str(e)[:50]}")
+            await asyncio.to_thread(
+                send_slack_notification,
+                text=f"🚨 Reddit Data Collection Error\\n\\nLabel: {label}\\nError: {str(e)}"
+            )
+    
+    return rows
+
+
+async def collect_all(labels):
+    """Fetch all categories concurrently under the shared rate limit"""
+    rate_limit = RedditRateLimit()
+    semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+    timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+    
+    async with aiohttp.ClientSession(headers=headers, timeout=timeout) as session:
+        results = await asyncio.gather(
+            *(fetch_label(session, rate_limit, semaphore, label) for label in labels)
+        )
+    
+    return [row for rows in results for row in rows]
+
 
 print("=" * 60)
 print("REDDIT DATA COLLECTION")
 print("=" * 60)
 print(f"Categories to fetch: {len(labels)}")
+print(f"Pages per category: up to {MAX_PAGES} x {PAGE_LIMIT} posts")
 print()
 
 # -----------------------------
-# Loop through labels
+# Fetch all labels concurrently
 # -----------------------------
-for idx, label in enumerate(labels, 1):
-    print(f"[{idx}/{len(labels)}] Fetching data for: {label}")
-    
-    params = {
-        "q": label.replace("_", " "),
-        "limit": 100
-    }
-    
-    try:
-        response = requests.get(url, headers=headers, params=params, timeout=10)
-        
-        if response.status_code != 200:
-            print(f"   ❌ Failed (Status {response.status_code})")
-            continue
-        
-        data = response.json()
-        posts_found = 0
-        
-        for post in data["data"]["children"]:
-            post_data = post["data"]
-            all_rows.append({
-                "source": "Reddit",
-                "category_label": label,
-                "query": label.replace("_", " "),
-                "title": post_data.get("title", ""),
-                "selftext": post_data.get("selftext", ""),
-                "subreddit": post_data.get("subreddit", ""),
-                "score": post_data.get("score", 0),
-                "num_comments": post_data.get("num_comments", 0),
-                "created_date": datetime.utcfromtimestamp(
-                    post_data.get("created_utc", 0)
-                )
-            })
-            posts_found += 1
-        
-        print(f"   ✅ Collected {posts_found} posts")
-        
-    except Exception as e:
-        error_msg = f"   ❌ Error: {str(e)[:50]}"
-        print(error_msg)
-        send_slack_notification(
-            text=f"🚨 Reddit Data Collection Error\\n\\nLabel: {label}\\nError: {str(e)}"
-        )
-    
-    # Polite delay to avoid rate-limiting
-    time.sleep(2)
+all_rows = asyncio.run(collect_all(labels))
 
 print()
 print("=" * 60)
@@ -154,10 +234,10 @@ if len(df) > 0:
     print()
 
 # -----------------------------
-# Save to CSV
+# Save to CSV (plus its typed Parquet copy)
 # -----------------------------
 output_file = "reddit_mixed_consumer_data.csv"
-df.to_csv(output_file, index=False)
+write_table(df, output_file)
 print(f"✅ Dataset saved to: {output_file}")
 print()
 
@@ -9,10 +9,15 @@ import pandas as pd
 from dotenv import load_dotenv
 from google import genai
 from google.genai import types
+from sentiment_cache import cached_scores
 
 load_dotenv()
 client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
 
+GEMINI_MODEL = "gemini-2.5-flash"
+# Bump the suffix when the prompt changes so cached analyses are not reused
+GEMINI_CACHE_ID = f"{GEMINI_MODEL}:review-analysis-v1"
+
 print("=" * 60)
 print("SENTIMENT ANALYSIS WITH GEMINI")
 print("=" * 60)
@@ -30,16 +35,9 @@ except FileNotFoundError:
 # Take sample reviews for analysis
 sample_reviews = df.head(5)
 
-print("Analyzing sample reviews...")
-print("-" * 60)
 
-for idx, row in sample_reviews.iterrows():
-    # Get the review text (adjust column name based on your CSV)
-    review_text = str(row.get('Review', row.get('review', row.get('text', ''))))
-    
-    if not review_text or review_text == 'nan':
-        continue
-    
+def analyze_review(review_text):
+    """Ask Gemini for a short sentiment analysis of one review"""
     prompt = f"""
     Analyze this product review and provide:
     1. Sentiment: Positive/Negative/Neutral
@@ -52,16 +50,38 @@ for idx, row in sample_reviews.iterrows():
     """
     
     response = client.models.generate_content(
-        model="gemini-2.5-flash",
+        model=GEMINI_MODEL,
         contents=prompt,
         config=types.GenerateContentConfig(
             temperature=0.3
         ),
     )
+    return response.text
+
+
+print("Analyzing sample reviews...")
+print("-" * 60)
+
+reviews = []
+for idx, row in sample_reviews.iterrows():
+    # Get the review text (adjust column name based on your CSV)
+    review_text = str(row.get('Review', row.get('review', row.get('text', ''))))
     
+    if not review_text or review_text == 'nan':
+        continue
+    reviews.append((idx, review_text))
+
+# Reviews analyzed in earlier runs are served from the sentiment cache
+analyses = cached_scores(
+    GEMINI_CACHE_ID,
+    [review_text for _, review_text in reviews],
+    lambda texts: [analyze_review(t) for t in texts]
+)
+
+for (idx, review_text), analysis in zip(reviews, analyses):
     print(f"\nReview {idx + 1}:")
     print(f"Original: {review_text[:100]}...")
-    print(f"Analysis: {response.text}")
+    print(f"Analysis: {analysis}")
     print("-" * 60)
 
 print("\n✅ Sentiment analysis completed!")
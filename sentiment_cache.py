@@ -0,0 +1,221 @@
+"""
+Sentiment Cache Module
+----------------------
+On-disk cache of sentiment results shared by the model-based sentiment
+scripts (BERT, FinBERT and Gemini). VADER is cheaper to rerun than to
+look up and is not cached.
+
+Entries are keyed by (model id, hash of normalized text) and stored in
+SQLite. Each model id has its own quota: once a model holds more than
+MAX_ENTRIES rows, its least recently used entries are evicted, so one
+high-volume model cannot push out another model's results.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+
+# -----------------------------
+# CACHE CONFIG
+# -----------------------------
+CACHE_PATH = os.getenv("SENTIMENT_CACHE_PATH", "cache/sentiment_cache.sqlite")
+MAX_ENTRIES = int(os.getenv("SENTIMENT_CACHE_MAX_ENTRIES", "2000000"))   # Per model id
+CACHE_ENABLED = os.getenv("SENTIMENT_CACHE_ENABLED", "1") != "0"
+
+# SQLite limits the number of bound variables per statement
+QUERY_CHUNK_SIZE = 500
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text):
+    """
+    Normalize text before hashing
+
+    Only whitespace is collapsed. Case and punctuation are kept because
+    models such as VADER use them as sentiment signals.
+    """
+    return _WHITESPACE_RE.sub(" ", str(text)).strip()
+
+
+def text_hash(text):
+    """Return the SHA-1 hex digest of the normalized text"""
+    return hashlib.sha1(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class SentimentCache:
+    """SQLite-backed (model id, text hash) -> result cache with per-model LRU eviction"""
+
+    def __init__(self, path=CACHE_PATH, max_entries=MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        # Row count per model id, counted once and then tracked on insert
+        self.counts = {}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.conn = sqlite3.connect(path, timeout=60)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS sentiment_cache (
+                model_id TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                value TEXT NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model_id, text_hash)
+            )
+        """)
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_sentiment_cache_model_last_used "
+            "ON sentiment_cache (model_id, last_used)"
+        )
+        self.conn.commit()
+
+    def get_many(self, model_id, hashes):
+        """
+        Look up cached results
+
+        Args:
+            model_id (str): Model identifier
+            hashes (list): Text hashes to look up
+
+        Returns:
+            dict: text hash -> cached value for every hit
+        """
+        unique = list(dict.fromkeys(hashes))
+        found = {}
+
+        for start in range(0, len(unique), QUERY_CHUNK_SIZE):
+            chunk = unique[start:start + QUERY_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT text_hash, value FROM sentiment_cache "
+                f"WHERE model_id = ? AND text_hash IN ({placeholders})",
+                [model_id] + chunk
+            ).fetchall()
+            for h, value in rows:
+                found[h] = json.loads(value)
+
+        if found:
+            now = time.time()
+            self.conn.executemany(
+                "UPDATE sentiment_cache SET last_used = ? WHERE model_id = ? AND text_hash = ?",
+                [(now, model_id, h) for h in found]
+            )
+            self.conn.commit()
+
+        return found
+
+    def put_many(self, model_id, values):
+        """
+        Store results and evict old entries if the cache is over size
+
+        Args:
+            model_id (str): Model identifier
+            values (dict): text hash -> JSON-serializable result
+        """
+        if not values:
+            return
+
+        count = self._count(model_id)
+        now = time.time()
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO sentiment_cache (model_id, text_hash, value, last_used) "
+            "VALUES (?, ?, ?, ?)",
+            [(model_id, h, json.dumps(v), now) for h, v in values.items()]
+        )
+        self.conn.commit()
+
+        # Replaced rows (or other processes' inserts) make this an estimate;
+        # evict() recounts exactly before deleting anything
+        self.counts[model_id] = count + len(values)
+        if self.counts[model_id] > self.max_entries:
+            self.evict(model_id)
+
+    def _count(self, model_id):
+        if model_id not in self.counts:
+            self.counts[model_id] = self.conn.execute(
+                "SELECT COUNT(*) FROM sentiment_cache WHERE model_id = ?", (model_id,)
+            ).fetchone()[0]
+        return self.counts[model_id]
+
+    def evict(self, model_id):
+        """Delete a model's least recently used entries beyond max_entries"""
+        self.counts.pop(model_id, None)
+        excess = self._count(model_id) - self.max_entries
+        if excess > 0:
+            self.conn.execute(
+                "DELETE FROM sentiment_cache WHERE rowid IN ("
+                "SELECT rowid FROM sentiment_cache WHERE model_id = ? ORDER BY last_used LIMIT ?)",
+                (model_id, excess)
+            )
+            self.conn.commit()
+            self.counts[model_id] = self.max_entries
+
+    def cached_apply(self, model_id, texts, score_fn):
+        """
+        Return results for texts, running score_fn only on cache misses
+
+        Args:
+            model_id (str): Model identifier (include anything that changes
+                            the output, e.g. a prompt version)
+            texts (list): Texts to score
+            score_fn (callable): Takes a list of unique uncached texts and
+                                 returns a list of results in the same order
+
+        Returns:
+            list: One result per input text, in input order
+        """
+        texts = [str(t) for t in texts]
+        hashes = [text_hash(t) for t in texts]
+        found = self.get_many(model_id, hashes)
+
+        missing = {}
+        for h, t in zip(hashes, texts):
+            if h not in found and h not in missing:
+                missing[h] = t
+
+        if missing:
+            scored = dict(zip(missing.keys(), score_fn(list(missing.values()))))
+            self.put_many(model_id, scored)
+            found.update(scored)
+
+        return [found[h] for h in hashes]
+
+    def close(self):
+        self.conn.close()
+
+
+# One cache connection per process
+_default_cache = None
+
+
+def get_cache():
+    """Return the shared cache for this process"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = SentimentCache()
+    return _default_cache
+
+
+def cached_scores(model_id, texts, score_fn):
+    """
+    Score texts through the shared cache (or directly if it is disabled)
+
+    Args:
+        model_id (str): Model identifier
+        texts (list): Texts to score
+        score_fn (callable): Scores a list of texts, returns a list of results
+
+    Returns:
+        list: One result per input text, in input order
+    """
+    if not CACHE_ENABLED:
+        return list(score_fn([str(t) for t in texts]))
+    return get_cache().cached_apply(model_id, texts, score_fn)
@@ -4,38 +4,38 @@ Test RAG Queries Script
 Tests multiple queries against the vector database to extract insights
 """
 
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_community.vectorstores import FAISS
+from vector_store import INDEX_PATH, load_embeddings, load_vector_db, index_version
+from rag_cache import RAGCache
+from hybrid_search import load_hybrid_retriever
 from google import genai
 from google.genai import types
 import os
 from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
-
-# Initialize embeddings
-embeddings = HuggingFaceEmbeddings(
-    model_name="sentence-transformers/all-MiniLM-L6-v2"
-)
-
-# Load FAISS index
-vector_db = FAISS.load_local(
-    "consumer_sentiment_faiss1",
-    embeddings,
-    allow_dangerous_deserialization=True
-)
+# -----------------------------
+# Test Queries
+# -----------------------------
+# Also used by benchmark_vector_index.py to measure index recall
+TEST_QUERIES = [
+    "why home appliance having good reviews",
+    "Why are certain mobile accessory brands losing customer trust?",
+    "Common complaints in mobile accessory reviews"
+]
 
-# Initialize Gemini client
-client = genai.Client(api_key=os.getenv("Gemini_Api_key"))
+MODEL = "gemini-2.5-flash"
 
 
-def query_rag(query, k=10):
+def query_rag(query, rag_cache, client, k=10):
     """
     Query the RAG system and get AI-generated response
+
+    Repeated questions are served from the RAG cache (no embedding,
+    search or generation)
     
     Args:
         query: The question to ask
+        rag_cache: RAGCache for the loaded vector database
+        client: Gemini client used when the answer is not cached
         k: Number of similar documents to retrieve
     
     Returns:
@@ -45,8 +45,8 @@ def query_rag(query, k=10):
     print(f"QUERY: {query}")
     print("="*80)
     
-    # Similarity search
-    results = vector_db.similarity_search(query, k=k)
+    # Similarity search (cached per index version)
+    results, result_ids = rag_cache.retrieve(query, k=k)
     
     print(f"\nRetrieved {len(results)} relevant documents:")
     print("-"*80)
@@ -81,60 +81,81 @@ Answer:
 """
     
     # Get response from Gemini
-    response = client.models.generate_content(
-        model="gemini-2.5-flash",
-        contents=prompt,
-        config=types.GenerateContentConfig(
-            thinking_config=types.ThinkingConfig(thinking_budget=0),
-            temperature=0.2
-        ),
-    )
+    def generate():
+        response = client.models.generate_content(
+            model=MODEL,
+            contents=prompt,
+            config=types.GenerateContentConfig(
+                thinking_config=types.ThinkingConfig(thinking_budget=0),
+                temperature=0.2
+            ),
+        )
+        return response.text
+    
+    answer, cached = rag_cache.answer(query, result_ids, MODEL, generate)
     
-    print("ANSWER:")
-    print(response.text)
+    print("ANSWER (cached):" if cached else "ANSWER:")
+    print(answer)
     print("\n" + "="*80 + "\n")
     
-    return response.text
+    return answer
 
 
 # -----------------------------
-# Test Queries
+# Run Tests
 # -----------------------------
-queries = [
-    "why home appliance having good reviews",
-    "Why are certain mobile accessory brands losing customer trust?",
-    "Common complaints in mobile accessory reviews"
-]
+# Only when run as a script, so TEST_QUERIES can be imported without
+# loading the index or the Gemini client
+if __name__ == "__main__":
+    # Load environment variables
+    load_dotenv()
+
+    # Initialize embeddings
+    embeddings = load_embeddings()
 
-print("\n" + "="*80)
-print("RAG QUERY TESTING - AI MARKET SENTIMENT ANALYSIS")
-print("="*80)
-print(f"Vector Database: consumer_sentiment_faiss1")
-print(f"Total Queries: {len(queries)}")
-print("="*80)
-
-results = {}
-
-for query in queries:
-    try:
-        answer = query_rag(query)
-        results[query] = answer
-    except Exception as e:
-        print(f"❌ Error processing query '{query}': {e}\n")
-        results[query] = f"Error: {e}"
-
-# Summary
-print("\n" + "="*80)
-print("SUMMARY")
-print("="*80)
-
-for i, (query, answer) in enumerate(results.items(), 1):
-    print(f"\n{i}. {query}")
-    if answer.startswith("Error"):
-        print(f"   ❌ {answer}")
-    else:
-        print(f"   ✅ Response generated successfully")
-
-print("\n" + "="*80)
-print("Testing complete!")
-print("="*80)
+    # Load FAISS index (applies the IVF/HNSW search settings)
+    vector_db = load_vector_db(embeddings)
+
+    # Hybrid (BM25 + vector) retrieval behind the embedding / retrieval / answer cache
+    version = index_version()
+    rag_cache = RAGCache(vector_db, version, retriever=load_hybrid_retriever(vector_db, version))
+
+    # Initialize Gemini client
+    client = genai.Client(api_key=os.getenv("Gemini_Api_key"))
+
+    queries = TEST_QUERIES
+
+    print("\n" + "="*80)
+    print("RAG QUERY TESTING - AI MARKET SENTIMENT ANALYSIS")
+    print("="*80)
+    print(f"Vector Database: {INDEX_PATH}")
+    print(f"Total Queries: {len(queries)}")
+    print("="*80)
+
+    results = {}
+
+    for query in queries:
+        try:
+            answer = query_rag(query, rag_cache, client)
+            results[query] = answer
+        except Exception as e:
+            print(f"❌ Error processing query '{query}': {e}\n")
+            results[query] = f"Error: {e}"
+
+    # Summary
+    print("\n" + "="*80)
+    print("SUMMARY")
+    print("="*80)
+
+    for i, (query, answer) in enumerate(results.items(), 1):
+        print(f"\n{i}. {query}")
+        if answer.startswith("Error"):
+            print(f"   ❌ {answer}")
+        else:
+            print(f"   ✅ Response generated successfully")
+
+    print(f"\nCache: {rag_cache.stats}")
+
+    print("\n" + "="*80)
+    print("Testing complete!")
+    print("="*80)
@@ -0,0 +1,208 @@
+"""
+Text Cleaning Module
+--------------------
+Shared review text cleaning used by data_cleaning.py and merge_datasets.py
+
+The original pipeline ran four separate passes over every text cell
+(lowercase, punctuation regex, stopword split/join, whitespace regex).
+Here they are fused into one pass per cell using a precompiled regex and
+a frozenset stopword lookup. The output is identical to the four-pass
+version.
+
+Modes:
+- clean_series / clean_dataframe: in-memory, optionally multiprocess
+- clean_csv_chunks: stream a large CSV through in fixed-size chunks
+
+Run this file directly to benchmark against the four-pass functions.
+"""
+
+import os
+import re
+import time
+from multiprocessing import Pool
+
+import numpy as np
+import pandas as pd
+
+from parallel_chunks import IN_FLIGHT_PER_WORKER, imap_bounded
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+DEFAULT_WORKERS = os.cpu_count() or 1
+DEFAULT_CHUNK_SIZE = 100000
+
+_PUNCT_RE = re.compile(r"[^\w\s]")
+
+_stop_words = None
+
+
+def get_stop_words():
+    """Load NLTK English stopwords once as a frozenset"""
+    global _stop_words
+    if _stop_words is None:
+        import nltk
+        from nltk.corpus import stopwords
+
+        nltk.download("stopwords", quiet=True)
+        _stop_words = frozenset(stopwords.words("english"))
+    return _stop_words
+
+
+# -----------------------------
+# CLEANING FUNCTIONS
+# -----------------------------
+def clean_text(text, stop_words=None):
+    """
+    Lowercase, strip punctuation, drop stopwords and normalize whitespace
+
+    Non-string values are returned unchanged.
+    """
+    if not isinstance(text, str):
+        return text
+    if stop_words is None:
+        stop_words = get_stop_words()
+    # split() already collapses and trims whitespace
+    return " ".join([w for w in _PUNCT_RE.sub("", text.lower()).split() if w not in stop_words])
+
+
+def clean_series(series):
+    """Clean every cell of a pandas Series in a single pass"""
+    stop_words = get_stop_words()
+    punct_sub = _PUNCT_RE.sub
+    values = [
+        " ".join([w for w in punct_sub("", v.lower()).split() if w not in stop_words])
+        if isinstance(v, str) else v
+        for v in series.to_numpy(dtype=object)
+    ]
+    return pd.Series(values, index=series.index, name=series.name, dtype=object)
+
+
+def _clean_frame(args):
+    df, columns = args
+    for col in columns:
+        df[col] = clean_series(df[col])
+    return df
+
+
+def clean_dataframe(df, columns=None, workers=1, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Clean text columns of a DataFrame
+
+    Args:
+        df (pd.DataFrame): Data to clean (not modified)
+        columns (list): Columns to clean (default: all object columns)
+        workers (int): Processes to use; 1 cleans in-process
+        chunk_size (int): Rows per task when using multiple workers
+
+    Returns:
+        pd.DataFrame: Copy of df with cleaned columns
+    """
+    if columns is None:
+        columns = list(df.select_dtypes(include=["object"]).columns)
+    df = df.copy()
+
+    if workers <= 1 or len(df) <= chunk_size:
+        return _clean_frame((df, columns))
+
+    get_stop_words()  # Load before forking so workers inherit it
+    n_chunks = int(np.ceil(len(df) / chunk_size))
+    chunks = [(df.iloc[i * chunk_size:(i + 1) * chunk_size], columns) for i in range(n_chunks)]
+
+    with Pool(processes=workers) as pool:
+        cleaned = pool.map(_clean_frame, chunks)
+
+    return pd.concat(cleaned)
+
+
+def clean_csv_chunks(input_file, output_file, columns, chunk_size=DEFAULT_CHUNK_SIZE,
+                     workers=1, **read_csv_kwargs):
+    """
+    Stream a CSV through the cleaner chunk by chunk
+
+    Args:
+        input_file (str): CSV to read
+        output_file (str): CSV to write
+        columns (list): Columns to clean
+        chunk_size (int): Rows per chunk
+        workers (int): Processes to use; chunks are cleaned in order, with
+                       at most IN_FLIGHT_PER_WORKER chunks per worker read ahead
+        **read_csv_kwargs: Passed to pd.read_csv (e.g. encoding)
+
+    Returns:
+        int: Number of rows written
+    """
+    reader = pd.read_csv(input_file, chunksize=chunk_size, **read_csv_kwargs)
+    tasks = ((chunk, columns) for chunk in reader)
+    rows = 0
+
+    if workers > 1:
+        get_stop_words()
+        pool = Pool(processes=workers)
+        results = imap_bounded(pool, _clean_frame, tasks, IN_FLIGHT_PER_WORKER * workers)
+    else:
+        pool = None
+        results = map(_clean_frame, tasks)
+
+    try:
+        for chunk in results:
+            chunk.to_csv(output_file, mode="w" if rows == 0 else "a", header=rows == 0, index=False)
+            rows += len(chunk)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    return rows
+
+
+# -----------------------------
+# BENCHMARK
+# -----------------------------
+def _clean_four_pass(series, stop_words):
+    """The original per-cell four-pass cleaning, kept for benchmarking"""
+    series = series.apply(lambda t: t.lower() if isinstance(t, str) else t)
+    series = series.apply(lambda t: re.sub(r"[^\w\s]", "", t) if isinstance(t, str) else t)
+    series = series.apply(
+        lambda t: " ".join([w for w in t.split() if w not in stop_words]) if isinstance(t, str) else t
+    )
+    return series.apply(lambda t: re.sub(r"\s+", " ", t).strip() if isinstance(t, str) else t)
+
+
+def benchmark(series, workers=DEFAULT_WORKERS):
+    """
+    Time the four-pass cleaning against the fused single-pass modes
+
+    Returns:
+        dict: Mode name -> seconds
+    """
+    stop_words = set(get_stop_words())
+    frame = series.to_frame("text")
+    timings = {}
+
+    start = time.perf_counter()
+    expected = _clean_four_pass(series, stop_words)
+    timings["four_pass"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fused = clean_series(series)
+    timings["fused"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    parallel = clean_dataframe(frame, ["text"], workers=workers,
+                               chunk_size=max(1, len(series) // workers))["text"]
+    timings[f"fused_{workers}_workers"] = time.perf_counter() - start
+
+    assert fused.equals(expected) and parallel.equals(expected)
+    return timings
+
+
+if __name__ == "__main__":
+    reviews = pd.read_csv("datasets/mixed_product_reviews.csv")["text"].astype(str)
+    sample = pd.Series(np.tile(reviews.to_numpy(), 50))
+
+    print("=" * 60)
+    print(f"TEXT CLEANING BENCHMARK ({len(sample)} rows)")
+    print("=" * 60)
+    for mode, seconds in benchmark(sample).items():
+        print(f"{mode:>20}: {seconds:.3f}s")
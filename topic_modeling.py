@@ -30,6 +30,9 @@ from sklearn.feature_extraction.text import CountVectorizer
 from sklearn.decomposition import LatentDirichletAllocation
 import pandas as pd
 import numpy as np
+import os
+from online_lda import OnlineTopicModel, append_drift_log
+from dtm_cache import vectorize_cached
 
 print("=" * 60)
 print("TOPIC MODELING WITH LDA")
@@ -144,35 +147,66 @@ print()
 # -----------------------------
 # Vectorization
 # -----------------------------
-print("Creating document-term matrix...")
-vectorizer_real = CountVectorizer(
+# LDA_MODE=incremental keeps the model in models/lda/all_reviews and only
+# folds in reviews it has not seen before (topic IDs stay stable)
+LDA_MODE = os.getenv("LDA_MODE", "batch")
+n_topics = 5  # Adjust based on your needs
+vectorizer_params = dict(
     max_features=1000,      # Top 1000 words
     stop_words="english",   # Remove common words
     min_df=2,               # Word must appear in at least 2 documents
     max_df=0.8              # Ignore words in >80% of documents
 )
 
-doc_term_matrix_real = vectorizer_real.fit_transform(df[text_column])
-print(f"✅ Matrix shape: {doc_term_matrix_real.shape}")
-print()
-
-# -----------------------------
-# LDA Topic Modeling
-# -----------------------------
-print("Running LDA topic modeling...")
-n_topics = 5  # Adjust based on your needs
-
-lda_real = LatentDirichletAllocation(
-    n_components=n_topics,
-    random_state=42,
-    max_iter=30,
-    learning_method='online',
-    n_jobs=-1  # Use all CPU cores
-)
-
-lda_real.fit(doc_term_matrix_real)
-print("✅ LDA model trained")
-print()
+if LDA_MODE == "incremental":
+    print("Updating saved topic model with new reviews...")
+    online_model = OnlineTopicModel("all_reviews", n_topics, vectorizer_params=vectorizer_params)
+    update = online_model.update(df[text_column].tolist())
+    if not update["fitted"]:
+        print("❌ Not enough unique terms to fit the topic model")
+        exit()
+    
+    print(f"✅ Folded in {update['new_docs']} new reviews "
+          f"(model version {update['version']}, {update['total_docs']} reviews total)")
+    for row in update["drift"]:
+        print(f"   Topic {row['topic'] + 1} drift: JS {row['js_distance']:.3f}, "
+              f"top-word overlap {row['top_word_overlap']:.0%}")
+    append_drift_log([{"category": "all_reviews", "version": update["version"],
+                       "new_docs": update["new_docs"], **row} for row in update["drift"]])
+    
+    vectorizer_real = online_model.vectorizer
+    lda_real = online_model.lda
+    doc_term_matrix_real = vectorizer_real.transform(df[text_column])
+    feature_names = vectorizer_real.get_feature_names_out()
+    print(f"✅ Matrix shape: {doc_term_matrix_real.shape}")
+    print()
+else:
+    # Cached by input texts + vectorizer settings, so changing n_topics or
+    # max_iter below does not re-tokenize the corpus
+    print("Creating document-term matrix...")
+    dtm = vectorize_cached(df[text_column].tolist(), vectorizer_params,
+                           row_ids=df.index.to_numpy(), name="all_reviews")
+    doc_term_matrix_real = dtm.matrix
+    feature_names = dtm.feature_names
+    print(f"✅ Matrix shape: {doc_term_matrix_real.shape}" + (" (cached)" if dtm.cached else ""))
+    print()
+    
+    # -----------------------------
+    # LDA Topic Modeling
+    # -----------------------------
+    print("Running LDA topic modeling...")
+    
+    lda_real = LatentDirichletAllocation(
+        n_components=n_topics,
+        random_state=42,
+        max_iter=30,
+        learning_method='online',
+        n_jobs=-1  # Use all CPU cores
+    )
+    
+    lda_real.fit(doc_term_matrix_real)
+    print("✅ LDA model trained")
+    print()
 
 # -----------------------------
 # Display Discovered Topics
@@ -182,8 +216,6 @@ print("DISCOVERED TOPICS")
 print("=" * 60)
 print()
 
-feature_names = vectorizer_real.get_feature_names_out()
-
 for topic_idx, topic in enumerate(lda_real.components_):
     top_word_indices = topic.argsort()[-10:][::-1]  # Top 10 words
     top_words = [feature_names[i] for i in top_word_indices]
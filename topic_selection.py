@@ -0,0 +1,163 @@
+"""
+Topic Count Selection
+---------------------
+Choose the number of LDA topics per corpus with a parallel sweep
+
+For each corpus (e.g. one category's document-term matrix) a range of
+topic counts is scored with short LDA fits:
+
+- perplexity on held-out documents (lower is better)
+- UMass coherence of each topic's top words (higher is better)
+
+Cost is bounded in two ways:
+
+1. Sweep fits are short (SWEEP_MAX_ITER iterations). Training
+   perplexity is not evaluated during a fit: each evaluation costs an
+   extra full E-step, and an absolute tolerance would rarely trigger
+   within so few iterations with perplexities in the hundreds or more
+2. Topic counts are tried in ascending waves; a corpus stops sweeping
+   once PATIENCE counts in a row have not beaten its best score
+
+All (corpus, topic count) fits of a wave run together in one loky pool.
+Each fit only depends on its matrix, topic count and random state, so
+the selection is the same for any number of workers.
+
+The sweep only chooses the topic count; its models are discarded. They
+are short fits on the training split only (held-out documents are
+excluded), so the model that is used is a separate full-length refit on
+all documents with the chosen count (fit_category_lda in
+category_lda_analysis.py). That refit costs one extra fit per corpus on
+top of the sweep.
+"""
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.decomposition import LatentDirichletAllocation
+
+# -----------------------------
+# SWEEP CONFIG
+# -----------------------------
+SWEEP_MAX_ITER = 10         # Iterations per sweep fit (final fits use more)
+HOLDOUT_EVERY = 10          # Every Nth document is held out for perplexity
+COHERENCE_TOP_N = 10        # Top words per topic used for coherence
+PATIENCE = 2                # Stop after this many counts without improvement
+WAVE_SIZE = 2               # Topic counts per corpus submitted per wave
+
+METRICS = {"coherence": 1, "perplexity": -1}   # +1 = higher is better
+
+
+def umass_coherence(components, doc_term_matrix, top_n=COHERENCE_TOP_N):
+    """
+    Mean UMass coherence over topics
+
+    For each topic's top words w1..wn (by weight), averages
+    log((D(wi, wj) + 1) / D(wj)) over pairs j < i, where D counts the
+    documents containing the words.
+
+    Args:
+        components (np.ndarray): LDA components_ (topics x terms)
+        doc_term_matrix (sparse matrix): Documents x terms counts
+        top_n (int): Top words per topic
+
+    Returns:
+        float: Mean coherence (closer to 0 is better)
+    """
+    binary = (doc_term_matrix > 0).astype(np.float64).tocsc()
+    doc_freq = np.asarray(binary.sum(axis=0)).ravel()
+
+    top_n = min(top_n, components.shape[1])
+    rows, cols = np.tril_indices(top_n, k=-1)
+    scores = []
+    for topic in components:
+        top = np.argsort(-topic)[:top_n]
+        subset = binary[:, top]
+        co_doc = (subset.T @ subset).toarray()
+        scores.append(np.mean(np.log((co_doc[rows, cols] + 1) / np.maximum(doc_freq[top][cols], 1))))
+    return float(np.mean(scores))
+
+
+def score_topic_count(doc_term_matrix, n_topics, random_state=42, max_iter=SWEEP_MAX_ITER):
+    """
+    Fit a short LDA model and score it
+
+    Returns:
+        dict: n_topics, perplexity (held-out), coherence, n_iter
+    """
+    holdout_mask = np.zeros(doc_term_matrix.shape[0], dtype=bool)
+    holdout_mask[::HOLDOUT_EVERY] = True
+    train = doc_term_matrix[~holdout_mask]
+    holdout = doc_term_matrix[holdout_mask]
+
+    lda = LatentDirichletAllocation(
+        n_components=n_topics,
+        random_state=random_state,
+        learning_method="batch",
+        max_iter=max_iter,
+        evaluate_every=-1       # No per-iteration perplexity (extra E-step each time)
+    )
+    lda.fit(train)
+
+    return {
+        "n_topics": n_topics,
+        "perplexity": float(lda.perplexity(holdout if holdout.shape[0] else train)),
+        "coherence": umass_coherence(lda.components_, doc_term_matrix),
+        "n_iter": int(lda.n_iter_)
+    }
+
+
+def best_candidate(candidates, metric="coherence"):
+    """Best scored candidate (ties go to fewer topics)"""
+    sign = METRICS[metric]
+    return max(candidates, key=lambda c: (sign * c[metric], -c["n_topics"]))
+
+
+def sweep_topic_counts(matrices, topic_range, metric="coherence", n_jobs=-1,
+                       random_state=42, patience=PATIENCE, wave_size=WAVE_SIZE):
+    """
+    Select the topic count for several corpora
+
+    Args:
+        matrices (dict): name -> document-term matrix
+        topic_range (iterable): Topic counts to consider
+        metric (str): "coherence" or "perplexity"
+        n_jobs (int): Worker processes for the fits
+        random_state (int): LDA random state for every fit
+        patience (int): Counts without improvement before a corpus stops
+        wave_size (int): Counts per corpus submitted in each wave
+
+    Returns:
+        dict: name -> {"best": candidate, "candidates": [...]}
+              (corpora with too few terms or documents are left out)
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric '{metric}', use one of {list(METRICS)}")
+
+    queues = {}
+    for name, matrix in matrices.items():
+        # More topics than terms or documents cannot be fitted meaningfully
+        limit = min(matrix.shape)
+        counts = [k for k in sorted(set(topic_range)) if 1 < k <= limit]
+        if counts:
+            queues[name] = counts
+    results = {name: [] for name in queues}
+
+    while queues:
+        jobs = [(name, k) for name, counts in queues.items() for k in counts[:wave_size]]
+        scores = Parallel(n_jobs=n_jobs, backend="loky")(
+            delayed(score_topic_count)(matrices[name], k, random_state) for name, k in jobs
+        )
+
+        for (name, _), score in zip(jobs, scores):
+            results[name].append(score)
+
+        for name in list(queues):
+            queues[name] = queues[name][wave_size:]
+            tried = results[name]
+            best_index = tried.index(best_candidate(tried, metric))
+            if not queues[name] or len(tried) - 1 - best_index >= patience:
+                del queues[name]
+
+    return {
+        name: {"best": best_candidate(tried, metric), "candidates": tried}
+        for name, tried in results.items()
+    }
@@ -21,34 +21,36 @@ Compound Score Interpretation:
 - Between → Neutral
 """
 
+import os
+from multiprocessing import Pool
+
+import numpy as np
 import pandas as pd
 from nltk.sentiment import SentimentIntensityAnalyzer
 import nltk
 
-# -----------------------------
-# Load Data
-# -----------------------------
-print("Loading data...")
-df = pd.read_csv("combined_cleaned_data.csv")
-print(f"✅ Loaded {len(df)} rows")
-print()
+from parallel_chunks import IN_FLIGHT_PER_WORKER, imap_bounded
 
 # -----------------------------
-# VADER Sentiment Setup
+# Configuration
 # -----------------------------
-print("Downloading VADER lexicon...")
-nltk.download('vader_lexicon', quiet=True)
-sia = SentimentIntensityAnalyzer()
-print("✅ VADER initialized")
-print()
+INPUT_FILE = "combined_cleaned_data.csv"
+OUTPUT_FILE = "output_vader_sentiment.csv"
+TEXT_COLUMN = "cleaned_text"
+CHUNK_SIZE = 50000                  # Rows read per chunk
+MEDIAN_BINS = 2000                  # Histogram bins over [-1, 1] (median to ±0.0005)
+NUM_WORKERS = os.cpu_count() or 1   # Set to 1 to score in-process
+
+# One analyzer per worker process
+_sia = None
+
+
+def init_worker():
+    """Create the VADER analyzer once per worker process"""
+    global _sia
+    nltk.download('vader_lexicon', quiet=True)
+    _sia = SentimentIntensityAnalyzer()
 
-# -----------------------------
-# Sentiment Score Calculation
-# -----------------------------
-print("Analyzing sentiment...")
-df['sentiment_score_vader'] = df['cleaned_text'].apply(
-    lambda x: sia.polarity_scores(str(x))['compound']
-)
 
 # -----------------------------
 # Label Function
@@ -61,42 +63,155 @@ def label(score):
     else:
         return "neutral"
 
-df['sentiment_vader'] = df['sentiment_score_vader'].apply(label)
 
 # -----------------------------
-# Save Output
+# Sentiment Score Calculation
 # -----------------------------
-df.to_csv("output_vader_sentiment.csv", index=False)
-print("✅ VADER sentiment analysis completed. Saved as output_vader_sentiment.csv")
-print()
+def score_chunk(chunk):
+    """
+    Add VADER compound score and label columns to a chunk of rows
+    
+    Args:
+        chunk (pd.DataFrame): Rows containing TEXT_COLUMN
+    
+    Returns:
+        pd.DataFrame: The chunk with sentiment_score_vader and sentiment_vader
+    """
+    if _sia is None:
+        init_worker()
 
-# -----------------------------
-# Display Statistics
-# -----------------------------
-print("=" * 60)
-print("VADER SENTIMENT DISTRIBUTION")
-print("=" * 60)
-print(df['sentiment_vader'].value_counts())
-print()
-
-print("=" * 60)
-print("SENTIMENT SCORE STATISTICS")
-print("=" * 60)
-print(f"Mean score: {df['sentiment_score_vader'].mean():.4f}")
-print(f"Min score: {df['sentiment_score_vader'].min():.4f}")
-print(f"Max score: {df['sentiment_score_vader'].max():.4f}")
-print(f"Median score: {df['sentiment_score_vader'].median():.4f}")
-print()
+    # Not cached: VADER takes microseconds per text, less than a cache lookup
+    polarity_scores = _sia.polarity_scores
+    chunk['sentiment_score_vader'] = [
+        polarity_scores(t)['compound'] for t in chunk[TEXT_COLUMN].astype(str)
+    ]
+    chunk['sentiment_vader'] = chunk['sentiment_score_vader'].map(label)
+    return chunk
 
-# -----------------------------
-# Sample Results
-# -----------------------------
-print("=" * 60)
-print("SAMPLE RESULTS (First 5 rows)")
-print("=" * 60)
-for idx, row in df.head(5).iterrows():
-    print(f"\nReview {idx + 1}:")
-    print(f"Text: {str(row['cleaned_text'])[:100]}...")
-    print(f"Score: {row['sentiment_score_vader']:.4f}")
-    print(f"Sentiment: {row['sentiment_vader']}")
-    print("-" * 60)
+
+def score_file(input_file=INPUT_FILE, output_file=OUTPUT_FILE,
+               chunk_size=CHUNK_SIZE, num_workers=NUM_WORKERS):
+    """
+    Stream a CSV through VADER in chunks and write results as they arrive
+    
+    Chunks are read with pd.read_csv(chunksize=...) and fanned out to a
+    process pool. Output order matches input order, and the next chunk is
+    only read once fewer than IN_FLIGHT_PER_WORKER chunks per worker are
+    pending, so memory stays bounded when the workers fall behind. Score statistics are running aggregates;
+    the median is read from a fixed-bin histogram of the compound score.
+    
+    Args:
+        input_file (str): CSV to score
+        output_file (str): CSV to write
+        chunk_size (int): Rows per chunk
+        num_workers (int): Worker processes (1 = no pool)
+    
+    Returns:
+        dict: Summary with row count, label counts, score stats
+              (mean/min/max/median) and sample rows
+    """
+    reader = pd.read_csv(input_file, chunksize=chunk_size)
+
+    total_rows = 0
+    label_counts = pd.Series(dtype="int64")
+    score_sum = 0.0
+    score_min = np.inf
+    score_max = -np.inf
+    histogram = np.zeros(MEDIAN_BINS, dtype=np.int64)
+    bin_edges = np.linspace(-1.0, 1.0, MEDIAN_BINS + 1)
+    sample = None
+
+    if num_workers > 1:
+        pool = Pool(processes=num_workers, initializer=init_worker)
+        results = imap_bounded(pool, score_chunk, reader, IN_FLIGHT_PER_WORKER * num_workers)
+    else:
+        pool = None
+        results = map(score_chunk, reader)
+
+    try:
+        for chunk in results:
+            chunk.to_csv(output_file, mode="w" if total_rows == 0 else "a",
+                         header=total_rows == 0, index=False)
+
+            total_rows += len(chunk)
+            label_counts = label_counts.add(chunk['sentiment_vader'].value_counts(), fill_value=0)
+            scores = chunk['sentiment_score_vader'].to_numpy(dtype=np.float64)
+            if len(scores):
+                score_sum += scores.sum()
+                score_min = min(score_min, scores.min())
+                score_max = max(score_max, scores.max())
+                histogram += np.histogram(scores, bins=bin_edges)[0]
+            if sample is None:
+                sample = chunk.head(5)
+            print(f"  Scored {total_rows} rows", end="\r")
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    print()
+
+    score_stats = None
+    if total_rows:
+        # Median: midpoint of the bin holding the middle row
+        middle = np.searchsorted(np.cumsum(histogram), (total_rows + 1) / 2)
+        score_stats = {
+            "mean": score_sum / total_rows,
+            "min": score_min,
+            "max": score_max,
+            "median": (bin_edges[middle] + bin_edges[middle + 1]) / 2
+        }
+
+    return {
+        "rows": total_rows,
+        "label_counts": label_counts.astype("int64").sort_values(ascending=False),
+        "score_stats": score_stats,
+        "sample": sample
+    }
+
+
+def main():
+    print(f"Analyzing sentiment in {INPUT_FILE} "
+          f"(chunks of {CHUNK_SIZE}, {NUM_WORKERS} workers)...")
+    summary = score_file()
+    print(f"✅ VADER sentiment analysis completed for {summary['rows']} rows. Saved as {OUTPUT_FILE}")
+    print()
+
+    if summary["rows"] == 0:
+        return
+
+    # -----------------------------
+    # Display Statistics
+    # -----------------------------
+    stats = summary["score_stats"]
+
+    print("=" * 60)
+    print("VADER SENTIMENT DISTRIBUTION")
+    print("=" * 60)
+    print(summary["label_counts"])
+    print()
+
+    print("=" * 60)
+    print("SENTIMENT SCORE STATISTICS")
+    print("=" * 60)
+    print(f"Mean score: {stats['mean']:.4f}")
+    print(f"Min score: {stats['min']:.4f}")
+    print(f"Max score: {stats['max']:.4f}")
+    print(f"Median score: {stats['median']:.4f} (histogram estimate)")
+    print()
+
+    # -----------------------------
+    # Sample Results
+    # -----------------------------
+    print("=" * 60)
+    print("SAMPLE RESULTS (First 5 rows)")
+    print("=" * 60)
+    for idx, row in summary["sample"].iterrows():
+        print(f"\nReview {idx + 1}:")
+        print(f"Text: {str(row[TEXT_COLUMN])[:100]}...")
+        print(f"Score: {row['sentiment_score_vader']:.4f}")
+        print(f"Sentiment: {row['sentiment_vader']}")
+        print("-" * 60)
+
+
+if __name__ == "__main__":
+    main()
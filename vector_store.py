@@ -0,0 +1,798 @@
+"""
+Vector Store Module
+-------------------
+Streaming, incremental builder for the FAISS vector database
+
+Reviews, news and Reddit rows are turned into documents lazily
+(itertuples, one row at a time), embedded in fixed-size batches and
+added to the FAISS index batch by batch. Only one batch of texts and
+embeddings is held in memory beyond what the index itself stores.
+
+Every document carries structured metadata for filtering:
+
+    {"doc_id": stable document id (e.g. "news:<url>"),
+     "source": "review" | "news" | "reddit",
+     "source_name": original source (e.g. Amazon, BBC News),
+     "category": ..., "sentiment": ..., "date": "YYYY-MM-DD" or None}
+
+Reviews additionally carry "topic".
+
+Incremental updates
+-------------------
+sync_vector_db() keeps a manifest (manifest.json in the index folder)
+of document id -> content hash. On each run only new or changed
+documents are embedded and appended. Documents that disappeared, and
+old versions of changed ones, are tombstoned: their entries are marked
+"deleted" in the docstore and skipped by search_documents(). Once
+tombstones exceed TOMBSTONE_COMPACT_RATIO of the index they are removed
+from the FAISS index for good: flat indexes in place, other index types
+by rebuilding them from their live vectors.
+
+Index types
+-----------
+VECTOR_INDEX_TYPE selects the FAISS index built for a new index:
+
+- flat      exact search (default), memory and latency grow linearly
+- ivf_flat  inverted lists over k-means cells, searches NPROBE cells
+- ivf_pq    IVF with product-quantized vectors (~48 bytes per vector)
+- hnsw      graph index, no training
+
+Any other value is passed to faiss.index_factory as is. IVF indexes are
+trained on a random sample of TRAIN_SAMPLE_SIZE documents drawn from the
+whole build (reservoir sampling while streaming; the embedded batches
+wait in a temporary folder until the index is trained).
+Changing the index type rebuilds the index on the next run.
+benchmark_vector_index.py measures recall against exact search.
+
+Filtered retrieval
+------------------
+metadata_table() loads the metadata of the live documents once.
+select_positions() maps filters (document type, review site, category,
+sentiment, dates) to FAISS positions, and filtered_search() searches
+only those positions through a FAISS ID selector.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from itertools import islice
+
+import faiss
+import numpy as np
+import pandas as pd
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_huggingface import HuggingFaceEmbeddings
+
+# -----------------------------
+# VECTOR STORE CONFIG
+# -----------------------------
+INDEX_PATH = "consumer_sentiment_faiss1"
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+EMBED_BATCH_SIZE = 256      # Documents embedded and added per batch
+MANIFEST_FILE = "manifest.json"
+TOMBSTONE_COMPACT_RATIO = 0.2   # Compact once this share of the index is tombstoned
+SEARCH_FETCH_K = 50         # Candidates fetched before metadata filtering
+
+INDEX_TYPE = os.getenv("VECTOR_INDEX_TYPE", "flat")
+INDEX_PRESETS = {
+    "flat": "Flat",
+    "ivf_flat": "IVF{nlist},Flat",
+    "ivf_pq": "IVF{nlist},PQ{pq_m}",
+    "hnsw": "HNSW{hnsw_m}"
+}
+IVF_NLIST = int(os.getenv("VECTOR_INDEX_NLIST", "1024"))    # Upper bound, scaled to the training sample
+PQ_M = 48                   # Sub-quantizers (384 dims / 48 = 8 dims each)
+HNSW_M = 32                 # Graph neighbours per node
+TRAIN_SAMPLE_SIZE = 50000   # Random sample of embedded documents used to train IVF indexes
+NPROBE = int(os.getenv("VECTOR_INDEX_NPROBE", "16"))        # IVF cells searched per query
+EF_SEARCH = int(os.getenv("VECTOR_INDEX_EF_SEARCH", "64"))  # HNSW search breadth
+
+
+def load_embeddings():
+    """Load the sentence-transformers embedding model used by the index"""
+    return HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
+
+
+def _rows(df):
+    """Yield rows as {column: value} dicts (itertuples, no Series per row)"""
+    columns = list(df.columns)
+    for values in df.itertuples(index=False, name=None):
+        yield dict(zip(columns, values))
+
+
+def _date(value):
+    """Normalize a date value to YYYY-MM-DD (None when missing)"""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    try:
+        return pd.Timestamp(value).strftime("%Y-%m-%d")
+    except (ValueError, TypeError):
+        return None
+
+
+def _label(value, default="Unknown"):
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return default
+    return str(value)
+
+
+def _hash(*parts):
+    return hashlib.sha1("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()[:16]
+
+
+def _present(row, column):
+    value = row.get(column)
+    return value is not None and (isinstance(value, str) or not pd.isna(value)) and str(value) != ""
+
+
+def iter_review_documents(df):
+    """Yield (doc_id, text, metadata) for each review row"""
+    for row in _rows(df):
+        if _present(row, "review_id"):
+            doc_id = f"review:{row['review_id']}"
+        else:
+            doc_id = "review:" + _hash(row.get("source"), row.get("product"),
+                                       row.get("review_text"), row.get("review_date"))
+        text = f"""
+Category: {row.get('category', 'Unknown')}
+Source: {row.get('source', 'Review')}
+Sentiment: {row.get('sentiment_label', 'Unknown')}
+Topic: {row.get('topic_label', 'Unknown')}
+Review: {row.get('review_text', '')}
+"""
+        yield doc_id, text.strip(), {
+            "source": "review",
+            "source_name": _label(row.get("source"), "Review"),
+            "category": _label(row.get("category")),
+            "sentiment": _label(row.get("sentiment_label")),
+            "topic": _label(row.get("topic_label")),
+            "date": _date(row.get("review_date"))
+        }
+
+
+def iter_news_documents(df):
+    """Yield (doc_id, text, metadata) for each news article row"""
+    for row in _rows(df):
+        if _present(row, "url"):
+            doc_id = f"news:{row['url']}"
+        else:
+            doc_id = "news:" + _hash(row.get("title"), row.get("published_at"))
+        text = f"""
+Category: {row.get('category', 'Unknown')}
+Source: News - {row.get('source', 'Unknown')}
+Sentiment: {row.get('sentiment_label', 'Unknown')}
+Title: {row.get('title', '')}
+Description: {row.get('description', '')}
+"""
+        yield doc_id, text.strip(), {
+            "source": "news",
+            "source_name": _label(row.get("source")),
+            "category": _label(row.get("category")),
+            "sentiment": _label(row.get("sentiment_label")),
+            "date": _date(row.get("published_at"))
+        }
+
+
+def iter_reddit_documents(df):
+    """Yield (doc_id, text, metadata) for each Reddit post row"""
+    for row in _rows(df):
+        key = next((row[c] for c in ("id", "permalink", "url") if _present(row, c)), None)
+        doc_id = f"reddit:{key}" if key is not None else "reddit:" + _hash(row.get("title"), row.get("created_date"))
+        text = f"""
+Category: {row.get('category_label', 'Unknown')}
+Source: Reddit
+Title: {row.get('title', '')}
+Text: {row.get('selftext', '')}
+"""
+        yield doc_id, text.strip(), {
+            "source": "reddit",
+            "source_name": "Reddit",
+            "category": _label(row.get("category_label")),
+            "sentiment": _label(row.get("sentiment_label")),
+            "date": _date(row.get("created_date"))
+        }
+
+
+def batched(iterable, size):
+    """Yield lists of up to size items"""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def content_hash(text, metadata):
+    """Hash of everything stored for a document (text and metadata)"""
+    payload = json.dumps(metadata, sort_keys=True, default=str)
+    return hashlib.sha1(f"{text}\0{payload}".encode("utf-8")).hexdigest()
+
+
+def index_factory_string(index_type, n_train):
+    """
+    FAISS factory string for an index type
+
+    Args:
+        index_type (str): A key of INDEX_PRESETS or a raw factory string
+        n_train (int): Training vectors available (caps the IVF cell count
+                       at ~39 training points per cell, as FAISS recommends)
+    """
+    nlist = max(1, min(IVF_NLIST, n_train // 39))
+    if index_type == "ivf_pq" and n_train < 256:
+        # 8-bit PQ codebooks need at least 256 training vectors
+        index_type = "ivf_flat"
+    template = INDEX_PRESETS.get(index_type, index_type)
+    return template.format(nlist=nlist, pq_m=PQ_M, hnsw_m=HNSW_M)
+
+
+def configure_index(index):
+    """Apply the query-time settings (nprobe / efSearch) to an index"""
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.nprobe = NPROBE
+    if hasattr(index, "hnsw"):
+        index.hnsw.efSearch = EF_SEARCH
+    return index
+
+
+def create_faiss_index(vectors, index_type=INDEX_TYPE):
+    """
+    Create (and train, if needed) an empty FAISS index
+
+    Args:
+        vectors: Embeddings to train on (n x dim), not added to the index
+        index_type (str): See INDEX_PRESETS
+
+    Returns:
+        faiss.Index: Trained, empty index using L2 distance
+    """
+    vectors = np.asarray(vectors, dtype="float32")
+    index = faiss.index_factory(vectors.shape[1], index_factory_string(index_type, len(vectors)), faiss.METRIC_L2)
+    if not index.is_trained:
+        index.train(vectors)
+    return configure_index(index)
+
+
+def needs_training(index_type, dim):
+    """True if the index type must be trained before adding vectors"""
+    return not faiss.index_factory(dim, index_factory_string(index_type, TRAIN_SAMPLE_SIZE)).is_trained
+
+
+def load_manifest(path=INDEX_PATH):
+    """
+    Load the index manifest
+
+    Returns:
+        dict: {"documents": {doc_id: {"hash", "store_id"}},
+               "tombstones": [store_id, ...], "version": int,
+               "index_type": str}
+    """
+    manifest_path = os.path.join(path, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return {"documents": {}, "tombstones": [], "version": 0, "index_type": INDEX_TYPE}
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def index_version(path=INDEX_PATH):
+    """Version of the saved index, bumped by every sync_vector_db() run that changes it"""
+    return load_manifest(path).get("version", 0)
+
+
+def save_manifest(manifest, path=INDEX_PATH):
+    os.makedirs(path, exist_ok=True)
+    tmp_path = os.path.join(path, MANIFEST_FILE + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, os.path.join(path, MANIFEST_FILE))
+
+
+def _tombstone(vector_db, store_ids):
+    """Mark docstore entries as deleted (their vectors stay until compaction)"""
+    for store_id in store_ids:
+        document = vector_db.docstore.search(store_id)
+        if not isinstance(document, str):  # InMemoryDocstore returns a message when missing
+            document.metadata["deleted"] = True
+
+
+def _live_positions(vector_db):
+    """FAISS positions whose docstore entry exists and is not tombstoned"""
+    positions = []
+    for position, store_id in vector_db.index_to_docstore_id.items():
+        document = vector_db.docstore.search(store_id)
+        if not isinstance(document, str) and not document.metadata.get("deleted"):
+            positions.append(position)
+    return positions
+
+
+def _stores_exact_vectors(index):
+    """
+    True if vectors can be read back exactly with index.reconstruct()
+
+    IVF indexes get a direct map (id -> list entry) for the lookups.
+    Product/scalar-quantized indexes only hold lossy codes.
+    """
+    if isinstance(faiss.downcast_index(index), (faiss.IndexIVFPQ, faiss.IndexIVFScalarQuantizer)):
+        return False
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.make_direct_map()
+    return True
+
+
+def _rebuild_store(vector_db, embeddings, batch_size=EMBED_BATCH_SIZE):
+    """
+    Rebuild the store with only its live documents, at positions 0..n-1
+
+    The trained index is cloned and emptied, so IVF centroids and PQ
+    codebooks are kept. Vectors are read back from the index when it
+    stores them exactly; lossy (PQ) indexes re-embed the texts instead.
+    """
+    positions = _live_positions(vector_db)
+    exact = _stores_exact_vectors(vector_db.index)
+    index = faiss.clone_index(vector_db.index)
+    index.reset()
+    store = FAISS(embeddings, configure_index(index), InMemoryDocstore(), {})
+
+    for batch in batched(positions, batch_size):
+        store_ids = [vector_db.index_to_docstore_id[p] for p in batch]
+        documents = [vector_db.docstore.search(i) for i in store_ids]
+        texts = [d.page_content for d in documents]
+        if exact:
+            vectors = np.vstack([vector_db.index.reconstruct(int(p)) for p in batch]).astype("float32")
+        else:
+            vectors = np.asarray(embeddings.embed_documents(texts), dtype="float32")
+        store.add_embeddings(list(zip(texts, vectors)),
+                             metadatas=[d.metadata for d in documents], ids=store_ids)
+    return store
+
+
+def _compact(vector_db, manifest, embeddings):
+    """
+    Remove tombstoned vectors once they are a large share of the index
+
+    Flat indexes remove vectors in place (FAISS shifts the remaining
+    vectors down, matching LangChain's renumbering). IVF indexes keep the
+    old ids in their inverted lists after remove_ids and HNSW cannot
+    remove at all, so every other index type is rebuilt instead.
+
+    Returns:
+        tuple: (vector store, number of vectors removed)
+    """
+    tombstones = manifest["tombstones"]
+    if not tombstones or len(tombstones) < TOMBSTONE_COMPACT_RATIO * vector_db.index.ntotal:
+        return vector_db, 0
+
+    before = vector_db.index.ntotal
+    if isinstance(faiss.downcast_index(vector_db.index), faiss.IndexFlat):
+        indexed = set(vector_db.index_to_docstore_id.values())
+        vector_db.delete([i for i in tombstones if i in indexed])
+    else:
+        vector_db = _rebuild_store(vector_db, embeddings)
+    _check_positions(vector_db)
+
+    manifest["tombstones"] = []
+    return vector_db, before - vector_db.index.ntotal
+
+
+def _check_positions(vector_db, sample_size=20, k=10):
+    """
+    Verify that search results still point at the right documents
+
+    The texts of a sample of documents are embedded again and searched
+    for; each must come back at its own position (or tie with an
+    identical document). Raises RuntimeError so a broken index is never
+    saved.
+    """
+    index = vector_db.index
+    if index.ntotal != len(vector_db.index_to_docstore_id):
+        raise RuntimeError(f"Index holds {index.ntotal} vectors but maps {len(vector_db.index_to_docstore_id)} documents")
+    if index.ntotal == 0:
+        return
+
+    positions = np.random.default_rng(0).choice(index.ntotal, min(sample_size, index.ntotal), replace=False)
+    expected = documents_at(vector_db, [int(p) for p in positions])
+    vectors = np.asarray(vector_db.embeddings.embed_documents([d.page_content for d in expected]), dtype="float32")
+    if vector_db._normalize_L2:
+        faiss.normalize_L2(vectors)
+    _, found = index.search(vectors, min(k, index.ntotal))
+
+    for position, document, hits in zip(positions, expected, found):
+        if int(position) in hits:
+            continue
+        top = vector_db.index_to_docstore_id.get(int(hits[0]))
+        if top is None or vector_db.docstore.search(top).page_content != document.page_content:
+            raise RuntimeError(f"Search for the document at position {position} does not return it")
+
+
+class _ReservoirSample:
+    """Uniform random sample of fixed size over a stream of vectors"""
+
+    def __init__(self, size, seed=42):
+        self.size = size
+        self.rng = np.random.default_rng(seed)
+        self.buffer = None
+        self.filled = 0
+        self.seen = 0
+
+    def add(self, vectors):
+        if self.buffer is None:
+            self.buffer = np.empty((self.size, vectors.shape[1]), dtype="float32")
+        for vector in vectors:
+            if self.filled < self.size:
+                self.buffer[self.filled] = vector
+                self.filled += 1
+            else:
+                slot = self.rng.integers(0, self.seen + 1)
+                if slot < self.size:
+                    self.buffer[slot] = vector
+            self.seen += 1
+
+    @property
+    def vectors(self):
+        return self.buffer[:self.filled]
+
+
+class _BatchSpill:
+    """Embedded batches parked in a temporary folder until the index is trained"""
+
+    def __init__(self):
+        self.directory = tempfile.mkdtemp(prefix="vector_db_batches_")
+        self.count = 0
+
+    def write(self, ids, texts, metadatas, vectors):
+        base = os.path.join(self.directory, f"batch_{self.count:06d}")
+        np.save(base + ".npy", vectors)
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump({"ids": ids, "texts": texts, "metadatas": metadatas}, f)
+        self.count += 1
+
+    def read(self):
+        """Yield (ids, texts, metadatas, vectors) in write order"""
+        for n in range(self.count):
+            base = os.path.join(self.directory, f"batch_{n:06d}")
+            with open(base + ".json", "r", encoding="utf-8") as f:
+                batch = json.load(f)
+            yield batch["ids"], batch["texts"], batch["metadatas"], np.load(base + ".npy")
+
+    def close(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def sync_vector_db(documents, embeddings, path=INDEX_PATH, rebuild=False,
+                   batch_size=EMBED_BATCH_SIZE, on_batch=None, index_type=INDEX_TYPE):
+    """
+    Bring the saved index up to date with a stream of documents
+
+    Only new and changed documents are embedded. Documents missing from
+    the stream are tombstoned. With rebuild=True (or no usable index on
+    disk) the index is built from scratch. The index and manifest are only
+    saved, and the manifest version bumped, when something changed.
+
+    Args:
+        documents (iterable): (doc_id, text, metadata) triples, consumed lazily
+        embeddings: LangChain embeddings object
+        path (str): Index folder
+        rebuild (bool): Ignore the saved index and manifest
+        batch_size (int): Documents embedded and added per batch
+        on_batch (callable): Called with the running embedded count after each batch
+        index_type (str): Index type for a new index (see INDEX_PRESETS)
+
+    Returns:
+        tuple: (FAISS vector store or None, stats dict with
+                added/changed/unchanged/deleted/compacted counts)
+    """
+    vector_db = None
+    saved = load_manifest(path)
+    # A rebuilt index continues the saved version numbering, so a version
+    # never names two different indexes (BM25 and RAG caches key on it)
+    manifest = {"documents": {}, "tombstones": [], "version": saved.get("version", 0),
+                "index_type": index_type}
+    index_file = os.path.join(path, "index.faiss")
+    if not rebuild and os.path.exists(index_file) and os.path.exists(os.path.join(path, MANIFEST_FILE)):
+        if saved.get("index_type", "flat") == index_type:
+            vector_db = load_vector_db(embeddings, path)
+            manifest = saved
+        else:
+            print(f"   Index type changed ({saved.get('index_type', 'flat')} -> {index_type}), rebuilding")
+    loaded = vector_db is not None
+
+    known = manifest["documents"]
+    stats = {"added": 0, "changed": 0, "unchanged": 0, "deleted": 0, "compacted": 0}
+    seen = set()
+    occurrences = {}
+    replaced = []
+
+    def pending():
+        # Yields only the documents that need embedding, updating the manifest as it goes
+        for doc_id, text, metadata in documents:
+            # Identical ids within one run (e.g. duplicate rows) get a #n suffix
+            count = occurrences.get(doc_id, 0)
+            occurrences[doc_id] = count + 1
+            if count:
+                doc_id = f"{doc_id}#{count}"
+            seen.add(doc_id)
+
+            digest = content_hash(text, metadata)
+            entry = known.get(doc_id)
+            if entry and entry["hash"] == digest:
+                stats["unchanged"] += 1
+                continue
+
+            if entry:
+                stats["changed"] += 1
+                replaced.append(entry["store_id"])
+            else:
+                stats["added"] += 1
+            store_id = f"{doc_id}@{digest[:12]}"
+            known[doc_id] = {"hash": digest, "store_id": store_id}
+            yield store_id, text, dict(metadata, doc_id=doc_id)
+
+    def add(store, ids, texts, metadatas, vectors):
+        store.add_embeddings(list(zip(texts, vectors)), metadatas=metadatas, ids=ids)
+
+    def new_store(train_vectors):
+        return FAISS(embeddings, create_faiss_index(train_vectors, index_type), InMemoryDocstore(), {})
+
+    # A new index that needs training (IVF) is trained on a reservoir sample
+    # of the whole stream, so reviews, news and Reddit are all represented.
+    # Embedded batches are spilled to disk until the index is trained.
+    sample = None
+    spill = None
+    embedded = 0
+
+    try:
+        for batch in batched(pending(), batch_size):
+            ids = [store_id for store_id, _, _ in batch]
+            texts = [text for _, text, _ in batch]
+            metadatas = [metadata for _, _, metadata in batch]
+            vectors = np.asarray(embeddings.embed_documents(texts), dtype="float32")
+
+            if vector_db is None and sample is None:
+                if needs_training(index_type, vectors.shape[1]):
+                    sample = _ReservoirSample(TRAIN_SAMPLE_SIZE)
+                    spill = _BatchSpill()
+                else:
+                    vector_db = new_store(vectors)
+
+            if sample is not None:
+                sample.add(vectors)
+                spill.write(ids, texts, metadatas, vectors)
+            else:
+                add(vector_db, ids, texts, metadatas, vectors)
+
+            embedded += len(batch)
+            if on_batch:
+                on_batch(embedded)
+
+        if sample is not None:
+            vector_db = new_store(sample.vectors)
+            for item in spill.read():
+                add(vector_db, *item)
+    finally:
+        if spill is not None:
+            spill.close()
+
+    removed = [doc_id for doc_id in known if doc_id not in seen]
+    stats["deleted"] = len(removed)
+    tombstones = replaced + [known.pop(doc_id)["store_id"] for doc_id in removed]
+
+    if vector_db is not None:
+        _tombstone(vector_db, tombstones)
+        manifest["tombstones"].extend(tombstones)
+        vector_db, stats["compacted"] = _compact(vector_db, manifest, embeddings)
+
+        # An unchanged index keeps its version, so the RAG retrieval cache
+        # and the BM25 index built for it stay valid
+        changed = stats["added"] or stats["changed"] or stats["deleted"] or stats["compacted"]
+        if changed or not loaded:
+            manifest["version"] += 1
+            vector_db.save_local(path)
+            save_manifest(manifest, path)
+
+    return vector_db, stats
+
+
+def load_vector_db(embeddings, path=INDEX_PATH):
+    """Load the saved FAISS index (with the configured nprobe / efSearch)"""
+    vector_db = FAISS.load_local(path, embeddings, allow_dangerous_deserialization=True)
+    configure_index(vector_db.index)
+    return vector_db
+
+
+def load_versioned_vector_db(embeddings, path=INDEX_PATH):
+    """
+    Load the saved FAISS index together with its manifest version
+
+    The version is read before and after loading. If a sync saved a new
+    index in between, the index is loaded again, so the version always
+    matches the positions and docstore that were loaded.
+
+    Returns:
+        tuple: (FAISS vector store, int version)
+    """
+    while True:
+        version = index_version(path)
+        vector_db = load_vector_db(embeddings, path)
+        if index_version(path) == version:
+            return vector_db, version
+
+
+def search_documents(vector_db, query, k=10, filter=None, fetch_k=SEARCH_FETCH_K):
+    """
+    similarity_search that skips tombstoned documents
+
+    Args:
+        vector_db (FAISS): Vector store
+        query (str): Search text
+        k (int): Documents to return
+        filter (callable): Optional extra metadata predicate
+        fetch_k (int): Candidates fetched before filtering
+
+    Returns:
+        list: Up to k Documents
+    """
+    def keep(metadata):
+        return not metadata.get("deleted") and (filter is None or filter(metadata))
+
+    return vector_db.similarity_search(query, k=k, filter=keep, fetch_k=max(fetch_k, k))
+
+
+# -----------------------------
+# Filtered Retrieval
+# -----------------------------
+def metadata_table(vector_db):
+    """
+    Metadata of the live documents, indexed by FAISS position
+
+    Built once per loaded index. select_positions() turns filters into
+    positions against it, which filtered_search() then searches.
+
+    Returns:
+        pd.DataFrame: source, source_name, category, sentiment, date
+    """
+    records = []
+    for position, store_id in vector_db.index_to_docstore_id.items():
+        document = vector_db.docstore.search(store_id)
+        if isinstance(document, str) or document.metadata.get("deleted"):
+            continue
+        metadata = document.metadata
+        records.append((position, metadata.get("source"), metadata.get("source_name"),
+                        metadata.get("category"), metadata.get("sentiment"), metadata.get("date")))
+
+    table = pd.DataFrame.from_records(
+        records, columns=["position", "source", "source_name", "category", "sentiment", "date"]
+    ).set_index("position")
+    for column in ("source", "source_name", "category", "sentiment"):
+        table[column] = table[column].astype("category")
+    table["date"] = pd.to_datetime(table["date"], errors="coerce")
+    return table
+
+
+def select_positions(table, sources=None, review_sources=None, categories=None,
+                     sentiments=None, start_date=None, end_date=None):
+    """
+    FAISS positions of the documents matching every given filter
+
+    Args:
+        table (pd.DataFrame): Output of metadata_table()
+        sources (list): Document types ("review", "news", "reddit")
+        review_sources (list): Review sites (source_name); news and
+                               Reddit documents are not restricted by it
+        categories (list): Product categories
+        sentiments (list): Sentiment labels
+        start_date, end_date: Inclusive date range (undated documents are dropped)
+
+    None leaves a filter off.
+
+    Returns:
+        np.ndarray: int64 FAISS positions
+    """
+    mask = np.ones(len(table), dtype=bool)
+    if sources is not None:
+        mask &= table["source"].isin(sources).to_numpy()
+    if review_sources is not None:
+        mask &= ((table["source"] != "review") | table["source_name"].isin(review_sources)).to_numpy()
+    if categories is not None:
+        mask &= table["category"].isin(categories).to_numpy()
+    if sentiments is not None:
+        mask &= table["sentiment"].isin(sentiments).to_numpy()
+    if start_date is not None:
+        mask &= (table["date"] >= pd.Timestamp(start_date)).to_numpy()
+    if end_date is not None:
+        mask &= (table["date"] <= pd.Timestamp(end_date)).to_numpy()
+    return table.index.to_numpy(dtype="int64")[mask]
+
+
+def _search_params(index, selector, exhaustive=False):
+    """FAISS search parameters restricting the search to selector"""
+    if isinstance(index, faiss.IndexHNSW):
+        ef_search = min(index.ntotal, 16384) if exhaustive else EF_SEARCH
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=max(ef_search, EF_SEARCH))
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        return faiss.SearchParametersIVF(sel=selector, nprobe=ivf.nlist if exhaustive else NPROBE)
+    return faiss.SearchParameters(sel=selector)
+
+
+def embed_query(vector_db, query):
+    """Query embedding as a (1, dim) float32 array, normalized like the index"""
+    vector = np.asarray([vector_db.embeddings.embed_query(query)], dtype="float32")
+    if vector_db._normalize_L2:
+        faiss.normalize_L2(vector)
+    return vector
+
+
+def search_vector(vector_db, vector, k=10, positions=None, fetch_k=SEARCH_FETCH_K):
+    """
+    Nearest live documents to a query embedding
+
+    Args:
+        vector_db (FAISS): Vector store
+        vector (np.ndarray): (1, dim) query embedding (embed_query())
+        k (int): Documents to return
+        positions (np.ndarray): Restrict the search to these FAISS positions
+                                (select_positions()); None searches everything
+        fetch_k (int): Candidates fetched before dropping tombstones
+                       (unrestricted search only)
+
+    Returns:
+        list: Up to k FAISS positions, nearest first
+    """
+    index = vector_db.index
+    vector = np.asarray(vector, dtype="float32").reshape(1, -1)
+
+    if positions is None:
+        _, found = index.search(vector, min(max(fetch_k, k), index.ntotal))
+        hits = []
+        for position in found[0]:
+            if position < 0:
+                continue
+            document = vector_db.docstore.search(vector_db.index_to_docstore_id[int(position)])
+            if not isinstance(document, str) and not document.metadata.get("deleted"):
+                hits.append(int(position))
+                if len(hits) == k:
+                    break
+        return hits
+
+    # The positions are passed to FAISS as an ID selector, so only matching
+    # vectors are scored. Unlike fetching extra candidates and filtering
+    # them afterwards, this still returns k documents for selective filters.
+    k = min(k, len(positions))
+    if k == 0:
+        return []
+    positions = np.ascontiguousarray(positions, dtype="int64")
+    selector = faiss.IDSelectorBatch(len(positions), faiss.swig_ptr(positions))
+
+    _, found = index.search(vector, k, params=_search_params(index, selector))
+    hits = found[0][found[0] >= 0]
+    if len(hits) < k:
+        # The probed IVF cells / HNSW neighbourhood held too few matches
+        _, found = index.search(vector, k, params=_search_params(index, selector, exhaustive=True))
+        hits = found[0][found[0] >= 0]
+    return [int(position) for position in hits]
+
+
+def documents_at(vector_db, positions):
+    """Documents stored at FAISS positions"""
+    return [vector_db.docstore.search(vector_db.index_to_docstore_id[p]) for p in positions]
+
+
+def filtered_search(vector_db, query, positions, k=10):
+    """
+    Similarity search over a subset of the index
+
+    Args:
+        vector_db (FAISS): Vector store
+        query (str): Search text
+        positions (np.ndarray): FAISS positions to search (select_positions())
+        k (int): Documents to return
+
+    Returns:
+        list: Up to k Documents, nearest first
+    """
+    return documents_at(vector_db, search_vector(vector_db, embed_query(vector_db, query), k, positions))
@@ -14,6 +14,7 @@ import numpy as np
 from datetime import datetime, timedelta
 import os
 from notification import send_mail
+from data_store import read_table
 
 
 class WeeklyAutomation:
@@ -35,7 +36,7 @@ class WeeklyAutomation:
         try:
             # Placeholder: Load existing data
             # In production: Call scraping.collect_reviews()
-            reviews = pd.read_csv(f"{self.data_dir}/category_wise_lda_output_with_topic_labels.csv")
+            reviews = read_table(f"{self.data_dir}/category_wise_lda_output_with_topic_labels.csv")
             
             self.collection_results["reviews"] = {
                 "status": "success",
@@ -64,7 +65,7 @@ class WeeklyAutomation:
         try:
             # Placeholder: Load existing data
             # In production: Call news_api_collector.collect_news()
-            news = pd.read_csv(f"{self.data_dir}/news_data_with_sentiment.csv")
+            news = read_table(f"{self.data_dir}/news_data_with_sentiment.csv")
             
             self.collection_results["news"] = {
                 "status": "success",
@@ -93,7 +94,7 @@ class WeeklyAutomation:
         try:
             # Placeholder: Load existing data
             # In production: Call reddit_data_collector.collect_posts()
-            reddit = pd.read_excel(f"{self.data_dir}/reddit_category_trend_data.xlsx")
+            reddit = read_table(f"{self.data_dir}/reddit_category_trend_data.xlsx")
             
             self.collection_results["reddit"] = {
                 "status": "success",
@@ -2,13 +2,24 @@
 Zero-Shot Classification on CSV Dataset
 ----------------------------------------
 Classify all products from a CSV file using BART model
-Processes large datasets efficiently
+Processes large datasets efficiently:
+- Product names are deduplicated before classification
+- Names are classified in batches through the pipeline
+- Results are checkpointed after every batch, so an interrupted
+  run resumes where it stopped
 """
 
 from transformers import pipeline
 import pandas as pd
 from tqdm import tqdm
-import time
+import os
+
+# -----------------------------
+# Configuration
+# -----------------------------
+SAMPLE_SIZE = None      # e.g. 20 for a quick demo, None for the full dataset
+BATCH_SIZE = 16
+CHECKPOINT_FILE = "datasets/zeroshot_batch_checkpoint.csv"  # Delete after changing labels
 
 print("=" * 60)
 print("ZERO-SHOT CLASSIFICATION - BATCH PROCESSING")
@@ -80,47 +91,65 @@ print(f"Using column: '{product_col}'")
 print()
 
 # -----------------------------
-# Sample for Testing (Process first 20)
+# Deduplicate Product Names
 # -----------------------------
-print("Processing first 20 products for demonstration...")
-print("(To process all, remove the .head(20) line in the code)")
-print()
+if SAMPLE_SIZE:
+    df = df.head(SAMPLE_SIZE)
+    print(f"Processing first {SAMPLE_SIZE} products (set SAMPLE_SIZE = None for all)")
 
-df_sample = df.head(20)
+names = df[product_col].astype(str)
+names = names[(names.str.strip() != "") & (names != "nan")]
+unique_names = names.drop_duplicates().tolist()
+print(f"Unique product names: {len(unique_names)} (from {len(names)} rows)")
 
 # -----------------------------
-# Classify Products
+# Resume From Checkpoint
 # -----------------------------
-results = []
+done_names = set()
+if os.path.exists(CHECKPOINT_FILE):
+    checkpoint = pd.read_csv(CHECKPOINT_FILE)
+    done_names = set(checkpoint["product_name"].astype(str))
+    print(f"Resuming: {len(done_names)} products already classified in {CHECKPOINT_FILE}")
+
+pending = [name for name in unique_names if name not in done_names]
+print(f"Products to classify: {len(pending)}")
+print()
 
-print("Classifying products...")
+# -----------------------------
+# Classify Products in Batches
+# -----------------------------
+print(f"Classifying products (batch size {BATCH_SIZE})...")
 print("-" * 60)
 
-for idx, row in tqdm(df_sample.iterrows(), total=len(df_sample)):
-    product_name = str(row[product_col])
-    
-    # Skip empty products
-    if not product_name or product_name == "nan":
-        continue
+for start in tqdm(range(0, len(pending), BATCH_SIZE)):
+    batch = pending[start:start + BATCH_SIZE]
     
     try:
-        result = classifier(product_name, labels)
-        
-        results.append({
-            "product_name": product_name,
-            "predicted_category": result["labels"][0],
-            "confidence": round(result["scores"][0], 4),
-            "second_best": result["labels"][1],
-            "second_confidence": round(result["scores"][1], 4),
-            "third_best": result["labels"][2],
-            "third_confidence": round(result["scores"][2], 4)
-        })
-        
+        batch_results = classifier(batch, labels, batch_size=BATCH_SIZE)
     except Exception as e:
-        print(f"Error processing: {product_name[:50]} - {e}")
+        print(f"Error processing batch starting at {batch[0][:50]} - {e}")
         continue
     
-    time.sleep(0.1)  # Small delay
+    if isinstance(batch_results, dict):
+        batch_results = [batch_results]
+    
+    rows = [{
+        "product_name": product_name,
+        "predicted_category": result["labels"][0],
+        "confidence": round(result["scores"][0], 4),
+        "second_best": result["labels"][1],
+        "second_confidence": round(result["scores"][1], 4),
+        "third_best": result["labels"][2],
+        "third_confidence": round(result["scores"][2], 4)
+    } for product_name, result in zip(batch, batch_results)]
+    
+    # Append every batch so an interrupted run resumes here
+    pd.DataFrame(rows).to_csv(
+        CHECKPOINT_FILE,
+        mode="a",
+        header=not os.path.exists(CHECKPOINT_FILE),
+        index=False
+    )
 
 print()
 print("✅ Classification completed!")
@@ -129,7 +158,17 @@ print()
 # -----------------------------
 # Save Results
 # -----------------------------
-df_results = pd.DataFrame(results)
+if not os.path.exists(CHECKPOINT_FILE):
+    print("❌ No products were classified.")
+    exit()
+
+predictions = pd.read_csv(CHECKPOINT_FILE).drop_duplicates(subset="product_name")
+predictions["product_name"] = predictions["product_name"].astype(str)
+
+# One row per product row in the dataset, as before deduplication
+df_results = names.rename("product_name").to_frame().merge(
+    predictions, on="product_name", how="inner"
+)
 
 output_file = "datasets/zeroshot_batch_results.csv"
 df_results.to_csv(output_file, index=False)
@@ -163,7 +202,7 @@ low_conf = df_results[df_results['confidence'] < 0.5]
 if not low_conf.empty:
     print("⚠️ Low Confidence Predictions (< 50%):")
     print("-" * 60)
-    for idx, row in low_conf.iterrows():
+    for idx, row in low_conf.drop_duplicates(subset="product_name").head(20).iterrows():
         print(f"- {row['product_name'][:50]}")
         print(f"  Category: {row['predicted_category']} ({row['confidence']:.2%})")
     print()
@@ -1,7 +1,7 @@
 import pandas as pd
-from transformers import pipeline
-import torch
 import re
+from zeroshot_engine import ZeroShotCategorizer
+from keyword_rules import load_matcher, ZEROSHOT_OVERRIDE_RULES
 
 # -----------------------------
 # Load CSV
@@ -26,16 +26,6 @@ df["clean_product"] = df["product"].apply(clean_product_name)
 df_flipkart = df[df["source"].str.lower() == "flipkart"].copy()
 df_non_flipkart = df[df["source"].str.lower() != "flipkart"].copy()
 
-# -----------------------------
-# Zero-shot classifier (GPU if available)
-# -----------------------------
-device = 0 if torch.cuda.is_available() else -1
-classifier = pipeline(
-    "zero-shot-classification",
-    model="facebook/bart-large-mnli",
-    device=device,
-)
-
 labels = [
     "Electricals_Power_Backup",
     "Kitchen_Appliances",
@@ -77,50 +67,19 @@ unique_products = (
 # -----------------------------
 # Rule-based keyword override
 # -----------------------------
+# Rules live in rules/zeroshot_override_rules.json (first matching rule wins)
+OVERRIDE_RULES = load_matcher(ZEROSHOT_OVERRIDE_RULES)
+
+
 def keyword_override(clean_name):
-    if ("juicer" in clean_name or "mixer" in clean_name or "grinder" in clean_name or
-        "heater" in clean_name or "dishwasher" in clean_name or "chimneyblack" in clean_name or
-        "purifier" in clean_name or "otg" in clean_name or "ml" in clean_name or "cooking" in clean_name):
-        return "Kitchen_Appliances"
-    
-    if "charger" in clean_name or "cable" in clean_name or "cover" in clean_name:
-        return "Mobile_Accessories"
-    
-    if "toy" in clean_name or "kids" in clean_name:
-        return "Toys_Kids"
-    
-    if ("cooler" in clean_name or "fan" in clean_name or "air" in clean_name or
-        "refrigerator" in clean_name or "sewing" in clean_name):
-        return "Home_Appliances"
-    
-    if (re.search(r"\b\d+(\.\d+)?\s*(w|kw|watt|watts)\b", clean_name) or "streaming" in clean_name or
-        "speaker" in clean_name or "led" in clean_name or "intel" in clean_name or "ryzen" in clean_name or
-        "home theatre" in clean_name or "core" in clean_name):
-        return "Electronics"
-    
-    if "analog watch" in clean_name or "digital watch" in clean_name:
-        return "Fashion"
-    
-    if ("bedsheet" in clean_name or "door mat" in clean_name or "curtain" in clean_name or
-        "blanket" in clean_name or "cushion" in clean_name or "clock" in clean_name):
-        return "Home Furnishings"
-    
-    if "cycle" in clean_name or "fitness" in clean_name or "gym" in clean_name:
-        return "Sports and fitness"
-    
-    if "cutter" in clean_name or "soldering" in clean_name or "tools" in clean_name:
-        return "Tools"
-    
-    if "seed" in clean_name:
-        return "Gardening_Outdoor"
-    
-    if "ballon" in clean_name or "decoration" in clean_name:
-        return "Party_Accessories"
-    
-    if "wardrobe" in clean_name:
-        return "Furniture"
-    
-    return None
+    return OVERRIDE_RULES.categorize(clean_name)
+
+# -----------------------------
+# Zero-shot classifier (GPU if available)
+# -----------------------------
+# Label hypotheses are tokenized once and a MiniLM shortlist picks the
+# top-k labels per product before BART-MNLI scores them
+categorizer = ZeroShotCategorizer(labels, top_k=5)
 
 # -----------------------------
 # Batch classify
@@ -128,24 +87,30 @@ def keyword_override(clean_name):
 batch_size = 16
 pred_rows = []
 
-for i in range(0, len(unique_products), batch_size):
-    batch = unique_products[i : i + batch_size]
-    texts = [item["clean_product"] for item in batch]
-    results = classifier(texts, labels)
-    
-    if isinstance(results, dict):
-        results = [results]
+# Keyword rules are checked first so the model only sees the rest
+overrides = OVERRIDE_RULES.match_series(
+    pd.Series([item["clean_product"] for item in unique_products], dtype=object)
+)["category"].tolist()
+to_classify = [item for item, override in zip(unique_products, overrides) if not override]
+results = categorizer.classify([item["clean_product"] for item in to_classify], batch_size=batch_size)
+model_predictions = {
+    item["clean_product"]: res for item, res in zip(to_classify, results)
+}
+
+for item, override_category in zip(unique_products, overrides):
+    if override_category:
+        final_category = override_category
+        final_confidence = 1.0
+    else:
+        res = model_predictions[item["clean_product"]]
+        final_category = res["labels"][0]
+        final_confidence = round(float(res["scores"][0]), 3)
     
-    for item, res in zip(batch, results):
-        override_category = keyword_override(item["clean_product"])
-        final_category = override_category if override_category else res["labels"][0]
-        final_confidence = 1.0 if override_category else round(float(res["scores"][0]), 3)
-        
-        pred_rows.append({
-            "product": item["product"],
-            "category": final_category,
-            "category_confidence": final_confidence,
-        })
+    pred_rows.append({
+        "product": item["product"],
+        "category": final_category,
+        "category_confidence": final_confidence,
+    })
 
 pred_df = pd.DataFrame(pred_rows)
 
@@ -0,0 +1,136 @@
+"""
+Zero-Shot Category Engine
+-------------------------
+Faster BART-MNLI zero-shot classification for a fixed label set
+
+The transformers zero-shot pipeline re-tokenizes every
+"This example is {label}." hypothesis for every product and runs one NLI
+forward pass per (product, label) pair. With a fixed label list this
+engine instead:
+
+1. Tokenizes the label hypotheses once, at start-up
+2. Tokenizes each product once and builds the premise/hypothesis pairs
+   from token ids directly
+3. Optionally shortlists the top-k labels per product with a MiniLM
+   bi-encoder (cosine similarity against precomputed label embeddings),
+   so the NLI model only scores k labels instead of all of them
+
+Results use the pipeline's format: {"labels": [...], "scores": [...]}
+sorted by score. With a shortlist, scores are normalized over the
+shortlisted labels only.
+"""
+
+import numpy as np
+import torch
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+# -----------------------------
+# ENGINE CONFIG
+# -----------------------------
+NLI_MODEL = "facebook/bart-large-mnli"
+SHORTLIST_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+HYPOTHESIS_TEMPLATE = "This example is {}."
+SHORTLIST_TOP_K = 5         # None to score every label with the NLI model
+BATCH_SIZE = 8              # Products per NLI forward pass (x top-k pairs)
+MAX_PREMISE_TOKENS = 128    # Product names are short; cap pathological ones
+
+
+class ZeroShotCategorizer:
+    """Zero-shot classifier with cached label hypotheses and a bi-encoder shortlist"""
+
+    def __init__(self, labels, model_name=NLI_MODEL, hypothesis_template=HYPOTHESIS_TEMPLATE,
+                 top_k=SHORTLIST_TOP_K, shortlist_model=SHORTLIST_MODEL, device=None):
+        self.labels = list(labels)
+        self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModelForSequenceClassification.from_pretrained(model_name)
+        self.model.to(self.device)
+        self.model.eval()
+        self.entailment_id = self._entailment_id()
+
+        # The label set is fixed, so hypotheses are tokenized exactly once
+        self.hypothesis_ids = self.tokenizer(
+            [hypothesis_template.format(label) for label in self.labels],
+            add_special_tokens=False
+        )["input_ids"]
+
+        self.top_k = top_k if top_k and top_k < len(self.labels) else None
+        self.encoder = None
+        if self.top_k:
+            from sentence_transformers import SentenceTransformer
+
+            self.encoder = SentenceTransformer(shortlist_model, device=self.device)
+            self.label_embeddings = self.encoder.encode(
+                [label.replace("_", " ") for label in self.labels],
+                normalize_embeddings=True
+            )
+
+    def _entailment_id(self):
+        for label, idx in self.model.config.label2id.items():
+            if label.lower().startswith("entail"):
+                return idx
+        return -1
+
+    def shortlist(self, texts):
+        """
+        Pick the top-k most similar labels for each text
+
+        Returns:
+            np.ndarray: (n, k) array of label indices
+        """
+        if not self.top_k:
+            return np.tile(np.arange(len(self.labels)), (len(texts), 1))
+
+        embeddings = self.encoder.encode(texts, batch_size=64, normalize_embeddings=True)
+        similarity = embeddings @ self.label_embeddings.T
+        return np.argpartition(-similarity, self.top_k - 1, axis=1)[:, :self.top_k]
+
+    def classify(self, texts, batch_size=BATCH_SIZE):
+        """
+        Classify texts against the label set
+
+        Args:
+            texts (list): Product names (or other short texts)
+            batch_size (int): Products per NLI forward pass
+
+        Returns:
+            list: One {"labels": [...], "scores": [...]} dict per text
+        """
+        texts = [str(t) for t in texts]
+        if not texts:
+            return []
+
+        premise_ids = self.tokenizer(
+            texts,
+            add_special_tokens=False,
+            truncation=True,
+            max_length=MAX_PREMISE_TOKENS
+        )["input_ids"]
+        candidates = self.shortlist(texts)
+        k = candidates.shape[1]
+        results = []
+
+        for start in range(0, len(texts), batch_size):
+            end = min(start + batch_size, len(texts))
+            pairs = [
+                self.tokenizer.build_inputs_with_special_tokens(premise_ids[i], self.hypothesis_ids[j])
+                for i in range(start, end)
+                for j in candidates[i]
+            ]
+            features = self.tokenizer.pad({"input_ids": pairs}, return_tensors="pt")
+            features = {key: value.to(self.device) for key, value in features.items()}
+
+            with torch.inference_mode():
+                logits = self.model(**features).logits[:, self.entailment_id]
+            probs = torch.softmax(logits.view(end - start, k).float(), dim=1).cpu().numpy()
+
+            for row, i in enumerate(range(start, end)):
+                order = np.argsort(-probs[row])
+                results.append({
+                    "sequence": texts[i],
+                    "labels": [self.labels[candidates[i][o]] for o in order],
+                    "scores": probs[row][order].tolist()
+                })
+
+        return results